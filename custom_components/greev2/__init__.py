@@ -2,11 +2,11 @@
 
 import logging
 
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.core import HomeAssistant
 
-# Import const is needed if used, but not for stubs
-# from . import const
+from .const import DOMAIN
+from .transport import async_close_endpoint
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,8 +26,9 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Gree Climate V2 from a config entry."""
     _LOGGER.debug("Setting up Gree Climate V2 entry: %s", entry.entry_id)
-    # Store the config entry data/options in hass.data for the platform to access?
-    # hass.data.setdefault(const.DOMAIN, {})[entry.entry_id] = entry.data
+    # Remember the options the entry was loaded with, so that saving runtime data
+    # (e.g. the bound encryption key) does not trigger a reload
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = dict(entry.options)
 
     # Forward the setup to the climate platform.
     # The climate platform will then call async_setup_entry within its code.
@@ -46,11 +47,19 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Forward the unload to the climate platform.
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
-    # Clean up hass.data if used
-    # if unload_ok:
-    #     hass.data[const.DOMAIN].pop(entry.entry_id)
-    #     if not hass.data[const.DOMAIN]:
-    #         hass.data.pop(const.DOMAIN)
+    # Close the shared UDP endpoint once the last Gree entry is gone
+    if unload_ok and not any(
+        other.state is ConfigEntryState.LOADED
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        async_close_endpoint()
+
+    # Clean up hass.data
+    if unload_ok and DOMAIN in hass.data:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        if not hass.data[DOMAIN]:
+            hass.data.pop(DOMAIN)
 
     _LOGGER.debug("Finished unloading Gree Climate V2 entry: %s", entry.entry_id)
     return unload_ok
@@ -59,5 +68,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     _LOGGER.debug("Handling options update for %s", entry.entry_id)
+    if hass.data.get(DOMAIN, {}).get(entry.entry_id) == dict(entry.options):
+        _LOGGER.debug("Only entry data changed for %s, not reloading", entry.entry_id)
+        return
     # Reload the entry to apply changes.
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,70 @@
+"""Per-device circuit breaker that stops traffic to unreachable devices."""
+
+import time
+from typing import Any, Dict, Optional
+
+from .const import BREAKER_BASE_DELAY, BREAKER_FAILURE_THRESHOLD, BREAKER_MAX_DELAY
+
+STATE_CLOSED: str = "closed"
+STATE_OPEN: str = "open"
+STATE_HALF_OPEN: str = "half_open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one device.
+
+    Closed: requests are sent; `failure_threshold` unanswered requests in a
+    row open the breaker. Open: requests are refused without touching the
+    network until the recovery delay has passed, then it is half-open.
+    Half-open: a probe decides; an answer closes the breaker, silence opens
+    it again with twice the delay (from `base_delay` up to `max_delay`).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        base_delay: float = BREAKER_BASE_DELAY,
+        max_delay: float = BREAKER_MAX_DELAY,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.failure_threshold: int = failure_threshold
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.failures: int = 0  # Unanswered requests in a row
+        self.trips: int = 0  # Openings since the device last answered
+        self.rejected: int = 0  # Requests refused while open
+        self._retry_at: Optional[float] = None
+
+    def state(self, now: Optional[float] = None) -> str:
+        """Return the breaker state at `now` (monotonic seconds)."""
+        if self._retry_at is None:
+            return STATE_CLOSED
+        now = time.monotonic() if now is None else now
+        return STATE_HALF_OPEN if now >= self._retry_at else STATE_OPEN
+
+    def record_success(self) -> None:
+        """Close the breaker: the device answered."""
+        self.failures = 0
+        self.trips = 0
+        self._retry_at = None
+
+    def record_failure(self, now: Optional[float] = None) -> None:
+        """Count an unanswered request, opening the breaker at the threshold."""
+        now = time.monotonic() if now is None else now
+        if self.state(now) == STATE_OPEN:
+            return  # Sent before the breaker opened; already accounted for
+        self.failures += 1
+        if self._retry_at is None and self.failures < self.failure_threshold:
+            return
+        delay: float = min(self.max_delay, self.base_delay * 2**self.trips)
+        self.trips += 1
+        self._retry_at = now + delay
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state(),
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
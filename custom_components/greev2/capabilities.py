@@ -0,0 +1,292 @@
+"""Capability probing: find which optional status columns a device supports."""
+
+import asyncio
+import logging
+import socket
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CAPABILITY_COLUMNS,
+    CAPABILITY_SAVE_DELAY,
+    CAPABILITY_STORAGE_KEY,
+    CAPABILITY_STORAGE_VERSION,
+    DOMAIN,
+    PROBE_BASELINE_COLUMN,
+)
+from .device_api import GreeDeviceApi
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CapabilityProfile:
+    """Optional columns a device answered (supported) or rejected (unsupported).
+
+    Undetermined columns got no answer either way (the device stopped
+    answering during the probe); they are neither added nor removed.
+    """
+
+    supported: Tuple[str, ...]
+    unsupported: Tuple[str, ...]
+    round_trips: int = field(default=1, compare=False)
+    undetermined: Tuple[str, ...] = ()
+
+    @property
+    def complete(self) -> bool:
+        """Return True if every probed column got a definite answer."""
+        return not self.undetermined
+
+    def supports(self, column: str) -> bool:
+        """Return True if the device reported a value for the column."""
+        return column in self.supported
+
+    def covers(self, candidates: Sequence[str]) -> bool:
+        """Return True if every candidate column was probed for this profile."""
+        return set(candidates) <= set(self.supported) | set(self.unsupported)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the profile in a form suitable for storage."""
+        return {
+            "supported": list(self.supported),
+            "unsupported": list(self.unsupported),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CapabilityProfile":
+        """Rebuild a stored profile."""
+        return cls(
+            supported=tuple(data["supported"]),
+            unsupported=tuple(data["unsupported"]),
+            round_trips=0,
+        )
+
+
+def _is_supported(value: Any) -> bool:
+    """Return True if a status value means the column exists on the device.
+
+    Firmware that knows most of a batch answers unknown columns with an empty
+    value instead of dropping the whole request.
+    """
+    return value is not None and value != ""
+
+
+def _supported_map(
+    columns: Sequence[str], values: List[Any]
+) -> Dict[str, Optional[bool]]:
+    """Map each probed column to whether the device supports it."""
+    return {column: _is_supported(value) for column, value in zip(columns, values)}
+
+
+class _Prober:
+    """Runs the status requests for one probe, counting round trips.
+
+    Results map each column to True (supported), False (rejected) or None
+    (undetermined: the device did not answer the baseline either).
+    """
+
+    def __init__(self, api: GreeDeviceApi) -> None:
+        self._api = api
+        self.round_trips: int = 0
+
+    async def request(self, columns: Sequence[str]) -> Optional[List[Any]]:
+        """Ask for the columns; return None if no values came back."""
+        self.round_trips += 1
+        try:
+            # Exact: a batch merged with its sibling would be rejected twice
+            values = await self._api.get_status(list(columns), exact=True)
+        except (socket.timeout, socket.error, ConnectionError, ValueError, TypeError) as e:
+            _LOGGER.debug("Probe of %s failed: %s", list(columns), e)
+            return None
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        return values
+
+    async def reachable(self) -> bool:
+        """Return True if the device answers the baseline column right now."""
+        return await self.request([PROBE_BASELINE_COLUMN]) is not None
+
+    async def bisect(self, columns: Sequence[str]) -> Dict[str, Optional[bool]]:
+        """Probe the columns, splitting the batch if it gets no answer."""
+        values = await self.request(columns)
+        if values is None:
+            return await self.split(columns)
+        return _supported_map(columns, values)
+
+    async def split(self, columns: Sequence[str]) -> Dict[str, Optional[bool]]:
+        """Bisect a batch that got no answer, probing both halves concurrently.
+
+        Rejected firmware requests and lost packets both go unanswered, so the
+        batch only counts as rejected if the baseline still answers; otherwise
+        its columns are left undetermined.
+        """
+        if not await self.reachable():
+            return dict.fromkeys(columns)
+        if len(columns) == 1:
+            return {columns[0]: False}
+        middle = len(columns) // 2
+        left, right = await asyncio.gather(
+            self.bisect(columns[:middle]), self.bisect(columns[middle:])
+        )
+        return {**left, **right}
+
+
+async def async_probe_capabilities(
+    api: GreeDeviceApi, candidates: Sequence[str] = CAPABILITY_COLUMNS
+) -> CapabilityProfile:
+    """Find which candidate columns the device supports.
+
+    All candidates are requested in one status request. Only if the device
+    does not answer that batch is it bisected, probing both halves
+    concurrently. Raises ConnectionError if the device does not answer at all.
+    """
+    prober = _Prober(api)
+    result = await prober.bisect(candidates)
+    if all(result[column] is None for column in candidates):
+        raise ConnectionError("Device did not answer the capability probe")
+
+    profile = CapabilityProfile(
+        supported=tuple(column for column in candidates if result[column]),
+        unsupported=tuple(
+            column for column in candidates if result[column] is False
+        ),
+        round_trips=prober.round_trips,
+        undetermined=tuple(column for column in candidates if result[column] is None),
+    )
+    _LOGGER.debug(
+        "Capability probe for %s: supported=%s unsupported=%s undetermined=%s"
+        " (%d round trips)",
+        api._host,  # pylint: disable=protected-access
+        profile.supported,
+        profile.unsupported,
+        profile.undetermined,
+        profile.round_trips,
+    )
+    return profile
+
+
+DATA_CAPABILITY_CACHE = f"{DOMAIN}_capability_cache"
+
+
+def capability_cache_key(
+    model: Optional[str], model_id: Optional[str], firmware: Optional[str]
+) -> Optional[str]:
+    """Return the cache key for a device, or None if model/firmware are unknown.
+
+    They come from the scan reply; a device added by hand that did not answer
+    the scan sent after binding has no key and probes on every start.
+    """
+    if not model or not firmware:
+        return None
+    return f"{model}/{model_id or ''}/{firmware}"
+
+
+class CapabilityCache:
+    """Capability profiles shared by identical devices, persisted in HA storage.
+
+    Profiles are keyed by model and firmware, so a new firmware string is
+    probed again. Devices of one key starting together share a single probe.
+    Only complete profiles are shared and stored; a probe with undetermined
+    columns serves its own device and the next device of the key probes again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty cache; call async_load before use."""
+        self._store: Store = Store(
+            hass, CAPABILITY_STORAGE_VERSION, CAPABILITY_STORAGE_KEY
+        )
+        self._profiles: Dict[str, CapabilityProfile] = {}
+        self._pending: Dict[str, "asyncio.Future[CapabilityProfile]"] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded: bool = False
+
+    async def async_load(self) -> None:
+        """Load stored profiles (only once, even with concurrent callers)."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {}
+            for key, stored in data.get("profiles", {}).items():
+                try:
+                    self._profiles[key] = CapabilityProfile.from_dict(stored)
+                except (KeyError, TypeError) as e:
+                    _LOGGER.warning("Dropping invalid stored profile %s: %s", key, e)
+            self._loaded = True
+
+    def get(
+        self, key: str, candidates: Sequence[str] = CAPABILITY_COLUMNS
+    ) -> Optional[CapabilityProfile]:
+        """Return the cached profile if it covers every candidate column."""
+        profile = self._profiles.get(key)
+        if profile is None or not profile.covers(candidates):
+            return None
+        return profile
+
+    async def async_get_profile(
+        self, key: str, probe: Callable[[], Awaitable[CapabilityProfile]]
+    ) -> CapabilityProfile:
+        """Return the cached profile for key, probing on a miss.
+
+        If a probe for the key is already running, wait for it; if that probe
+        fails or is incomplete (e.g. its device went offline), this device is
+        probed instead.
+        """
+        profile = self.get(key)
+        if profile is not None:
+            return profile
+        pending = self._pending.get(key)
+        if pending is not None:
+            await asyncio.wait((pending,))
+            if (
+                not pending.cancelled()
+                and pending.exception() is None
+                and pending.result().complete
+            ):
+                return pending.result()
+            return await self.async_get_profile(key, probe)
+
+        future: "asyncio.Future[CapabilityProfile]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending[key] = future
+        try:
+            profile = await probe()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            future.set_exception(err)
+            future.exception()  # Mark retrieved; waiters probe on their own
+            raise
+        finally:
+            del self._pending[key]
+        future.set_result(profile)
+        if not profile.complete:
+            _LOGGER.debug(
+                "Not caching profile %s: %s undetermined", key, profile.undetermined
+            )
+            return profile
+        self._profiles[key] = profile
+        self._store.async_delay_save(self._data_to_save, CAPABILITY_SAVE_DELAY)
+        return profile
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "profiles": {
+                key: profile.as_dict() for key, profile in self._profiles.items()
+            }
+        }
+
+
+async def async_get_capability_cache(hass: HomeAssistant) -> CapabilityCache:
+    """Return the shared capability cache, loading it on first use."""
+    cache: Optional[CapabilityCache] = hass.data.get(DATA_CAPABILITY_CACHE)
+    if cache is None:
+        cache = CapabilityCache(hass)
+        hass.data[DATA_CAPABILITY_CACHE] = cache
+    await cache.async_load()
+    return cache
@@ -5,7 +5,7 @@ import logging
 import socket  # Keep socket
 
 # Need Optional for type hints
-from typing import Any, Dict, List, Optional # Removed Union
+from typing import Any, Dict, List, Optional, Tuple # Removed Union
 
 # Third-party imports
 # import voluptuous as vol # Unused
@@ -46,16 +46,33 @@ from homeassistant.config_entries import ConfigEntry
 
 # Import format_mac and DeviceInfo
 from homeassistant.helpers.device_registry import format_mac, DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity, UpdateFailed
 
 
 # Local imports
-from .device_api import GreeDeviceApi
-from .climate_helpers import GreeClimateState, detect_features
+from .device_api import GreeDeviceApi, parse_command_response
+from .capabilities import (
+    async_get_capability_cache,
+    async_probe_capabilities,
+    capability_cache_key,
+)
+from .command_queue import CommandCoalescer, DeviceRequestScheduler
+from .coordinator import GreeCoordinator, poll_phase
+from .climate_helpers import (
+    ColumnScheduler,
+    GreeClimateState,
+    apply_capability_profile,
+    detect_features,
+)
 
 # Import constants needed for defaults and config keys
 # from . import const # Unused
 from .const import (
+    CONF_DEVICE_MODEL,
+    CONF_ENCRYPTION_KEY,
     CONF_ENCRYPTION_VERSION,
+    CONF_FIRMWARE_VERSION,
+    CONF_MODEL_ID,
     CONF_TEMP_SENSOR,  # Added
     DEFAULT_NAME,
     DEFAULT_PORT,
@@ -74,6 +91,10 @@ from .const import (
     SUPPORT_FLAGS,
     # TEMP_OFFSET, # Removed
     DOMAIN,  # Import DOMAIN for device info
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    PRIORITY_PROBE,
+    PRIORITY_RECONCILE,
 )
 
 
@@ -108,13 +129,12 @@ async def async_setup_entry(
 
 
 # pylint: disable=too-many-instance-attributes, too-many-public-methods, abstract-method
-class GreeClimate(ClimateEntity):
+class GreeClimate(CoordinatorEntity[GreeCoordinator], ClimateEntity):
     """Representation of a Gree Climate device."""
 
     # Declare types for instance variables
     _attr_name: str
     _attr_unique_id: str
-    _attr_should_poll: bool = True  # Default should_poll
     _attr_temperature_unit: str = UnitOfTemperature.CELSIUS  # Use HA Constant
     _attr_hvac_modes: List[HVACMode]
     _attr_fan_modes: List[str]
@@ -138,11 +158,18 @@ class GreeClimate(ClimateEntity):
     _temp_sensor_entity_id: Optional[str]  # Added back
     _horizontal_swing: bool
     _first_time_run: bool = True
+    _status_received: bool = False  # Set when the last sync got a status reply
     encryption_version: int
     _encryption_key: Optional[bytes] = None
     _uid: int = 0
     _api: GreeDeviceApi
     _options_to_fetch: List[str]
+    _columns: ColumnScheduler  # Which of _options_to_fetch each poll asks for
+    _commands: CommandCoalescer  # Merges commands issued close together
+    _requests: DeviceRequestScheduler  # One request at a time, commands first
+    _capability_key: Optional[str]  # Model/firmware key shared by identical units
+    # Columns the device last answered with a value other than the one commanded
+    _command_mismatches: Dict[str, Tuple[Any, Any]]
     _preset_modes_list: List[str]  # Keep for preset mode configuration
 
     # State managed by GreeClimateState helper
@@ -197,6 +224,13 @@ class GreeClimate(ClimateEntity):
             )
             self.encryption_version = 2
 
+        # Model/firmware come from the scan reply when the entry was discovered
+        self._capability_key = capability_cache_key(
+            data.get(CONF_DEVICE_MODEL),
+            data.get(CONF_MODEL_ID),
+            data.get(CONF_FIRMWARE_VERSION),
+        )
+
         # --- Use Defaults for other parameters ---
         self._port = DEFAULT_PORT
         self._timeout = DEFAULT_TIMEOUT
@@ -221,7 +255,9 @@ class GreeClimate(ClimateEntity):
         self._has_light_sensor = None  # Will be detected
         self._current_temperature = None  # Keep for external sensor logic
         self._first_time_run = True
-        self._encryption_key = None
+        # Key saved by a previous bind; binding is skipped while it still works
+        stored_key: Optional[str] = data.get(CONF_ENCRYPTION_KEY)
+        self._encryption_key = stored_key.encode("utf8") if stored_key else None
 
         # --- Configure Preset Modes based on horizontal swing ---
         if self._horizontal_swing:
@@ -235,6 +271,8 @@ class GreeClimate(ClimateEntity):
             identifiers={(DOMAIN, self._mac_addr)},
             name=self._attr_name,
             manufacturer="Gree",
+            model=data.get(CONF_DEVICE_MODEL),
+            sw_version=data.get(CONF_FIRMWARE_VERSION),
             suggested_area=area_id,
             configuration_url=f"http://{self._ip_addr}",
         )
@@ -245,7 +283,7 @@ class GreeClimate(ClimateEntity):
             port=self._port,
             mac=self._mac_addr,
             timeout=self._timeout,
-            encryption_key=None,
+            encryption_key=self._encryption_key,
             encryption_version=self.encryption_version,
         )
 
@@ -273,6 +311,7 @@ class GreeClimate(ClimateEntity):
             "TemSen": None,
             "AntiDirectBlow": None,
             "LigSen": None,
+            "Dwet": None,
         }
         # Pass flags needed by GreeClimateState properties/methods
         # Pass False for has_temp_sensor initially, it will be updated after detection.
@@ -305,6 +344,20 @@ class GreeClimate(ClimateEntity):
             "SvSt",
             "SlpMod",
         ]
+        self._columns = ColumnScheduler()
+        self._command_mismatches = {}
+        self._commands = CommandCoalescer(self._async_send_merged_command)
+        self._requests = DeviceRequestScheduler()
+
+        # --- Polling is owned by the coordinator; the entity subscribes ---
+        super().__init__(
+            GreeCoordinator(
+                hass,
+                self._attr_name,
+                self._async_poll,
+                phase=poll_phase(self._mac_addr),
+            )
+        )
 
         # --- Setup state change listeners ---
         # Listener registration moved to async_added_to_hass
@@ -315,9 +368,11 @@ class GreeClimate(ClimateEntity):
     async def _async_sync_state(
         self, ac_options_to_send: Optional[Dict[str, Any]] = None
     ) -> None:  # Renamed and made async, changed arg name
-        """Fetch state, update internal state, optionally send commands, update HA state."""
-        if ac_options_to_send is None:
-            ac_options_to_send = {}
+        """Fetch state and update internal state, or send a command (write-only)."""
+        if ac_options_to_send:
+            # Commands are sent straight away; the next poll reconciles the state
+            await self._async_send_command(ac_options_to_send)
+            return
 
         # --- Feature Detection (only if not done before) ---
         if self._has_temp_sensor is None:  # Check if detection is needed
@@ -328,9 +383,7 @@ class GreeClimate(ClimateEntity):
                     detected_adb,
                     detected_light,
                     updated_options_list,
-                ) = await detect_features(
-                    self._api, self._options_to_fetch
-                )  # Use helper
+                ) = await self._async_detect_features()
 
                 self._has_temp_sensor = detected_temp
                 self._has_anti_direct_blow = detected_adb
@@ -369,24 +422,30 @@ class GreeClimate(ClimateEntity):
                     self._state._has_temp_sensor = False  # Update state helper too
 
         # --- Fetch Current State ---
+        # Only the columns due on this poll; the rest keep their last value
+        columns: List[str] = self._columns.due(self._options_to_fetch)
+        # Confirming a command outranks routine polls (and is not interrupted)
+        priority = PRIORITY_RECONCILE if self._columns.reconciling else PRIORITY_POLL
         try:
-            received_data_list = await self._api.get_status(self._options_to_fetch)
+            received_data_list = await self._requests.async_run(
+                priority, lambda: self._api.get_status(columns)
+            )
             if received_data_list is None:
                 raise ConnectionError("API get_status returned None")
             if not isinstance(received_data_list, list):
                 raise ConnectionError(
                     f"API returned unexpected type: {type(received_data_list)}"
                 )
-            if len(received_data_list) != len(self._options_to_fetch):
+            if len(received_data_list) != len(columns):
                 _LOGGER.error(
                     "API list length mismatch: Received %d values for %d requested options. Opts: %s, Rcvd: %s",
                     len(received_data_list),
-                    len(self._options_to_fetch),
-                    self._options_to_fetch,
+                    len(columns),
+                    columns,
                     received_data_list,
                 )
                 raise ConnectionError(
-                    f"API list length mismatch: {len(received_data_list)} vs {len(self._options_to_fetch)}"
+                    f"API list length mismatch: {len(received_data_list)} vs {len(columns)}"
                 )
 
         except (
@@ -396,6 +455,8 @@ class GreeClimate(ClimateEntity):
             ValueError,
             TypeError,
         ) as e:  # Catch specific errors
+            # Settings may change while unreachable: fetch everything once back
+            self._columns.reset()
             if not self._disable_available_check:
                 self._online_attempts += 1
                 if (
@@ -412,6 +473,7 @@ class GreeClimate(ClimateEntity):
             return  # Exit if fetch fails
 
         # --- Connection Success ---
+        self._status_received = True
         if not self._disable_available_check:
             if self._device_online is not True:
                 _LOGGER.info("Device %s back online.", self.name)
@@ -420,37 +482,82 @@ class GreeClimate(ClimateEntity):
 
         # --- Update Internal State using Helper ---
         # Update state with fetched values
-        self._state.update_options(
-            self._options_to_fetch, received_data_list
-        )  # Use helper
-        # If specific options were sent (e.g., from a service call), update state with those too
-        if ac_options_to_send:
-            self._state.update_options(ac_options_to_send)  # Use helper
-
-        # --- Send Commands (if needed) ---
-        if not self._first_time_run and ac_options_to_send:
-            opt_keys, p_values = list(ac_options_to_send.keys()), list(
-                ac_options_to_send.values()
-            )
-            _LOGGER.debug("Sending command: %s = %s", opt_keys, p_values)
-            try:
-                send_result = await self._api.send_command(opt_keys, p_values)
-                if not send_result:
-                    _LOGGER.error("API send_command failed.")
-            except (
-                socket.timeout,
-                socket.error,
-                ConnectionError,
-                ValueError,
-                TypeError,
-            ) as e:  # Catch specific errors
-                _LOGGER.error("Error sending command: %s", e, exc_info=True)
-        elif self._first_time_run:
-            self._first_time_run = False
+        self._state.update_options(columns, received_data_list)  # Use helper
+        self._columns.on_fetched(columns)
+        self._first_time_run = False
 
         # --- Update HA State ---
         # HA state is now derived directly from properties reading self._state
 
+    async def _async_send_command(self, command: Dict[str, Any]) -> None:
+        """Apply a command optimistically and send it in one round trip.
+
+        Commands issued within the coalescing window share one packet; this
+        returns once that packet has been answered (or has failed).
+        """
+        self._state.update_options(command)  # Optimistic until confirmed
+        self._columns.on_command(command.keys())
+        await self._commands.async_submit(command)
+
+    async def _async_send_merged_command(self, command: Dict[str, Any]) -> None:
+        """Send a (merged) command and apply the values its reply confirms.
+
+        If the reply echoes the applied values they replace the optimistic
+        ones and no verification poll is needed.
+        """
+        opt_keys, p_values = list(command.keys()), list(command.values())
+        _LOGGER.debug("Sending command: %s = %s", opt_keys, p_values)
+        send_result: Optional[Dict[str, Any]] = None
+        try:
+            send_result = await self._requests.async_run(
+                PRIORITY_COMMAND, lambda: self._api.send_command(opt_keys, p_values)
+            )
+            if not send_result:
+                _LOGGER.error("API send_command failed.")
+        except (
+            socket.timeout,
+            socket.error,
+            ConnectionError,
+            ValueError,
+            TypeError,
+        ) as e:  # Catch specific errors
+            _LOGGER.error("Error sending command: %s", e, exc_info=True)
+
+        confirmed = parse_command_response(send_result, opt_keys)
+        if confirmed is None:
+            # Not polled by HA: publish the new state, then poll fast to confirm it
+            self.coordinator.async_command_sent(self._state.as_dict())
+            return
+        self._check_command_reply(command, confirmed)
+        self._state.update_options(confirmed)
+        self._columns.on_confirmed(
+            column for column in confirmed if column not in self._command_mismatches
+        )
+        self.coordinator.async_set_updated_data(self._state.as_dict())
+
+    def _check_command_reply(
+        self, command: Dict[str, Any], confirmed: Dict[str, Any]
+    ) -> None:
+        """Flag columns the device set to a value other than the one requested."""
+        for column, value in confirmed.items():
+            if column not in command:
+                continue
+            try:
+                applied = int(command[column]) == int(value)
+            except (ValueError, TypeError):
+                applied = command[column] == value
+            if applied:
+                self._command_mismatches.pop(column, None)
+                continue
+            self._command_mismatches[column] = (command[column], value)
+            _LOGGER.warning(
+                "%s set %s to %s instead of the requested %s",
+                self.name,
+                column,
+                value,
+                command[column],
+            )
+
     # --- Properties ---
     @property
     def current_temperature(self) -> Optional[float]:
@@ -602,6 +709,10 @@ class GreeClimate(ClimateEntity):
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added."""
         _LOGGER.debug("Gree climate device %s added to hass", self.name)
+        # Subscribe to the coordinator (starts its poll timer)
+        await super().async_added_to_hass()
+        # A command window still open on removal must not fire afterwards
+        self.async_on_remove(self._commands.close)
         # Add listener for external temp sensor if configured
         if self._temp_sensor_entity_id:
             _LOGGER.debug(
@@ -622,20 +733,38 @@ class GreeClimate(ClimateEntity):
                     self._async_temp_sensor_changed,
                 )
             )
-        # Perform initial update (will also do feature detection)
-        await self.async_update()
+        # Bind, feature detection and the first poll run in the background so
+        # platform setup (and HA startup) does not wait on slow or dead units.
+        # The fleet budget bounds how many devices do this at once, and the
+        # coordinator pushes the state when the first poll completes.
+        self._entry.async_create_background_task(
+            self.hass, self.async_update(), f"{DOMAIN} first poll of {self.name}"
+        )
 
     async def async_update(self) -> None:
-        """Update the entity."""
-        # Directly await the async internal update method
-        await self._async_update_internal()
+        """Refresh the entity now (initial update and update_entity service)."""
+        # Joins the coordinator's poll if one is already in flight
+        await self.coordinator.async_refresh()
         # State update is implicitly handled by properties reading from self._state now
 
-    async def _async_update_internal(self) -> None:  # Renamed and made async
+    async def _async_poll(self) -> Dict[str, Any]:
+        """Coordinator update: sync with the device and return its raw state."""
+        self._status_received = False
+        await self._async_update_internal()
+        if not self._status_received:
+            raise UpdateFailed(f"No status received from {self.name}")
+        return self._state.as_dict()
+
+    async def _async_update_internal(
+        self, allow_rebind: bool = True
+    ) -> None:  # Renamed and made async
         """Asynchronous update logic. Handles binding and state sync."""
         if not self._api._is_bound:
             try:
-                bind_success = await self._api.bind_and_get_key()  # Added await
+                # Not interruptible: commands need the key
+                bind_success = await self._requests.async_run(
+                    PRIORITY_RECONCILE, self._api.bind_and_get_key
+                )
                 if not bind_success:
                     if not self._disable_available_check:
                         self._device_online = False
@@ -645,6 +774,7 @@ class GreeClimate(ClimateEntity):
                     self._encryption_key = self._api._encryption_key
                     if self._encryption_key is not None:
                         self._api.update_encryption_key(self._encryption_key)
+                        self._async_save_encryption_key()
                     else:
                         _LOGGER.error("Binding ok but key is None for %s.", self.name)
             except (
@@ -672,9 +802,40 @@ class GreeClimate(ClimateEntity):
                 _LOGGER.error("Error during sync_state for %s: %s", self.name, e)
                 if not self._disable_available_check:
                     self._device_online = False
+            if allow_rebind and not self._api._is_bound:
+                # The API dropped a key the device no longer accepts: bind again now
+                _LOGGER.info("Stored key rejected by %s, re-binding.", self.name)
+                await self._async_update_internal(allow_rebind=False)
         elif not self._disable_available_check:
             self._device_online = False
 
+    async def _async_detect_features(self) -> Tuple[bool, bool, bool, List[str]]:
+        """Detect features, reusing the profile of identical devices when known."""
+        if self._capability_key is None:
+            return await self._requests.async_run(
+                PRIORITY_PROBE,
+                lambda: detect_features(self._api, self._options_to_fetch),
+            )
+        cache = await async_get_capability_cache(self.hass)
+        profile = await cache.async_get_profile(
+            self._capability_key,
+            lambda: self._requests.async_run(
+                PRIORITY_PROBE, lambda: async_probe_capabilities(self._api)
+            ),
+        )
+        return apply_capability_profile(profile, self._options_to_fetch)
+
+    @callback
+    def _async_save_encryption_key(self) -> None:
+        """Save the bound key in the config entry so restarts skip binding."""
+        if self._encryption_key is None:
+            return
+        key: str = self._encryption_key.decode("utf8")
+        if self._entry.data.get(CONF_ENCRYPTION_KEY) != key:
+            self.hass.config_entries.async_update_entry(
+                self._entry, data={**self._entry.data, CONF_ENCRYPTION_KEY: key}
+            )
+
     # --- State Change Callbacks (Added back for Temp Sensor) ---
 
     async def _async_temp_sensor_changed(
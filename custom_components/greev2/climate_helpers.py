@@ -2,13 +2,21 @@
 
 import logging
 import socket  # Added import
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNKNOWN
 from homeassistant.components.climate import HVACMode
 
 # Assuming necessary consts are imported here or passed in
 from .const import FAN_MODES, SWING_MODES, PRESET_MODES, TEMP_OFFSET, HVAC_MODES
+from .const import (
+    COLUMN_TIERS,
+    COMMAND_RELATED_COLUMNS,
+    POLL_SLOW_EVERY,
+    TIER_EVERY,
+    TIER_SLOW,
+)
+from .capabilities import CapabilityProfile, async_probe_capabilities
 from .device_api import GreeDeviceApi  # Needed for feature detection
 
 _LOGGER = logging.getLogger(__name__)
@@ -72,6 +80,10 @@ class GreeClimateState:
             _LOGGER.error("Invalid arguments passed to update_options.")
         # No return needed as it modifies self._ac_options directly
 
+    def as_dict(self) -> Dict[str, Optional[int]]:
+        """Return a copy of the raw device state."""
+        return dict(self._ac_options)
+
     # --- Properties for HA State ---
     @property
     def target_temperature(self) -> Optional[float]:
@@ -214,59 +226,100 @@ class GreeClimateState:
             _LOGGER.debug("get_internal_temp: Returning None (TemSen value was None)") # Indented under else
             return None # Indented under else
 
-async def detect_features(
-    api: GreeDeviceApi, current_options: List[str]
+class ColumnScheduler:
+    """Chooses which status columns a poll asks for, by tier (see const.COLUMN_TIERS).
+
+    A column is due if it was never fetched, a command touched it or a
+    related column, its tier is TIER_EVERY, or its tier is TIER_SLOW and this
+    is every slow_every-th poll. Startup and command tier columns are
+    otherwise left out.
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[Dict[str, str]] = None,
+        slow_every: int = POLL_SLOW_EVERY,
+        related: Optional[Dict[str, Sequence[str]]] = None,
+    ) -> None:
+        """Initialize a schedule that fetches every column on the first poll."""
+        self._tiers: Dict[str, str] = COLUMN_TIERS if tiers is None else tiers
+        self._slow_every: int = slow_every
+        self._related: Dict[str, Sequence[str]] = (
+            COMMAND_RELATED_COLUMNS if related is None else related
+        )
+        self._polls: int = 0  # Successful polls since the last full fetch
+        self._fetched: Set[str] = set()
+        self._requested: Set[str] = set()  # Due because of a command
+
+    @property
+    def reconciling(self) -> bool:
+        """Return True while columns touched by a command still need a read."""
+        return bool(self._requested)
+
+    def due(self, columns: Sequence[str]) -> List[str]:
+        """Return the columns due on this poll, in fetch-list order."""
+        slow_due = self._polls % self._slow_every == 0
+        return [
+            column
+            for column in columns
+            if column not in self._fetched
+            or column in self._requested
+            or self._tiers.get(column, TIER_EVERY) == TIER_EVERY
+            or (slow_due and self._tiers.get(column) == TIER_SLOW)
+        ]
+
+    def on_fetched(self, columns: Iterable[str]) -> None:
+        """Record a successful poll of the columns."""
+        fetched = set(columns)
+        self._fetched |= fetched
+        self._requested -= fetched
+        self._polls += 1
+
+    def on_command(self, columns: Iterable[str]) -> None:
+        """Fetch the commanded columns and related ones on the next poll."""
+        for column in columns:
+            self._requested.add(column)
+            self._requested.update(self._related.get(column, ()))
+
+    def on_confirmed(self, columns: Iterable[str]) -> None:
+        """Skip re-reading columns whose value a command reply confirmed."""
+        self._requested -= set(columns)
+
+    def reset(self) -> None:
+        """Fetch every column on the next poll (e.g. after the device was away)."""
+        self._polls = 0
+        self._fetched.clear()
+
+
+def apply_capability_profile(
+    profile: CapabilityProfile, current_options: List[str]
 ) -> Tuple[bool, bool, bool, List[str]]:
-    """Detect optional device features using API calls."""
-    has_temp_sensor = False
-    has_anti_direct_blow = False
-    has_light_sensor = False
+    """Return feature flags and the fetch list for a capability profile.
+
+    Supported optional columns are added to the fetch list. Unsupported ones
+    are not added, since firmware may ignore a status request containing a
+    column it does not know, but columns already on the list are never
+    removed: an unanswered probe cannot tell a rejection from packet loss.
+    """
     options_to_fetch = list(current_options)  # Work on a copy
+    for column in profile.supported:
+        if column not in options_to_fetch:
+            options_to_fetch.append(column)
+    return (
+        profile.supports("TemSen"),
+        profile.supports("AntiDirectBlow"),
+        profile.supports("LigSen"),
+        options_to_fetch,
+    )
 
-    # Detect Temp Sensor (TemSen)
-    try:
-        # Check if device responds to "TemSen" query
-        response = await api.get_status(["TemSen"])
-        # Check if response is not None and is a list (expected format)
-        if response is not None and isinstance(response, list):
-            has_temp_sensor = True
-            _LOGGER.debug("Internal temperature sensor detected.")
-            if "TemSen" not in options_to_fetch:
-                options_to_fetch.append("TemSen")
-        else:
-            _LOGGER.debug(
-                "Internal temperature sensor not detected or invalid response."
-            )
-    except (socket.timeout, socket.error, ConnectionError, ValueError, TypeError) as e:
-        _LOGGER.warning("Error detecting internal temperature sensor: %s", e)
-        # Keep has_temp_sensor as False
 
-    # Detect Anti-Direct Blow (AntiDirectBlow)
-    try:
-        response = await api.get_status(["AntiDirectBlow"])
-        if response is not None and isinstance(response, list):
-            has_anti_direct_blow = True
-            _LOGGER.debug("Anti-direct blow feature detected.")
-            if "AntiDirectBlow" not in options_to_fetch:
-                options_to_fetch.append("AntiDirectBlow")
-        else:
-            _LOGGER.debug("Anti-direct blow feature not detected or invalid response.")
-    except (socket.timeout, socket.error, ConnectionError, ValueError, TypeError) as e:
-        _LOGGER.warning("Error detecting anti-direct blow feature: %s", e)
-        # Keep has_anti_direct_blow as False
-
-    # Detect Light Sensor (LigSen)
+async def detect_features(
+    api: GreeDeviceApi, current_options: List[str]
+) -> Tuple[bool, bool, bool, List[str]]:
+    """Detect optional device features with a single capability probe."""
     try:
-        response = await api.get_status(["LigSen"])
-        if response is not None and isinstance(response, list):
-            has_light_sensor = True
-            _LOGGER.debug("Light sensor detected.")
-            if "LigSen" not in options_to_fetch:
-                options_to_fetch.append("LigSen")
-        else:
-            _LOGGER.debug("Light sensor not detected or invalid response.")
+        profile = await async_probe_capabilities(api)
     except (socket.timeout, socket.error, ConnectionError, ValueError, TypeError) as e:
-        _LOGGER.warning("Error detecting light sensor: %s", e)
-        # Keep has_light_sensor as False
-
-    return has_temp_sensor, has_anti_direct_blow, has_light_sensor, options_to_fetch
+        _LOGGER.warning("Error detecting device features: %s", e)
+        return False, False, False, list(current_options)
+    return apply_capability_profile(profile, current_options)
@@ -0,0 +1,234 @@
+"""JSON codec for Gree packets: inner packs, envelopes and padding.
+
+Every pack and envelope is serialized and parsed here. orjson is used when
+installed and the stdlib `json` module otherwise; both produce the same
+bytes for what packets hold (str, bool, None, lists and dicts, and the
+numbers `check_number` accepts).
+"""
+
+import binascii
+import json
+import logging
+import math
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - Home Assistant ships orjson
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+AES_BLOCK_SIZE: int = 16
+_CLOSING_BRACE: int = ord("}")
+# PKCS#7 padding of each length, built once (checking it allocates nothing)
+_PKCS7_PADDING: Tuple[bytes, ...] = tuple(
+    bytes((size,)) * size for size in range(AES_BLOCK_SIZE + 1)
+)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Integers orjson can serialize (64-bit), and the floats both backends write
+# without an exponent (json writes 1e+16 and 1e-05, orjson 1e16 and 0.00001)
+_INT_RANGE: Tuple[int, int] = (-(2**63), 2**64 - 1)
+_PLAIN_FLOAT_RANGE: Tuple[float, float] = (1e-4, 1e16)
+
+
+class JsonBackend(ABC):
+    """Compact JSON serialization; subclasses implement it."""
+
+    name: str = ""
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON."""
+
+    @abstractmethod
+    def loads(self, data: Buffer) -> Any:
+        """Parse JSON from bytes or a view of them."""
+
+
+class StdlibJsonBackend(JsonBackend):
+    """The stdlib `json` module, configured to match orjson's output.
+
+    Only for values `check_number` accepts: NaN, big integers and exponents
+    are written differently.
+    """
+
+    name = "json"
+
+    def __init__(self) -> None:
+        """Build the encoder once."""
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON."""
+        return self._encoder.encode(obj).encode("utf8")
+
+    def loads(self, data: Buffer) -> Any:
+        """Parse JSON from bytes or a view of them (views are copied)."""
+        return json.loads(data.tobytes() if isinstance(data, memoryview) else data)
+
+
+class OrjsonBackend(JsonBackend):
+    """orjson: serializes to bytes and parses views without copying them."""
+
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON."""
+        return orjson.dumps(obj)
+
+    def loads(self, data: Buffer) -> Any:
+        """Parse JSON from bytes or a view of them."""
+        return orjson.loads(data)
+
+
+def check_number(value: Union[int, float]) -> None:
+    """Raise ValueError for a number the JSON backends do not encode alike.
+
+    That is NaN and infinities (json writes NaN, orjson null), integers
+    beyond 64 bits and floats that would be written with an exponent.
+    """
+    if isinstance(value, int):
+        if not _INT_RANGE[0] <= value <= _INT_RANGE[1]:
+            raise ValueError(f"{value} does not fit in 64 bits")
+        return
+    if not math.isfinite(value):
+        raise ValueError(f"{value} is not a finite number")
+    if value and not _PLAIN_FLOAT_RANGE[0] <= abs(value) < _PLAIN_FLOAT_RANGE[1]:
+        raise ValueError(f"{value} is out of range for a packet value")
+
+
+def available_json_backends() -> List[JsonBackend]:
+    """Return an instance of every installed JSON backend, fastest first."""
+    backends: List[JsonBackend] = []
+    if orjson is not None:
+        backends.append(OrjsonBackend())
+    backends.append(StdlibJsonBackend())
+    return backends
+
+
+_JSON: JsonBackend = available_json_backends()[0]
+_LOGGER.debug("Using the %s JSON backend", _JSON.name)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize a pack or envelope to compact JSON bytes."""
+    return _JSON.dumps(obj)
+
+
+def loads(data: Buffer) -> Any:
+    """Parse JSON from bytes or a view of them.
+
+    Raises ValueError (json.JSONDecodeError) on invalid JSON with either backend.
+    """
+    return _JSON.loads(data)
+
+
+def encode_envelope(
+    pack: str, mac: str, tag: Optional[str] = None, i: int = 0
+) -> bytes:
+    """Build the `t: pack` envelope around a base64 pack (and GCM tag) for a device."""
+    envelope: Dict[str, Any] = {
+        "cid": "app",
+        "i": i,  # 1 for bind requests
+        "pack": pack,
+        "t": "pack",
+        "tcid": mac,
+        "uid": 0,
+    }
+    if tag is not None:
+        envelope["tag"] = tag
+    return dumps(envelope)
+
+
+def pad(data: bytes) -> bytes:
+    """Add PKCS#7 padding to a whole number of AES blocks (V1 packs)."""
+    return data + _PKCS7_PADDING[AES_BLOCK_SIZE - len(data) % AES_BLOCK_SIZE]
+
+
+# String fields of the envelope, located without parsing it. Base64 values
+# need no escaping; envelopes with escapes take the JSON path.
+_ENVELOPE_FIELDS: Dict[str, "re.Pattern[bytes]"] = {
+    name: re.compile(rb'"' + name.encode() + rb'"\s*:\s*"([^"\\]*)"')
+    for name in ("pack", "tag", "cid")
+}
+_ESCAPE = re.compile(rb"\\")
+
+
+def envelope_field(data: Buffer, name: str) -> Optional[memoryview]:
+    """Return a view of a string field (`pack`, `tag` or `cid`) of an envelope.
+
+    No copy is made. Returns None if the field is missing or escaped.
+    """
+    match = _ENVELOPE_FIELDS[name].search(data)
+    if match is None:
+        return None
+    return memoryview(data)[match.start(1) : match.end(1)]
+
+
+def decode_envelope(data: Buffer) -> Tuple[bytes, Optional[bytes]]:
+    """Return the base64-decoded `pack` and `tag` (None for V1) of an envelope.
+
+    Both are decoded straight from views of the datagram. Raises KeyError if
+    there is no pack, ValueError if the datagram is not a JSON envelope.
+    """
+    if _ESCAPE.search(data) is None:
+        pack = envelope_field(data, "pack")
+        if pack is not None:
+            tag = envelope_field(data, "tag")
+            return (
+                binascii.a2b_base64(pack),
+                binascii.a2b_base64(tag) if tag is not None else None,
+            )
+    envelope: Any = loads(data)
+    if not isinstance(envelope, dict):
+        raise ValueError(f"Envelope is not a JSON object: {type(envelope).__name__}")
+    tag_b64: Optional[str] = envelope.get("tag")
+    return (
+        binascii.a2b_base64(envelope["pack"]),
+        binascii.a2b_base64(tag_b64) if tag_b64 is not None else None,
+    )
+
+
+def unpad(data: bytes) -> memoryview:
+    """Return a view of data without its padding (no copy).
+
+    V1 (ECB) packs carry PKCS#7 padding, stripped once validated. V2 (GCM)
+    packs are not padded and end with the closing brace. Anything else
+    (firmware padding with NULs or spaces, a trailing newline) is cut after
+    the last closing brace; raises ValueError if there is none.
+    """
+    view = memoryview(data)
+    if not view:
+        raise ValueError("Empty pack")
+    size: int = view[-1]
+    if size == _CLOSING_BRACE:
+        return view
+    if 1 <= size <= AES_BLOCK_SIZE and data.endswith(_PKCS7_PADDING[size]):
+        return view[:-size]
+    end: int = data.rfind(b"}")
+    if end == -1:
+        raise ValueError("No JSON object in pack")
+    return view[: end + 1]
+
+
+def decode_pack(
+    decrypted: bytes, fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Parse a decrypted pack into a dict, straight from bytes.
+
+    With `fields`, only those keys are kept (a status reply needs `dat` and
+    `cols`, not the rest of the pack). Raises ValueError on padding or JSON
+    errors.
+    """
+    body = unpad(decrypted)
+    pack: Any = loads(decrypted if len(body) == len(decrypted) else body)
+    if not isinstance(pack, dict):
+        raise ValueError(f"Pack is not a JSON object: {type(pack).__name__}")
+    if fields is None:
+        return pack
+    return {field: pack[field] for field in fields if field in pack}
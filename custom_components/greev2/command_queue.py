@@ -0,0 +1,168 @@
+"""Per-device request handling: command merging and priority scheduling."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .const import COMMAND_COALESCE_WINDOW, PREEMPTIBLE_PRIORITIES
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class CommandCoalescer:
+    """Merges commands issued within a short window into one command packet.
+
+    The first command opens the window; commands arriving before it closes are
+    merged into it, the last value written to a column winning. Every caller
+    waits for the single merged send and gets its result (or exception).
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[Any]],
+        window: float = COMMAND_COALESCE_WINDOW,
+    ) -> None:
+        """Initialize an idle coalescer; send transmits one merged command."""
+        self._send = send
+        self.window: float = window
+        self._pending: Dict[str, Any] = {}
+        self._batch: Optional["asyncio.Future[Any]"] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.packets_sent: int = 0
+        self.commands_merged: int = 0  # Commands that joined an open window
+
+    async def async_submit(self, command: Dict[str, Any]) -> Any:
+        """Queue a command and wait until the packet carrying it is answered."""
+        if self._batch is None:
+            loop = asyncio.get_running_loop()
+            self._batch = loop.create_future()
+            self._timer = loop.call_later(self.window, self._flush)
+        else:
+            self.commands_merged += 1
+        self._pending.update(command)
+        # Shielded: one caller giving up must not cancel the others' command
+        return await asyncio.shield(self._batch)
+
+    def _flush(self) -> None:
+        """Close the window and send the merged command."""
+        batch, command = self._batch, self._pending
+        self._batch, self._pending, self._timer = None, {}, None
+        if batch is None:
+            return
+        _LOGGER.debug("Sending merged command %s", command)
+        self.packets_sent += 1
+        task = asyncio.ensure_future(self._send(command))
+        task.add_done_callback(lambda done: _resolve(batch, done))
+
+    def close(self) -> None:
+        """Drop the open window: its command is not sent, its callers are cancelled."""
+        if self._timer is not None:
+            self._timer.cancel()
+        batch = self._batch
+        self._batch, self._pending, self._timer = None, {}, None
+        if batch is not None and not batch.done():
+            batch.cancel()
+
+
+def _resolve(batch: "asyncio.Future[Any]", done: "asyncio.Future[Any]") -> None:
+    """Hand the result of a merged send to everyone waiting on the batch."""
+    if batch.done():
+        return
+    if done.cancelled():
+        batch.cancel()
+    elif done.exception() is not None:
+        batch.set_exception(done.exception())  # type: ignore[arg-type]
+    else:
+        batch.set_result(done.result())
+
+
+@dataclass(order=True)
+class _Job:
+    """A request waiting in (or running from) a scheduler lane."""
+
+    priority: int
+    seq: int
+    run: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: "asyncio.Future[Any]" = field(compare=False)
+    preempted: bool = field(default=False, compare=False)
+
+
+class DeviceRequestScheduler:
+    """Runs one request at a time for a device, the most urgent lane first.
+
+    Lanes are the const.PRIORITY_* values (lower runs first; FIFO within a
+    lane). A more urgent request interrupts a running poll or probe, which
+    is queued again and re-run once the urgent request is done, so a user's
+    command never waits behind background traffic. Interrupting cancels the
+    request; GreeDeviceApi then stops its status request unless another
+    caller shares it, and the fleet-wide packet budget lets command packets
+    skip queued polls (see transport.TokenBucket).
+    """
+
+    def __init__(self) -> None:
+        """Initialize an idle scheduler."""
+        self._queue: List[_Job] = []
+        self._seq = itertools.count()
+        self._running: Optional[Tuple[_Job, "asyncio.Future[Any]"]] = None
+        self._worker: Optional["asyncio.Future[None]"] = None
+        self.preemptions: int = 0
+
+    async def async_run(
+        self, priority: int, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Queue a request in a lane and return its result once it has run."""
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        job = _Job(priority, next(self._seq), request, future)
+        heapq.heappush(self._queue, job)
+        if self._running is not None:
+            running, task = self._running
+            if (
+                priority < running.priority
+                and running.priority in PREEMPTIBLE_PRIORITIES
+                and not running.preempted
+            ):
+                _LOGGER.debug("Interrupting a lane %d request", running.priority)
+                running.preempted = True
+                task.cancel()
+        if self._worker is None:
+            self._worker = asyncio.ensure_future(self._async_work())
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            # The caller gave up: stop its request if it is the one running
+            if self._running is not None and self._running[0] is job:
+                self._running[1].cancel()
+            raise
+
+    async def _async_work(self) -> None:
+        """Run queued requests until every lane is empty."""
+        try:
+            while self._queue:
+                job = heapq.heappop(self._queue)
+                if job.future.done():
+                    continue  # Its caller gave up while it was queued
+                task = asyncio.ensure_future(job.run())
+                self._running = (job, task)
+                await asyncio.wait((task,))
+                self._running = None
+                if task.cancelled():
+                    if job.preempted and not job.future.done():
+                        job.preempted = False
+                        self.preemptions += 1
+                        heapq.heappush(self._queue, job)
+                    elif not job.future.done():
+                        job.future.cancel()
+                elif job.future.done():
+                    task.exception()  # Nobody is waiting; mark it retrieved
+                elif task.exception() is not None:
+                    job.future.set_exception(task.exception())  # type: ignore[arg-type]
+                else:
+                    job.future.set_result(task.result())
+        finally:
+            self._running = None
+            self._worker = None
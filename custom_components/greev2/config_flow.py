@@ -17,7 +17,7 @@ from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.core import HomeAssistant, callback
 
 # Import EntitySelector and config
-from homeassistant.helpers import selector
+from homeassistant.helpers import discovery_flow, selector
 # Removed unused EntitySelector, EntitySelectorConfig
 # from homeassistant.helpers.selector import EntitySelector, EntitySelectorConfig
 from homeassistant.helpers.device_registry import format_mac  # For cleaning MAC
@@ -28,13 +28,18 @@ from .const import (
     DEFAULT_NAME,
     DEFAULT_PORT,
     DEFAULT_TIMEOUT,
+    CONF_ENCRYPTION_KEY,
     CONF_ENCRYPTION_VERSION,  # Import constant
     CONF_TEMP_SENSOR,  # Import new constant
     CONF_DEVICE_MODEL,  # Import new constant
+    CONF_FIRMWARE_VERSION,
+    CONF_MODEL_ID,
+    IDENTIFY_SCAN_WINDOW,
 )
 
 # Line 32 removed
 from .device_api import GreeDeviceApi  # Import the API
+from .discovery import DiscoveredDevice, async_scan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,13 +63,14 @@ def get_user_schema(user_input: dict | None = None) -> vol.Schema:
     return vol.Schema(
         {
             vol.Required(CONF_HOST, default=user_input.get(CONF_HOST, "")): str,
-            vol.Required(CONF_MAC, default=user_input.get(CONF_MAC, "")): str,
+            # Leave the MAC empty to scan the host (or CIDR subnet) for devices
+            vol.Optional(CONF_MAC, default=user_input.get(CONF_MAC, "")): str,
             vol.Optional(
                 CONF_NAME, default=user_input.get(CONF_NAME, DEFAULT_NAME)
             ): str,
             # Add Area selector with default persistence
             vol.Optional(
-                "area_id", default=user_input.get("area_id")
+                "area_id", description={"suggested_value": user_input.get("area_id")}
             ): selector.AreaSelector(),
             # Add Encryption Version selector
             vol.Optional(
@@ -77,7 +83,8 @@ def get_user_schema(user_input: dict | None = None) -> vol.Schema:
             ),
             # Add optional Temperature Sensor selector
             vol.Optional(
-                CONF_TEMP_SENSOR, default=user_input.get(CONF_TEMP_SENSOR)
+                CONF_TEMP_SENSOR,
+                description={"suggested_value": user_input.get(CONF_TEMP_SENSOR)},
             ): selector.EntitySelector(
                 selector.EntitySelectorConfig(
                     domain="sensor", device_class=SensorDeviceClass.TEMPERATURE
@@ -122,7 +129,7 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, str]:
             encryption_version=enc_version,  # Use selected version
         )
 
-        # Run the blocking bind operation in executor
+        # Binding runs on the asyncio UDP transport, so it can be awaited directly
         _LOGGER.debug(
             "Attempting to bind to device %s (%s) using V%d",
             host,
@@ -130,7 +137,7 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, str]:
             enc_version,
         )
         # bind_and_get_key now returns bool
-        is_bound = await hass.async_add_executor_job(api.bind_and_get_key)
+        is_bound = await api.bind_and_get_key()
 
         if not is_bound:
             _LOGGER.error(
@@ -141,7 +148,14 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, str]:
         # If binding is successful, return validated info (including cleaned MAC)
         _LOGGER.info("Successfully bound to device %s (%s)", host, cleaned_mac)
         # We don't strictly need area_id in the return here, it's in the user_input passed to create_entry
-        return {"title": data.get(CONF_NAME, host), "cleaned_mac": cleaned_mac}
+        info = {"title": data.get(CONF_NAME, host), "cleaned_mac": cleaned_mac}
+        # Keep the bound key so the entity does not have to bind again at startup
+        if isinstance(api._encryption_key, bytes):
+            info[CONF_ENCRYPTION_KEY] = api._encryption_key.decode("utf8")
+        if not data.get(CONF_FIRMWARE_VERSION):
+            # Entered by hand: the bind reply carries no model or firmware
+            info.update(await _async_identify(host, cleaned_mac))
+        return info
 
     except (socket.timeout, socket.error, ConnectionRefusedError, OSError) as conn_ex:
         _LOGGER.error("Failed to connect to device %s: %s", host, conn_ex)
@@ -192,8 +206,17 @@ class GreeV2OptionsFlowHandler(config_entries.OptionsFlow):
                 }
                 try:
                     # Use the same validation function as the main flow
-                    await validate_input(self.hass, validation_data)
+                    info = await validate_input(self.hass, validation_data)
                     _LOGGER.info("Validation successful for new IP %s", new_ip)
+                    if info and info.get(CONF_ENCRYPTION_KEY):
+                        # Store the freshly bound key alongside the original data
+                        self.hass.config_entries.async_update_entry(
+                            self.config_entry,
+                            data={
+                                **data,
+                                CONF_ENCRYPTION_KEY: info[CONF_ENCRYPTION_KEY],
+                            },
+                        )
                 except CannotConnect:
                     _LOGGER.error("Cannot connect to new IP address %s", new_ip)
                     errors["base"] = "cannot_connect"
@@ -273,6 +296,12 @@ class GreeV2ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     # CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL # Add later if needed
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._user_input: dict = {}
+        self._discovered: dict[str, DiscoveredDevice] = {}
+        self._discovered_device: DiscoveredDevice | None = None
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         _LOGGER.info("GreeV2 Config Flow: async_step_user started.")
@@ -280,46 +309,226 @@ class GreeV2ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Pass user_input to pre-fill schema only if it exists (i.e., on error)
         data_schema = get_user_schema(user_input)
 
-        if user_input is not None:
+        if user_input is not None and not user_input.get(CONF_MAC):
+            # No MAC given: scan the host/subnet and let the user pick a device
             try:
-                # Validate the input by trying to connect and bind
-                info = await validate_input(self.hass, user_input)
-
-                # Set unique ID to prevent duplicate entries
-                await self.async_set_unique_id(info["cleaned_mac"])
-                self._abort_if_unique_id_configured()
-
-                # If validation succeeds, create the entry
-                _LOGGER.info("Validation successful, creating config entry.")
-                # Pass original user_input (including name, area_id, enc version, temp_sensor) to data
-                return self.async_create_entry(title=info["title"], data=user_input)
-
-            # Reordered except blocks: AbortFlow first
-            except data_entry_flow.AbortFlow as af:  # Use data_entry_flow.AbortFlow
-                _LOGGER.info("Config flow aborted: %s", af.reason)
-                # Re-raise AbortFlow to let HA handle it (shows the abort message)
-                raise af
-            except CannotConnect:
+                devices = await async_scan(user_input[CONF_HOST])
+            except ValueError:
+                errors["base"] = "invalid_scan_target"
+            except OSError as e:
+                _LOGGER.error("Scan of %s failed: %s", user_input[CONF_HOST], e)
                 errors["base"] = "cannot_connect"
-            except InvalidAuth:
-                errors["base"] = "invalid_auth"
-            except exceptions.HomeAssistantError as e:  # Catch other HA errors
-                _LOGGER.error("Config flow error: %s", e)
-                errors["base"] = "unknown"  # Default for now
-            # Broad exception catch as a fallback for the whole user step
-            except Exception as e: # pylint: disable=broad-except
-                _LOGGER.exception("Unexpected exception in config flow: %s", e)
-                errors["base"] = "unknown"
-
-            # If errors occurred, schema is already pre-filled by get_user_schema(user_input) above
-
-        # Show the form to the user (again if errors occurred, pre-filled)
+            else:
+                configured = self._async_current_ids()
+                self._discovered = {}
+                for device in devices:
+                    if format_mac(device.mac) in configured:
+                        # Its discovery flow updates the entry's host and firmware
+                        self._async_start_discovery_flow(device)
+                    else:
+                        self._discovered[format_mac(device.mac)] = device
+                if self._discovered:
+                    self._user_input = user_input
+                    return await self.async_step_pick_device()
+                errors["base"] = "no_devices_found"
+            return self.async_show_form(
+                step_id="user", data_schema=data_schema, errors=errors
+            )
+
+        if user_input is not None:
+            return await self._async_create_from_input(user_input, "user", data_schema)
+
+        # Show the form to the user
         _LOGGER.info("GreeV2 Config Flow: Showing user form. Errors: %s", errors)
-        # Pass the potentially pre-filled schema
         return self.async_show_form(
             step_id="user", data_schema=data_schema, errors=errors
         )
 
+    async def async_step_pick_device(self, user_input=None):
+        """Let the user pick one of the devices found by a scan."""
+        if user_input is not None:
+            device = self._discovered.pop(user_input[CONF_MAC])
+            # Offer the remaining devices as discovered flows, skipping the
+            # manual entry (and bind timeout) for each of them
+            for other in self._discovered.values():
+                self._async_start_discovery_flow(other)
+            data = {**self._user_input, **_device_input(device)}
+            if self._user_input.get(CONF_NAME) not in (None, "", DEFAULT_NAME):
+                data[CONF_NAME] = self._user_input[CONF_NAME]  # Keep a custom name
+            return await self._async_create_from_input(
+                data, "user", get_user_schema(data)
+            )
+
+        options = [
+            selector.SelectOptionDict(
+                value=mac,
+                label=f"{device.name} ({device.host}, {mac}, {device.model} {device.firmware})",
+            )
+            for mac, device in self._discovered.items()
+        ]
+        return self.async_show_form(
+            step_id="pick_device",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_MAC): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=options, mode=selector.SelectSelectorMode.LIST
+                        )
+                    )
+                }
+            ),
+        )
+
+    @callback
+    def _async_start_discovery_flow(self, device: DiscoveredDevice) -> None:
+        """Start a discovery flow for a device found by a scan."""
+        discovery_flow.async_create_flow(
+            self.hass,
+            DOMAIN,
+            context={"source": config_entries.SOURCE_DISCOVERY},
+            data=device,
+        )
+
+    async def async_step_discovery(self, discovery_info: DiscoveredDevice):
+        """Handle a device found by a scan."""
+        await self.async_set_unique_id(format_mac(discovery_info.mac))
+        entry = self.hass.config_entries.async_entry_for_domain_unique_id(
+            DOMAIN, self.unique_id
+        )
+        if entry is not None and entry.options.get(
+            CONF_HOST, discovery_info.host
+        ) != discovery_info.host:
+            # The entity reads the host from the options first (set by the options flow)
+            self.hass.config_entries.async_update_entry(
+                entry, options={**entry.options, CONF_HOST: discovery_info.host}
+            )
+        # A new firmware string makes the entity probe its capabilities again
+        self._abort_if_unique_id_configured(
+            updates={
+                CONF_HOST: discovery_info.host,
+                CONF_FIRMWARE_VERSION: discovery_info.firmware,
+            }
+        )
+        self._discovered_device = discovery_info
+        self.context["title_placeholders"] = {
+            "name": discovery_info.name,
+            "host": discovery_info.host,
+        }
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(self, user_input=None):
+        """Confirm adding a discovered device, asking only for the optional fields."""
+        device = self._discovered_device
+        assert device is not None
+        data_schema = vol.Schema(
+            {
+                key: value
+                for key, value in get_user_schema(user_input).schema.items()
+                if key not in (CONF_HOST, CONF_MAC, CONF_ENCRYPTION_VERSION)
+            }
+        )
+        if user_input is not None:
+            data = {**user_input, **_device_input(device)}
+            return await self._async_create_from_input(
+                data, "discovery_confirm", data_schema
+            )
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            data_schema=data_schema,
+            description_placeholders={
+                "name": device.name,
+                "host": device.host,
+                "mac": format_mac(device.mac),
+                "model": device.model,
+                "firmware": device.firmware,
+            },
+        )
+
+    async def _async_create_from_input(
+        self, user_input: dict, step_id: str, data_schema: vol.Schema
+    ):
+        """Bind to the device and create the entry, or show the form with errors."""
+        errors = {}
+        try:
+            # Validate the input by trying to connect and bind
+            info = await validate_input(self.hass, user_input)
+
+            # Set unique ID to prevent duplicate entries
+            await self.async_set_unique_id(info["cleaned_mac"])
+            self._abort_if_unique_id_configured()
+
+            # If validation succeeds, create the entry
+            _LOGGER.info("Validation successful, creating config entry.")
+            # Pass original user_input (including name, area_id, enc version, temp_sensor) to data
+            data = dict(user_input)
+            for key in (
+                CONF_ENCRYPTION_KEY,
+                CONF_DEVICE_MODEL,
+                CONF_MODEL_ID,
+                CONF_FIRMWARE_VERSION,
+            ):
+                if info.get(key):
+                    data[key] = info[key]
+            return self.async_create_entry(title=info["title"], data=data)
+
+        # Reordered except blocks: AbortFlow first
+        except data_entry_flow.AbortFlow as af:  # Use data_entry_flow.AbortFlow
+            _LOGGER.info("Config flow aborted: %s", af.reason)
+            # Re-raise AbortFlow to let HA handle it (shows the abort message)
+            raise af
+        except CannotConnect:
+            errors["base"] = "cannot_connect"
+        except InvalidAuth:
+            errors["base"] = "invalid_auth"
+        except exceptions.HomeAssistantError as e:  # Catch other HA errors
+            _LOGGER.error("Config flow error: %s", e)
+            errors["base"] = "unknown"  # Default for now
+        # Broad exception catch as a fallback for the whole user step
+        except Exception as e: # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected exception in config flow: %s", e)
+            errors["base"] = "unknown"
+
+        # Show the form to the user again, pre-filled
+        _LOGGER.info("GreeV2 Config Flow: Showing %s form. Errors: %s", step_id, errors)
+        return self.async_show_form(
+            step_id=step_id, data_schema=data_schema, errors=errors
+        )
+
+
+async def _async_identify(host: str, mac: str) -> dict[str, str]:
+    """Return the model and firmware a device reports in its scan reply.
+
+    They key the shared capability profiles, so devices added by hand get one
+    too. Returns an empty dict if the device does not answer the scan.
+    """
+    try:
+        devices = await async_scan(host, window=IDENTIFY_SCAN_WINDOW)
+    except (ValueError, OSError) as e:
+        _LOGGER.debug("Could not scan %s for its model and firmware: %s", host, e)
+        return {}
+    for device in devices:
+        if format_mac(device.mac) == mac:
+            return {
+                CONF_DEVICE_MODEL: device.model,
+                CONF_MODEL_ID: device.model_id,
+                CONF_FIRMWARE_VERSION: device.firmware,
+            }
+    _LOGGER.debug("%s (%s) did not answer the scan for its firmware", host, mac)
+    return {}
+
+
+def _device_input(device: DiscoveredDevice) -> dict:
+    """Return the config entry fields learned from a scan reply."""
+    return {
+        CONF_HOST: device.host,
+        CONF_MAC: format_mac(device.mac),
+        CONF_NAME: device.name,
+        CONF_ENCRYPTION_VERSION: str(device.encryption_version),
+        CONF_DEVICE_MODEL: device.model,
+        CONF_MODEL_ID: device.model_id,
+        CONF_FIRMWARE_VERSION: device.firmware,
+    }
+
 
 _LOGGER.info("GreeV2 Config Flow module loaded.")
 
@@ -1,7 +1,7 @@
 """Constants for the Gree Climate V2 integration."""
 
 from datetime import timedelta
-from typing import List
+from typing import Dict, List, Tuple
 
 from homeassistant.components.climate import ClimateEntityFeature, HVACMode
 # Removed unused UnitOfTemperature import
@@ -25,6 +25,36 @@ DEFAULT_DISABLE_AVAILABILITY_CHECK: bool = (
 )
 DEFAULT_MAX_ONLINE_ATTEMPTS: int = 3  # Default based on previous YAML schema
 
+# Discovery
+DEFAULT_SCAN_WINDOW: float = 3.0  # Seconds to collect scan replies
+IDENTIFY_SCAN_WINDOW: float = 1.0  # Seconds to wait for a bound device to answer a scan
+DEFAULT_BROADCAST_ADDRESS: str = "255.255.255.255"
+MAX_SWEEP_HOSTS: int = 1024  # Largest CIDR (a /22) swept with unicast scans
+
+# Adaptive timeout budgets (floor, ceiling) in seconds per operation.
+# The ceiling is also capped by the timeout the API was created with.
+OPERATION_BIND: str = "bind"
+OPERATION_STATUS: str = "status"
+OPERATION_COMMAND: str = "command"
+TIMEOUT_BUDGETS: Dict[str, Tuple[float, float]] = {
+    OPERATION_BIND: (1.0, 4.0),
+    OPERATION_STATUS: (0.5, 5.0),
+    OPERATION_COMMAND: (0.5, 5.0),
+}
+
+# Optional status columns probed once per device; extend to detect more features
+CAPABILITY_COLUMNS: Tuple[str, ...] = (
+    "TemSen",  # Internal temperature sensor
+    "AntiDirectBlow",
+    "LigSen",  # Light sensor
+    "Dwet",  # Dehumidifier target humidity
+    "TemRec",
+    "HeatCoolType",
+)
+PROBE_BASELINE_COLUMN: str = "Pow"  # Every device answers this column
+CAPABILITY_STORAGE_KEY: str = f"{DOMAIN}.capabilities"
+CAPABILITY_STORAGE_VERSION: int = 1
+CAPABILITY_SAVE_DELAY: int = 10  # Seconds; batches saves while a fleet starts
 
 # Configuration constants
 CONF_NAME: str = "name"
@@ -33,6 +63,8 @@ CONF_PORT: str = "port"
 CONF_TEMP_SENSOR: str = "temp_sensor"
 
 CONF_DEVICE_MODEL: str = "device_model"
+CONF_MODEL_ID: str = "model_id"
+CONF_FIRMWARE_VERSION: str = "firmware_version"
 CONF_MAC: str = "mac"
 CONF_TIMEOUT: str = "timeout"
 
@@ -64,6 +96,110 @@ TEMP_OFFSET: int = 40  # Offset used for internal temperature sensor readings
 # Update interval
 SCAN_INTERVAL: timedelta = timedelta(seconds=DEFAULT_SCAN_INTERVAL_SECONDS)
 
+# Fleet polling
+MAX_CONCURRENT_POLLS: int = 8  # Devices polled at once across every entry
+REQUEST_REFRESH_COOLDOWN: float = 1.0  # Seconds; merges bursts of refresh requests
+
+# Outbound packet budget shared by every device (token bucket)
+PACKET_RATE: float = 20.0  # Packets per second
+PACKET_BURST: int = 10
+
+# Receive buffer of the shared endpoint, allocated once; Gree replies are
+# about 1 KB, larger datagrams are dropped
+RECEIVE_BUFFER_SIZE: int = 8192
+
+# Poll scheduling: each device polls on its own slot within the interval
+# (phase from its MAC), plus up to this fraction of the interval of jitter
+POLL_JITTER: float = 0.05
+
+# Commands issued within this many seconds of each other share one packet
+COMMAND_COALESCE_WINDOW: float = 0.25
+
+# Status values younger than this many seconds are answered from the last
+# response instead of sending another status request
+STATUS_FRESHNESS_TTL: float = 1.0
+
+# Circuit breaker: after this many unanswered requests in a row a device gets
+# no traffic until a single-packet probe (BREAKER_PROBE_TIMEOUT) answers;
+# probes are spaced BREAKER_BASE_DELAY apart, doubling up to BREAKER_MAX_DELAY
+BREAKER_FAILURE_THRESHOLD: int = 3
+BREAKER_BASE_DELAY: float = 15.0
+BREAKER_MAX_DELAY: float = 600.0
+BREAKER_PROBE_TIMEOUT: float = 1.0
+
+# Encrypted request packets kept per device (status column sets and recent
+# commands); requests with the same key and content encrypt identically
+PACKET_CACHE_SIZE: int = 32
+
+# Request lanes per device, most urgent first. One request runs at a time;
+# a running poll or probe is interrupted (its status request stopped unless
+# another caller shares it, and re-run later) by a more urgent one.
+PRIORITY_COMMAND: int = 0
+PRIORITY_RECONCILE: int = 1  # Reads confirming a command, and binding
+PRIORITY_POLL: int = 2
+PRIORITY_PROBE: int = 3
+PREEMPTIBLE_PRIORITIES: Tuple[int, ...] = (PRIORITY_POLL, PRIORITY_PROBE)
+# Lane of each operation's packets in the fleet-wide packet budget
+PACKET_PRIORITIES: Dict[str, int] = {
+    OPERATION_COMMAND: PRIORITY_COMMAND,
+    OPERATION_BIND: PRIORITY_RECONCILE,
+    OPERATION_STATUS: PRIORITY_POLL,
+}
+
+# Adaptive polling (seconds): fast after activity, stepping back while stable,
+# exponential back-off while a device does not answer
+POLL_INTERVAL_FAST: float = 5.0
+POLL_FAST_WINDOW: float = 60.0  # How long to poll fast after a command or change
+POLL_INTERVAL_STEPS: Tuple[float, ...] = (15.0, 30.0, 60.0, 120.0, 180.0)
+POLL_OFFLINE_BASE: float = 30.0
+POLL_OFFLINE_MAX: float = 600.0
+# Readings that drift on their own; a change in these is not user activity
+POLL_VOLATILE_COLUMNS: Tuple[str, ...] = ("TemSen", "LigSen")
+
+# Column polling tiers. Every column is fetched on the first poll (and the
+# first poll after the device stopped answering); afterwards:
+TIER_EVERY: str = "every"  # On every poll
+TIER_SLOW: str = "slow"  # On every POLL_SLOW_EVERY-th poll
+TIER_STARTUP: str = "startup"  # Never again
+TIER_COMMAND: str = "command"  # Only after a command touching a related column
+POLL_SLOW_EVERY: int = 5
+COLUMN_TIERS: Dict[str, str] = {  # Columns not listed are polled every time
+    "Pow": TIER_EVERY,
+    "Mod": TIER_EVERY,
+    "SetTem": TIER_EVERY,
+    "WdSpd": TIER_EVERY,
+    "Tur": TIER_EVERY,
+    "Quiet": TIER_EVERY,
+    "StHt": TIER_EVERY,
+    "TemSen": TIER_EVERY,
+    "Air": TIER_SLOW,
+    "Blo": TIER_SLOW,
+    "Health": TIER_SLOW,
+    "SwhSlp": TIER_SLOW,
+    "SlpMod": TIER_SLOW,
+    "Lig": TIER_SLOW,
+    "SvSt": TIER_SLOW,
+    "SwingLfRig": TIER_SLOW,
+    "SwUpDn": TIER_SLOW,
+    "AntiDirectBlow": TIER_SLOW,
+    "LigSen": TIER_SLOW,
+    "Dwet": TIER_SLOW,
+    "TemUn": TIER_STARTUP,
+    "HeatCoolType": TIER_STARTUP,
+    "TemRec": TIER_COMMAND,
+}
+# Columns the device may change as a side effect of a command on the key column;
+# they (and the commanded columns) are fetched on the next poll
+COMMAND_RELATED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "Pow": ("Mod", "SetTem", "WdSpd"),
+    "Mod": ("SetTem", "WdSpd", "Tur", "Quiet", "StHt"),
+    "SetTem": ("TemRec", "StHt"),
+    "WdSpd": ("Tur", "Quiet"),
+    "Tur": ("WdSpd", "Quiet"),
+    "Quiet": ("WdSpd", "Tur"),
+    "SwhSlp": ("SlpMod",),
+}
+
 # Supported features
 SUPPORT_FLAGS: ClimateEntityFeature = (
     ClimateEntityFeature.TARGET_TEMPERATURE
@@ -121,6 +257,9 @@ PRESET_MODES: List[str] = [
     "Fixed in the rightmost position",
 ]
 
+# Generic ECB key used by V1 devices for binding and scan replies
+GENERIC_KEY: str = "a3K8Bx%2r8Y7#xDh"
+
 # GCM Constants (Used for V2 encryption binding/communication)
 GCM_DEFAULT_KEY: str = "{yxAHAY_Lm6pbC/<"  # Default key for GCM binding based on logs
 GCM_IV: bytes = (
@@ -0,0 +1,246 @@
+"""Fleet polling: one coordinator per device, sharing a concurrency budget."""
+
+import asyncio
+import logging
+import math
+import random
+import time
+import zlib
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    DOMAIN,
+    MAX_CONCURRENT_POLLS,
+    POLL_FAST_WINDOW,
+    POLL_INTERVAL_FAST,
+    POLL_INTERVAL_STEPS,
+    POLL_JITTER,
+    POLL_OFFLINE_BASE,
+    POLL_OFFLINE_MAX,
+    POLL_VOLATILE_COLUMNS,
+    REQUEST_REFRESH_COOLDOWN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_FLEET = f"{DOMAIN}_fleet"
+
+_T = TypeVar("_T")
+
+DeviceData = Dict[str, Any]  # Raw device state returned by a poll
+
+
+class GreeFleet:
+    """Concurrency budget shared by the coordinators of every Gree device."""
+
+    def __init__(self, max_concurrent_polls: int = MAX_CONCURRENT_POLLS) -> None:
+        """Initialize the budget."""
+        self.max_concurrent_polls: int = max_concurrent_polls
+        self._semaphore = asyncio.Semaphore(max_concurrent_polls)
+        self.active_polls: int = 0
+        self.peak_polls: int = 0  # Highest number of polls seen at once
+
+    async def async_run(self, poll: Callable[[], Awaitable[_T]]) -> _T:
+        """Run a poll once a slot in the budget is free."""
+        async with self._semaphore:
+            self.active_polls += 1
+            self.peak_polls = max(self.peak_polls, self.active_polls)
+            try:
+                return await poll()
+            finally:
+                self.active_polls -= 1
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> GreeFleet:
+    """Return the fleet budget shared by every Gree device."""
+    fleet: Optional[GreeFleet] = hass.data.get(DATA_FLEET)
+    if fleet is None:
+        fleet = GreeFleet()
+        hass.data[DATA_FLEET] = fleet
+    return fleet
+
+
+class AdaptiveInterval:
+    """Chooses the delay until the next poll of one device.
+
+    After a command or an observed change the device is polled every `fast`
+    seconds for `fast_window` seconds. While its state is stable the delay
+    walks up `steps`, one step per poll. While it does not answer the delay
+    doubles from `offline_base` up to `offline_max`.
+    """
+
+    def __init__(
+        self,
+        fast: float = POLL_INTERVAL_FAST,
+        fast_window: float = POLL_FAST_WINDOW,
+        steps: Sequence[float] = POLL_INTERVAL_STEPS,
+        offline_base: float = POLL_OFFLINE_BASE,
+        offline_max: float = POLL_OFFLINE_MAX,
+    ) -> None:
+        """Initialize the policy; the first delay is the first stable step."""
+        self.fast: float = fast
+        self.fast_window: float = fast_window
+        self.steps: Sequence[float] = steps
+        self.offline_base: float = offline_base
+        self.offline_max: float = offline_max
+        self._fast_until: float = 0.0
+        self._step: int = 0
+        self.failures: int = 0
+
+    @property
+    def initial(self) -> float:
+        """Return the delay used before the first poll has completed."""
+        return self.steps[0]
+
+    def on_activity(self, now: float) -> float:
+        """Poll fast after a command or a change; return the next delay."""
+        self._fast_until = now + self.fast_window
+        self._step = 0
+        return self.fast
+
+    def on_success(self, now: float, changed: bool) -> float:
+        """Return the next delay after the device answered."""
+        self.failures = 0
+        if changed:
+            return self.on_activity(now)
+        if now < self._fast_until:
+            return self.fast
+        delay = self.steps[self._step]
+        self._step = min(self._step + 1, len(self.steps) - 1)
+        return delay
+
+    def on_failure(self) -> float:
+        """Return the next delay after the device did not answer."""
+        self.failures += 1
+        return min(self.offline_max, self.offline_base * 2 ** (self.failures - 1))
+
+
+def poll_phase(mac: str) -> float:
+    """Return the device's slot within any poll interval, as a fraction [0, 1).
+
+    Derived from the MAC (not Python's salted hash), so a device keeps its
+    slot across reloads and restarts and the fleet stays spread out.
+    """
+    return zlib.crc32(mac.lower().encode("utf8")) / 2**32
+
+
+def next_poll_time(now: float, delay: float, phase: float, jitter: float) -> float:
+    """Return when to poll next: on the device's slot about `delay` from now.
+
+    Slots repeat every `delay` seconds at `phase * delay` on the loop clock;
+    the chosen one is within half a delay of `now + delay`. Up to
+    `jitter * delay` seconds of random jitter are added on top.
+    """
+    offset = phase * delay
+    slot = offset + math.ceil((now + delay / 2 - offset) / delay) * delay
+    return slot + random.uniform(0, jitter * delay)
+
+
+def _state_changed(previous: Optional[DeviceData], current: DeviceData) -> bool:
+    """Return True if a setting differs between two polls (readings excluded)."""
+    if previous is None:
+        return False
+    return any(
+        previous.get(key) != value
+        for key, value in current.items()
+        if key not in POLL_VOLATILE_COLUMNS
+    )
+
+
+class GreeCoordinator(DataUpdateCoordinator[Optional[DeviceData]]):
+    """Owns the polling of one device; its entity subscribes for updates.
+
+    Every poll waits for a slot in the fleet budget. Refreshes that overlap
+    (the scheduled poll, a requested refresh, update_entity) share the poll
+    already in flight instead of sending another status request. The delay
+    to the next poll adapts to the device's activity (see AdaptiveInterval)
+    and lands on the device's slot (see next_poll_time).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        poll: Callable[[], Awaitable[DeviceData]],
+        interval: Optional[AdaptiveInterval] = None,
+        phase: float = 0.0,
+    ) -> None:
+        """Initialize the coordinator; poll fetches and returns the device state.
+
+        poll raises UpdateFailed if the device did not answer.
+        """
+        self.interval = interval or AdaptiveInterval()
+        self.phase: float = phase
+        self.delay: float = self.interval.initial  # Seconds between polls
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=name,
+            update_interval=timedelta(seconds=self.interval.initial),
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=REQUEST_REFRESH_COOLDOWN, immediate=True
+            ),
+        )
+        self._fleet = async_get_fleet(hass)
+        self._poll = poll
+        self._in_flight: Optional["asyncio.Future[DeviceData]"] = None
+        self.merged_refreshes: int = 0
+        self._set_next_delay(self.delay)
+
+    async def _async_update_data(self) -> DeviceData:
+        """Poll the device, or join the poll that is already running."""
+        in_flight = self._in_flight
+        if in_flight is None or in_flight.done():
+            in_flight = asyncio.ensure_future(self._async_poll_and_schedule())
+            in_flight.add_done_callback(self._async_poll_done)
+            self._in_flight = in_flight
+        else:
+            self.merged_refreshes += 1
+            _LOGGER.debug("Joining the poll already in flight for %s", self.name)
+        # Shielded: a cancelled caller must not cancel the poll others wait on
+        return await asyncio.shield(in_flight)
+
+    async def _async_poll_and_schedule(self) -> DeviceData:
+        """Run one poll within the fleet budget and pick the next delay."""
+        try:
+            data = await self._fleet.async_run(self._poll)
+        except Exception:
+            self._set_next_delay(self.interval.on_failure())
+            raise
+        changed = _state_changed(self.data, data)
+        self._set_next_delay(self.interval.on_success(time.monotonic(), changed))
+        return data
+
+    @callback
+    def _async_poll_done(self, future: "asyncio.Future[DeviceData]") -> None:
+        """Forget a finished poll so the next refresh starts a new one."""
+        if self._in_flight is future:
+            self._in_flight = None
+        if not future.cancelled():
+            future.exception()  # Retrieved by the waiters; avoid an orphan warning
+
+    @callback
+    def async_command_sent(self, data: DeviceData) -> None:
+        """Publish the state set by a command and poll fast to confirm it."""
+        self._set_next_delay(self.interval.on_activity(time.monotonic()))
+        self.async_set_updated_data(data)  # Also restarts the poll timer
+
+    def _set_next_delay(self, delay: float) -> None:
+        """Poll next on this device's slot, about delay seconds from now.
+
+        The stock scheduler polls update_interval after the current update,
+        so the interval is set to the time left until the slot (asyncio's
+        loop clock is time.monotonic).
+        """
+        if delay != self.delay:
+            _LOGGER.debug("Next poll of %s in %.0f s", self.name, delay)
+        self.delay = delay
+        now = time.monotonic()
+        when = next_poll_time(now, delay, self.phase, POLL_JITTER)
+        self.update_interval = timedelta(seconds=when - now)
@@ -0,0 +1,193 @@
+"""AES backends for the Gree protocol: ECB (V1) and GCM with a fixed IV (V2).
+
+`cryptography` (OpenSSL) is preferred: its keyed objects are built once per
+key and reused for every packet. pycryptodome is the fallback. device_api
+works with the keyed wrappers (EcbCipher, GcmCipher), which keep the cipher
+methods the protocol code calls.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from Crypto.Cipher import AES
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # pragma: no cover - Home Assistant ships cryptography
+    AESGCM = None
+
+from .const import GCM_ADD, GCM_IV
+
+_LOGGER = logging.getLogger(__name__)
+
+GCM_TAG_SIZE: int = 16
+
+
+class CryptoBackend(ABC):
+    """The AES operations the Gree protocol needs; subclasses implement them."""
+
+    name: str = ""
+
+    @abstractmethod
+    def ecb_encrypt(self, key: bytes, data: bytes) -> bytes:
+        """Encrypt block-aligned data with AES-ECB."""
+
+    @abstractmethod
+    def ecb_decrypt(self, key: bytes, data: bytes) -> bytes:
+        """Decrypt block-aligned data with AES-ECB."""
+
+    @abstractmethod
+    def gcm_seal(self, key: bytes, plaintext: bytes) -> Tuple[bytes, bytes]:
+        """Encrypt with AES-GCM (GCM_IV, GCM_ADD); return (ciphertext, tag)."""
+
+    @abstractmethod
+    def gcm_open(self, key: bytes, ciphertext: bytes, tag: bytes) -> bytes:
+        """Decrypt with AES-GCM; raise ValueError if the tag does not verify."""
+
+
+class PycryptodomeBackend(CryptoBackend):
+    """pycryptodome: GCM objects are single use, so one is built per packet."""
+
+    name = "pycryptodome"
+
+    def __init__(self) -> None:
+        """Initialize the per-key ECB cache."""
+        self._ecb: Dict[bytes, Any] = {}  # ECB objects are stateless
+
+    def _ecb_cipher(self, key: bytes) -> Any:
+        cipher = self._ecb.get(key)
+        if cipher is None:
+            cipher = self._ecb[key] = AES.new(key, AES.MODE_ECB)
+        return cipher
+
+    def ecb_encrypt(self, key: bytes, data: bytes) -> bytes:
+        """Encrypt block-aligned data with AES-ECB."""
+        return self._ecb_cipher(key).encrypt(data)
+
+    def ecb_decrypt(self, key: bytes, data: bytes) -> bytes:
+        """Decrypt block-aligned data with AES-ECB."""
+        return self._ecb_cipher(key).decrypt(data)
+
+    def gcm_seal(self, key: bytes, plaintext: bytes) -> Tuple[bytes, bytes]:
+        """Encrypt with AES-GCM (GCM_IV, GCM_ADD); return (ciphertext, tag)."""
+        cipher = AES.new(key, AES.MODE_GCM, nonce=GCM_IV)
+        cipher.update(GCM_ADD)
+        return cipher.encrypt_and_digest(plaintext)
+
+    def gcm_open(self, key: bytes, ciphertext: bytes, tag: bytes) -> bytes:
+        """Decrypt with AES-GCM; raise ValueError if the tag does not verify."""
+        cipher = AES.new(key, AES.MODE_GCM, nonce=GCM_IV)
+        cipher.update(GCM_ADD)
+        return cipher.decrypt_and_verify(ciphertext, tag)
+
+
+class CryptographyBackend(CryptoBackend):
+    """cryptography (OpenSSL): one keyed object per key, reused per packet."""
+
+    name = "cryptography"
+
+    def __init__(self) -> None:
+        """Initialize the per-key caches (one entry per device key)."""
+        self._ecb: Dict[bytes, Tuple[Any, Any]] = {}
+        self._gcm: Dict[bytes, Any] = {}
+
+    def _ecb_contexts(self, key: bytes) -> Tuple[Any, Any]:
+        # ECB carries no state between blocks, so one encryptor and decryptor
+        # per key serve every packet as long as input is block-aligned
+        contexts = self._ecb.get(key)
+        if contexts is None:
+            cipher = Cipher(algorithms.AES(key), modes.ECB())
+            contexts = self._ecb[key] = (cipher.encryptor(), cipher.decryptor())
+        return contexts
+
+    def _aead(self, key: bytes) -> Any:
+        aead = self._gcm.get(key)
+        if aead is None:
+            aead = self._gcm[key] = AESGCM(key)
+        return aead
+
+    def ecb_encrypt(self, key: bytes, data: bytes) -> bytes:
+        """Encrypt block-aligned data with AES-ECB."""
+        _check_aligned(data)
+        return self._ecb_contexts(key)[0].update(data)
+
+    def ecb_decrypt(self, key: bytes, data: bytes) -> bytes:
+        """Decrypt block-aligned data with AES-ECB."""
+        _check_aligned(data)
+        return self._ecb_contexts(key)[1].update(data)
+
+    def gcm_seal(self, key: bytes, plaintext: bytes) -> Tuple[bytes, bytes]:
+        """Encrypt with AES-GCM (GCM_IV, GCM_ADD); return (ciphertext, tag)."""
+        sealed: bytes = self._aead(key).encrypt(GCM_IV, plaintext, GCM_ADD)
+        return sealed[:-GCM_TAG_SIZE], sealed[-GCM_TAG_SIZE:]
+
+    def gcm_open(self, key: bytes, ciphertext: bytes, tag: bytes) -> bytes:
+        """Decrypt with AES-GCM; raise ValueError if the tag does not verify."""
+        try:
+            return self._aead(key).decrypt(GCM_IV, ciphertext + tag, GCM_ADD)
+        except InvalidTag as err:
+            raise ValueError("MAC check failed") from err
+
+
+def _check_aligned(data: bytes) -> None:
+    """Raise ValueError unless data is a whole number of AES blocks."""
+    if len(data) % 16:
+        raise ValueError("Data must be aligned to block boundary in ECB mode")
+
+
+_BACKEND: Optional[CryptoBackend] = None
+
+
+def available_backends() -> List[CryptoBackend]:
+    """Return a fresh instance of every installed backend, fastest first."""
+    backends: List[CryptoBackend] = []
+    if AESGCM is not None:
+        backends.append(CryptographyBackend())
+    backends.append(PycryptodomeBackend())
+    return backends
+
+
+def get_backend() -> CryptoBackend:
+    """Return the backend shared by every device (the fastest installed)."""
+    global _BACKEND  # pylint: disable=global-statement
+    if _BACKEND is None:
+        _BACKEND = available_backends()[0]
+        _LOGGER.debug("Using the %s AES backend", _BACKEND.name)
+    return _BACKEND
+
+
+class EcbCipher:
+    """AES-ECB bound to one key (the V1 device or generic key)."""
+
+    def __init__(self, key: bytes, backend: Optional[CryptoBackend] = None) -> None:
+        """Bind the key; the shared backend is used unless one is given."""
+        self.key: bytes = key
+        self._backend: CryptoBackend = backend or get_backend()
+
+    def encrypt(self, data: bytes) -> bytes:
+        """Encrypt block-aligned data."""
+        return self._backend.ecb_encrypt(self.key, data)
+
+    def decrypt(self, data: bytes) -> bytes:
+        """Decrypt block-aligned data."""
+        return self._backend.ecb_decrypt(self.key, data)
+
+
+class GcmCipher:
+    """AES-GCM with the protocol's fixed IV and AAD, bound to one key."""
+
+    def __init__(self, key: bytes, backend: Optional[CryptoBackend] = None) -> None:
+        """Bind the key; the shared backend is used unless one is given."""
+        self.key: bytes = key
+        self._backend: CryptoBackend = backend or get_backend()
+
+    def encrypt_and_digest(self, plaintext: bytes) -> Tuple[bytes, bytes]:
+        """Encrypt plaintext; return (ciphertext, tag)."""
+        return self._backend.gcm_seal(self.key, plaintext)
+
+    def decrypt_and_verify(self, ciphertext: bytes, tag: bytes) -> bytes:
+        """Decrypt ciphertext; raise ValueError if the tag does not verify."""
+        return self._backend.gcm_open(self.key, ciphertext, tag)
@@ -1,24 +1,35 @@
 """Handles direct communication (UDP) with Gree V2 climate devices."""
 
+import asyncio
 import base64
 import json
 import logging
+import random
 import socket
-from typing import Any, Dict, List, Optional, Tuple  # Removed unused Union
-
-# Third-party imports
-from Crypto.Cipher import AES
-
-# Removed incorrect AESCipher import
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 # Home Assistant imports
 from homeassistant.components.climate import HVACMode  # Corrected import path
 
 # Local imports
 from . import const # Moved import to top
-
-# Simplify CipherType to Any for broader compatibility, or use specific types
-# from Crypto.Cipher.AES import AESCipher # Example if using specific type
+from .breaker import STATE_CLOSED, STATE_OPEN, CircuitBreaker
+from .codec import (
+    check_number,
+    decode_envelope,
+    decode_pack,
+    dumps,
+    encode_envelope,
+    pad,
+)
+from .crypto import EcbCipher, GcmCipher
+from .rtt import RttEstimator
+from .transport import StaleDatagramError, async_get_endpoint
+
+# EcbCipher or GcmCipher (see crypto.py); Any so tests can pass mocks
 CipherType = Any
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,6 +37,138 @@ _LOGGER = logging.getLogger(__name__)
 # Import constants - Removed from here
 
 
+class DecryptionError(ValueError):
+    """Raised when a reply cannot be decrypted or verified with the current key."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retransmission policy for one operation.
+
+    Retries use exponential backoff with jitter and all of them, including the
+    per-attempt timeouts, must fit inside `deadline` seconds.
+    """
+
+    attempts: int  # Total transmissions, including the first
+    base_delay: float  # Delay before the first retransmission
+    max_delay: float
+    deadline: float
+    jitter: float = 0.5  # Fraction of the delay that is randomized
+    hedge: bool = False  # Duplicate the request halfway through each attempt
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Return the jittered delay before the given retransmission (1-based)."""
+        delay: float = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1)
+
+
+# Status reads are idempotent: retry fast and hedge. Commands set absolute
+# values and retransmissions share one in-flight request, so a late ack for
+# an earlier copy cannot be applied twice. Binding backs off slowly.
+DEFAULT_RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    const.OPERATION_STATUS: RetryPolicy(
+        attempts=3, base_delay=0.05, max_delay=0.5, deadline=const.DEFAULT_TIMEOUT, hedge=True
+    ),
+    const.OPERATION_COMMAND: RetryPolicy(
+        attempts=3, base_delay=0.1, max_delay=1.0, deadline=const.DEFAULT_TIMEOUT
+    ),
+    const.OPERATION_BIND: RetryPolicy(
+        attempts=3, base_delay=1.0, max_delay=4.0, deadline=const.DEFAULT_TIMEOUT
+    ),
+}
+
+# A half-open circuit breaker checks the device with one short status packet
+PROBE_RETRY_POLICY = RetryPolicy(
+    attempts=1, base_delay=0.0, max_delay=0.0, deadline=const.BREAKER_PROBE_TIMEOUT
+)
+PROBE_COLUMNS: List[str] = ["Pow"]
+
+
+# Fields kept from each reply pack type; the rest of the pack is dropped
+REPLY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "dat": ("t", "mac", "r", "cols", "dat"),
+    "res": ("t", "mac", "r", "opt", "p", "val"),
+    "bindok": ("t", "mac", "r", "key"),
+}
+
+
+@dataclass(frozen=True)
+class ExpectedReply:
+    """Describes the reply that answers an in-flight request.
+
+    Gree firmware does not echo a request id (the envelope `i` field selects the
+    generic vs. device key), so replies are correlated on the decrypted pack type
+    and on the column/option list the device echoes back.
+    """
+
+    pack_type: str  # "dat" (status), "res" (command) or "bindok" (bind)
+    echo_field: Optional[str] = None  # "cols" for status, "opt" for commands
+    echo_values: Optional[Tuple[str, ...]] = None
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Return the pack fields the caller of this request reads."""
+        return REPLY_FIELDS.get(self.pack_type, ("t",))
+
+    @property
+    def operation(self) -> str:
+        """Return the operation (timeout budget) this reply belongs to."""
+        if self.pack_type == "bindok":
+            return const.OPERATION_BIND
+        if self.pack_type == "res":
+            return const.OPERATION_COMMAND
+        return const.OPERATION_STATUS
+
+    def check(self, pack: Dict[str, Any]) -> None:
+        """Raise StaleDatagramError if the decrypted pack answers another request."""
+        if pack.get("t") != self.pack_type:
+            raise StaleDatagramError(
+                f"expected '{self.pack_type}' reply, got '{pack.get('t')}'"
+            )
+        if self.echo_field is None or self.echo_field not in pack:
+            return  # Firmware that does not echo the field cannot be checked further
+        echoed = pack[self.echo_field]
+        if not isinstance(echoed, list) or tuple(echoed) != self.echo_values:
+            raise StaleDatagramError(
+                f"reply '{self.echo_field}' {echoed} does not match request"
+            )
+
+
+@dataclass
+class _StatusFlight:
+    """A status request shared by every caller that needs its columns."""
+
+    columns: List[str]
+    future: "asyncio.Future[Optional[Dict[str, Any]]]"
+    generation: int
+    sent: bool = False
+    exact: bool = False  # Goes out with exactly its columns; never widened
+    waiters: int = 0  # Callers still waiting for the result
+    task: Optional["asyncio.Future[None]"] = None
+
+
+def parse_command_response(
+    response: Optional[Dict[str, Any]], opt_keys: List[str]
+) -> Optional[Dict[str, Any]]:
+    """Return the column values a command reply (`t: res`) confirms.
+
+    The reply echoes `opt` with the applied values in `val` (older firmware
+    only echoes `p`). Returns None if the reply reports an error or carries
+    no values that can be matched to the columns.
+    """
+    if not response or response.get("r", 200) != 200:
+        return None
+    columns = response.get("opt", opt_keys)
+    values = response.get("val", response.get("p"))
+    if (
+        not isinstance(columns, list)
+        or not isinstance(values, list)
+        or len(columns) != len(values)
+    ):
+        return None
+    return dict(zip(columns, values))
+
+
 class GreeDeviceApi:
     """Handles communication with a Gree device."""
 
@@ -33,7 +176,9 @@ class GreeDeviceApi:
     _host: str
     _port: int
     _mac: str
-    _timeout: int
+    _timeout: float
+    _rtt: Dict[str, RttEstimator]
+    _retry_policies: Dict[str, RetryPolicy]
     _encryption_key: Optional[bytes]
     _encryption_version: int
     _cipher: Optional[CipherType]  # Type hint for the cipher object
@@ -45,11 +190,17 @@ class GreeDeviceApi:
         host: str,
         port: int,
         mac: str,
-        timeout: int,
+        timeout: float,
         encryption_key: Optional[bytes] = None,
         encryption_version: int = 1,
+        retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+        status_ttl: float = const.STATUS_FRESHNESS_TTL,
     ) -> None:
-        """Initialize the API."""
+        """Initialize the API.
+
+        status_ttl is how long (seconds) a status value is served from the last
+        response instead of asking the device again.
+        """
         _LOGGER.debug(
             "Initializing GreeDeviceApi for host %s (version %s)",
             host,
@@ -59,16 +210,32 @@ class GreeDeviceApi:
         self._port = port
         self._mac = mac
         self._timeout = timeout
+        # One RTT estimator per operation, each with its own timeout budget
+        self._rtt = {
+            operation: RttEstimator(min(floor, timeout), min(ceiling, timeout))
+            for operation, (floor, ceiling) in const.TIMEOUT_BUDGETS.items()
+        }
+        self._retry_policies = {**DEFAULT_RETRY_POLICIES, **(retry_policies or {})}
         self._encryption_key = encryption_key
         self._encryption_version = encryption_version
         self._cipher = None
+        self.status_ttl = status_ttl
+        self._status_cache: Dict[str, Tuple[float, Any]] = {}  # Column: (time, value)
+        self._status_flights: List[_StatusFlight] = []
+        self._status_generation = 0  # Bumped whenever cached status goes stale
+        self.status_cache_hits = 0
+        self.status_requests_shared = 0
+        self.breaker = CircuitBreaker()
+        # Encrypted request packets, least recently used first
+        self._packets: "OrderedDict[Tuple[Any, ...], bytes]" = OrderedDict()
+        self.packet_cache_hits = 0
+        self._breaker_probe: Optional["asyncio.Future[Optional[List[Any]]]"] = None
         # self._is_bound initialized earlier
 
         if self._encryption_key:
             self._is_bound = True  # If a key is provided, assume it's bound
             if self._encryption_version == 1:
-                # Type checker might complain if AESCipherECB wasn't imported, but Any works
-                self._cipher = AES.new(self._encryption_key, AES.MODE_ECB)
+                self._cipher = EcbCipher(self._encryption_key)
                 _LOGGER.debug(
                     "Initialized with V1 key, cipher created, marked as bound."
                 )
@@ -83,32 +250,22 @@ class GreeDeviceApi:
     async def _bind_and_get_key_v1(self) -> bool:
         """Retrieve device encryption key (V1/ECB)."""
         _LOGGER.info("Attempting V1 (ECB) binding to retrieve encryption key.")
-        GENERIC_GREE_DEVICE_KEY: str = "a3K8Bx%2r8Y7#xDh"  # Specific to V1 binding
         try:
-            # Create cipher with generic key
-            generic_cipher: CipherType = AES.new(
-                GENERIC_GREE_DEVICE_KEY.encode("utf8"), AES.MODE_ECB
-            )
+            # Create cipher with generic key (specific to V1 binding)
+            generic_cipher: CipherType = EcbCipher(const.GENERIC_KEY.encode("utf8"))
             # Prepare bind payload
-            bind_payload: str = '{"mac":"' + str(self._mac) + '","t":"bind","uid":0}'
-            padded_data: bytes = self._pad(bind_payload).encode("utf8")
-            encrypted_pack_bytes: bytes = generic_cipher.encrypt(padded_data)
+            bind_payload: bytes = dumps({"mac": str(self._mac), "t": "bind", "uid": 0})
+            encrypted_pack_bytes: bytes = generic_cipher.encrypt(pad(bind_payload))
             pack: str = base64.b64encode(encrypted_pack_bytes).decode("utf-8")
-            json_payload_to_send: str = (
-                '{"cid": "app","i": 1,"pack": "'
-                + pack
-                + '","t":"pack","tcid":"'
-                + str(self._mac)
-                + '","uid": 0}'
-            )
+            json_payload_to_send: bytes = encode_envelope(pack, str(self._mac), i=1)
             # Fetch result using generic cipher
             result: Dict[str, Any] = await self._fetch_result(
-                generic_cipher, json_payload_to_send
+                generic_cipher, json_payload_to_send, ExpectedReply("bindok")
             )
             new_key_str: str = result["key"]
             self._encryption_key = new_key_str.encode("utf8")
             # Update the internal cipher instance
-            self._cipher = AES.new(self._encryption_key, AES.MODE_ECB)
+            self._cipher = EcbCipher(self._encryption_key)
             self._is_bound = True
             _LOGGER.info("V1 (ECB) binding successful. Key: %s", self._encryption_key)
             return True
@@ -132,28 +289,18 @@ class GreeDeviceApi:
         # Use the default GCM key from const for binding
         generic_gcm_key: bytes = const.GCM_DEFAULT_KEY.encode("utf8")
         try:
-            plaintext: str = (
-                '{"cid":"'
-                + str(self._mac)
-                + '", "mac":"'
-                + str(self._mac)
-                + '","t":"bind","uid":0}'
+            plaintext: bytes = dumps(
+                {"cid": str(self._mac), "mac": str(self._mac), "t": "bind", "uid": 0}
             )
             # Encrypt using generic key
             pack, tag = self._encrypt_gcm(generic_gcm_key, plaintext)
-            json_payload_to_send: str = (
-                '{"cid": "app","i": 1,"pack": "'
-                + pack
-                + '","t":"pack","tcid":"'
-                + str(self._mac)
-                + '","uid": 0, "tag" : "'
-                + tag
-                + '"}'
+            json_payload_to_send: bytes = encode_envelope(
+                pack, str(self._mac), tag, i=1
             )
             # Get GCM cipher using the generic key for fetching the result
             cipher_gcm: CipherType = self._get_gcm_cipher(generic_gcm_key)
             result: Dict[str, Any] = await self._fetch_result(
-                cipher_gcm, json_payload_to_send
+                cipher_gcm, json_payload_to_send, ExpectedReply("bindok")
             )
             new_key_str: str = result["key"]
             self._encryption_key = new_key_str.encode("utf8")
@@ -180,6 +327,9 @@ class GreeDeviceApi:
         if self._is_bound:
             _LOGGER.debug("API already bound.")
             return True
+        if not await self._async_breaker_allows():
+            _LOGGER.debug("Not binding: %s is unreachable.", self._host)
+            return False
 
         _LOGGER.info(
             "Attempting to bind and get encryption key (Version: %s)",
@@ -207,63 +357,188 @@ class GreeDeviceApi:
 
         return self._is_bound  # Return the final bound state
 
-    # Pad helper method to help us get the right string for encrypting
-    def _pad(self, s: str) -> str:
-        """Pads the string s to a multiple of the AES block size (16)."""
-        aes_block_size: int = 16
-        return s + (aes_block_size - len(s) % aes_block_size) * chr(
-            aes_block_size - len(s) % aes_block_size
-        )
-
     async def _fetch_result(
-        self, cipher: CipherType, json_payload: str
+        self,
+        cipher: CipherType,
+        json_payload: bytes,
+        expected: ExpectedReply,
+        policy: Optional[RetryPolicy] = None,
+        count_failures: bool = True,
     ) -> Dict[str, Any]:
-        """Sends a JSON payload to the device and returns the decrypted response pack."""
+        """Sends a JSON payload to the device and returns the decrypted response pack.
+
+        Datagrams that do not answer this request (late replies to an earlier
+        timed-out request, duplicates, other packet types) are dropped by the
+        shared endpoint and the request keeps waiting.
+        """
         _LOGGER.debug(
-            "Fetching from %s:%s with timeout %s",
+            "Fetching from %s:%s with timeout %.3fs",
             self._host,
             self._port,
-            self._timeout,
+            self._rtt[expected.operation].timeout,
         )
+        # Keyed ciphers (crypto.py) are reusable: every candidate reply
+        # (duplicates, late replies) is decrypted with the same one.
+        def accept(data: memoryview) -> Dict[str, Any]:
+            return self._decode_response(cipher, data, expected)
+
         # Note: Socket/JSON/Decryption errors are handled by caller or specific except blocks below.
-        client_sock: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        client_sock.settimeout(self._timeout)
-        data: bytes = b""
+        # The asyncio transport raises TimeoutError (== socket.timeout) on timeout.
+        return await self._request_with_retries(
+            json_payload, accept, expected.operation, policy, count_failures
+        )
+
+    async def _request_with_retries(
+        self,
+        payload: bytes,
+        accept: Callable[[memoryview], Any],
+        operation: str,
+        policy: Optional[RetryPolicy] = None,
+        count_failures: bool = True,
+    ) -> Dict[str, Any]:
+        """Sends a request, retransmitting it according to the operation's policy.
+
+        All transmissions share one in-flight request, so a reply to any copy
+        completes it exactly once and duplicate replies are dropped as late.
+        Whether the device answered is fed to the circuit breaker; with
+        count_failures=False only an answer is (firmware may drop the request).
+        """
+        policy = policy or self._retry_policies[operation]
+        estimator: RttEstimator = self._rtt[operation]
+        priority: int = const.PACKET_PRIORITIES[operation]
+        endpoint = await async_get_endpoint()
+        request = await endpoint.async_open_request(
+            self._host, self._port, self._mac, accept
+        )
+        reply: "asyncio.Future[Any]" = request.waiter
+        awaiting_reply: bool = False
+        linger: float = 0.0
+        try:
+            async with asyncio.timeout(min(policy.deadline, self._timeout)):
+                for attempt in range(policy.attempts):
+                    if attempt:
+                        # Back off, but take a late reply to an earlier copy meanwhile
+                        await asyncio.wait((reply,), timeout=policy.backoff_delay(attempt))
+                        if reply.done():
+                            break
+                        _LOGGER.debug(
+                            "Retrying %s request to %s (attempt %d/%d)",
+                            operation,
+                            self._host,
+                            attempt + 1,
+                            policy.attempts,
+                        )
+                    attempt_timeout: float = estimator.timeout
+                    await endpoint.async_send(request, payload, priority)
+                    awaiting_reply = True
+                    if policy.hedge:
+                        # Hedge: duplicate the request halfway through the timeout
+                        await asyncio.wait((reply,), timeout=attempt_timeout / 2)
+                        if not reply.done():
+                            await endpoint.async_send(request, payload, priority)
+                            await asyncio.wait((reply,), timeout=attempt_timeout / 2)
+                    else:
+                        await asyncio.wait((reply,), timeout=attempt_timeout)
+                    if reply.done():
+                        break
+                    awaiting_reply = False
+                    estimator.on_timeout()
+                else:
+                    raise TimeoutError(
+                        f"No reply to {operation} after {policy.attempts} attempts"
+                    )
+        except TimeoutError:
+            if awaiting_reply and not reply.done():
+                # The deadline cut the last attempt short
+                estimator.on_timeout()
+            if count_failures:
+                self.breaker.record_failure()
+            raise
+        except OSError:
+            if count_failures:
+                self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # Abandoned (e.g. preempted by a command): drop the replies its
+            # copies still draw for one RTO, not hand them to the next request
+            linger = estimator.timeout
+            raise
+        finally:
+            endpoint.close_request(request, linger)
+
+        self.breaker.record_success()
+        loaded_json_pack: Dict[str, Any] = reply.result()
+        # Karn's algorithm: only unambiguous (single transmission) samples count
+        if request.transmissions == 1:
+            estimator.add_sample(time.monotonic() - request.sent_at)
+        return loaded_json_pack
+
+    @property
+    def rtt_diagnostics(self) -> Dict[str, Dict[str, Any]]:
+        """Return the RTT estimator state per operation, for diagnostics."""
+        return {operation: rtt.as_dict() for operation, rtt in self._rtt.items()}
+
+    async def _async_breaker_allows(self) -> bool:
+        """Return True if a request may be sent to the device now.
+
+        While the breaker is open this answers at once, without any traffic.
+        Once it is half-open the first caller sends a one-packet probe and
+        everyone waiting shares its outcome. Without a key there is nothing to
+        probe with, so a bind attempt is let through to act as the probe.
+        """
+        state: str = self.breaker.state()
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_OPEN:
+            self.breaker.rejected += 1
+            _LOGGER.debug("Circuit open for %s; request not sent", self._host)
+            return False
+        if self._breaker_probe is None:
+            if not self._is_bound:
+                return True
+            _LOGGER.debug("Probing %s to close its circuit", self._host)
+            self._breaker_probe = asyncio.ensure_future(
+                self._async_fetch_status(PROBE_COLUMNS, PROBE_RETRY_POLICY)
+            )
+        probe = self._breaker_probe
         try:
-            client_sock.sendto(bytes(json_payload, "utf-8"), (self._host, self._port))
-            data, _ = client_sock.recvfrom(64000)
+            await asyncio.shield(probe)
+        except Exception:  # pylint: disable=broad-except
+            pass  # Whatever the probe raised, the breaker holds the verdict
         finally:
-            client_sock.close()
+            if self._breaker_probe is probe and probe.done():
+                self._breaker_probe = None
+        return self.breaker.state() == STATE_CLOSED
+
+    def _decode_response(
+        self,
+        cipher: CipherType,
+        data: Union[bytes, memoryview],
+        expected: Optional[ExpectedReply],
+    ) -> Dict[str, Any]:
+        """Decrypts a raw response datagram and checks it answers the request.
 
-        received_json: Dict[str, Any] = json.loads(data)
-        pack: str = received_json["pack"]
-        base64decoded_pack: bytes = base64.b64decode(pack)
+        Raises StaleDatagramError if the reply is valid but belongs to another request.
+        """
+        # pack and tag are base64-decoded from views of the receive buffer
+        base64decoded_pack, tag = decode_envelope(data)
 
         # Decryption logic
         decrypted_pack: bytes = b""
         if self._encryption_version == 1:
-            # Use the stored ECB cipher
-            if not self._cipher:
-                # This assumes the key/cipher was set via GetDeviceKey previously
-                _LOGGER.error("ECB Cipher not initialized for V1 encryption!")
-                # Attempting to create on the fly below, or raise ValueError if key missing.
-                # For now, try creating it on the fly if key exists
-                if self._encryption_key:
-                    _LOGGER.warning("Attempting to create ECB cipher on the fly.")
-                    self._cipher = AES.new(self._encryption_key, AES.MODE_ECB)
-                else:
-                    # Cannot proceed without key/cipher
-                    raise ValueError("Cannot decrypt V1 data: key/cipher missing.")
-            # Assuming self._cipher is EcbMode or compatible
-            decrypted_pack = self._cipher.decrypt(base64decoded_pack)
+            # Use the ECB cipher passed in (generic cipher while binding, device cipher after)
+            ecb_cipher: Optional[CipherType] = cipher or self._cipher
+            if not ecb_cipher:
+                # Cannot proceed without key/cipher
+                raise ValueError("Cannot decrypt V1 data: key/cipher missing.")
+            decrypted_pack = ecb_cipher.decrypt(base64decoded_pack)
         elif self._encryption_version == 2:
             # Need the GCM cipher passed in (which is the 'cipher' argument).
             # This cipher was created using the appropriate key (generic key for binding,
             # or the device key for subsequent commands/status).
             # Do NOT check self._encryption_key here, as it might be None during binding.
-            # For now, assume the passed 'cipher' arg IS the correct GCM cipher for decrypt
-            tag_b64: str = received_json["tag"]
-            tag: bytes = base64.b64decode(tag_b64)
+            if tag is None:
+                raise KeyError("tag")
             # Explicitly try the decryption/verification step
             try:
                 _LOGGER.debug("Attempting GCM decrypt_and_verify...")
@@ -274,48 +549,88 @@ class GreeDeviceApi:
                 _LOGGER.error(
                     "GCM decryption/verification failed: %s", e, exc_info=True
                 )
-                # Re-raise the error to be caught by the caller (_fetch_result's caller)
-                raise  # Re-raise the ValueError
+                # Re-raise to be caught by the caller (_fetch_result's caller)
+                raise DecryptionError(f"GCM verification failed: {e}") from e
         else:
             raise ValueError(
                 f"Unsupported encryption version: {self._encryption_version}"
             )
 
-        # Decode and remove padding/trailing characters
-        decoded_pack: str = decrypted_pack.decode("utf-8")
-        # This stripping logic might be fragile, needs review
-        # Find the last '}' and strip everything after it
-        last_brace_index: int = decoded_pack.rfind("}")
-        if last_brace_index != -1:
-            replaced_pack: str = decoded_pack[: last_brace_index + 1]
-        else:
-            # Handle case where '}' is not found, though unlikely for valid JSON
-            replaced_pack = decoded_pack
-
-        # Remove potential padding characters like \x0f more robustly if needed
-        # replaced_pack = replaced_pack.rstrip('\x0f') # Example if needed
-
-        loaded_json_pack: Dict[str, Any] = json.loads(replaced_pack)
+        # Strip the padding and parse the JSON straight from the bytes
+        try:
+            loaded_json_pack: Dict[str, Any] = decode_pack(
+                decrypted_pack, expected.fields if expected is not None else None
+            )
+        except ValueError as e:  # Includes UnicodeDecodeError and JSONDecodeError
+            # An ECB pack decrypted with the wrong key decodes to garbage
+            raise DecryptionError(f"Undecodable pack: {e}") from e
+        if expected is not None:
+            expected.check(loaded_json_pack)
         return loaded_json_pack
 
     def _get_gcm_cipher(
         self, key: bytes
     ) -> CipherType:  # Return type depends on fallback
-        """Creates a GCM cipher instance with the specified key."""
-        cipher: CipherType = AES.new(key, AES.MODE_GCM, nonce=const.GCM_IV)
-        # AES.update is part of the cipher object protocol
-        cipher.update(const.GCM_ADD)
-        return cipher
+        """Creates a GCM cipher (fixed GCM_IV and GCM_ADD) for the specified key."""
+        return GcmCipher(key)
 
-    def _encrypt_gcm(self, key: bytes, plaintext: str) -> Tuple[str, str]:
+    def _encrypt_gcm(self, key: bytes, plaintext: bytes) -> Tuple[str, str]:
         """Encrypts plaintext using GCM and returns base64 encoded pack and tag."""
         cipher: CipherType = self._get_gcm_cipher(key)
-        # AES.encrypt_and_digest is part of the cipher object protocol
-        encrypted_data, tag = cipher.encrypt_and_digest(plaintext.encode("utf8"))
+        encrypted_data, tag = cipher.encrypt_and_digest(plaintext)
         pack_b64: str = base64.b64encode(encrypted_data).decode("utf-8")
         tag_b64: str = base64.b64encode(tag).decode("utf-8")
         return (pack_b64, tag_b64)
 
+    def _request_cipher(self, action: str) -> Optional[CipherType]:
+        """Return the cipher for a request's reply, or None if it cannot be sent."""
+        if self._encryption_version == 1:
+            if not self._cipher:
+                _LOGGER.error("Cannot %s: V1 ECB cipher not initialized.", action)
+                return None
+            return self._cipher  # ECB ciphers are stateless and can be reused
+        if self._encryption_version == 2:
+            if not self._encryption_key:
+                _LOGGER.error("Cannot %s: V2 encryption key missing.", action)
+                return None
+            return self._get_gcm_cipher(self._encryption_key)
+        _LOGGER.error(
+            "Unsupported encryption version: %s. Cannot %s.",
+            self._encryption_version,
+            action,
+        )
+        return None
+
+    def _encrypt_packet(self, plaintext: bytes) -> bytes:
+        """Encrypt a request with the device key into its envelope."""
+        if self._encryption_version == 1:
+            encrypted_pack_bytes: bytes = self._cipher.encrypt(pad(plaintext))  # type: ignore[union-attr]
+            encrypted_pack: str = base64.b64encode(encrypted_pack_bytes).decode("utf-8")
+            return encode_envelope(encrypted_pack, str(self._mac))
+        pack, tag = self._encrypt_gcm(self._encryption_key, plaintext)  # type: ignore[arg-type]
+        return encode_envelope(pack, str(self._mac), tag)
+
+    def _cached_packet(
+        self, request: Tuple[Any, ...], plaintext: Callable[[], bytes]
+    ) -> bytes:
+        """Return the encrypted packet for a request, building it on a miss.
+
+        ECB and GCM with the fixed GCM_IV encrypt a given plaintext to the same
+        packet every time, so packets are kept in an LRU keyed by the key,
+        the encryption version and the request (kind plus columns/values).
+        """
+        cache_key = (self._encryption_key, self._encryption_version, request)
+        packet: Optional[bytes] = self._packets.get(cache_key)
+        if packet is not None:
+            self._packets.move_to_end(cache_key)
+            self.packet_cache_hits += 1
+            return packet
+        packet = self._encrypt_packet(plaintext())
+        self._packets[cache_key] = packet
+        if len(self._packets) > const.PACKET_CACHE_SIZE:
+            self._packets.popitem(last=False)
+        return packet
+
     # Add methods for binding, sending commands, receiving status, etc.
     async def send_command(
         self, opt_keys: List[str], p_values: List[Any]
@@ -324,6 +639,12 @@ class GreeDeviceApi:
         if not self._is_bound:
             _LOGGER.error("Cannot send command: API is not bound (key missing).")
             return None
+        if not await self._async_breaker_allows():
+            _LOGGER.warning("Cannot send command: %s is unreachable.", self._host)
+            return None
+
+        # Status read before this command no longer describes the device
+        self._invalidate_status()
 
         _LOGGER.debug("Preparing to send command with opt=%s, p=%s", opt_keys, p_values)
 
@@ -352,7 +673,14 @@ class GreeDeviceApi:
                     "Encountered None value in command params, representing as 0."
                 )
                 converted_p_values.append(0)
-            elif isinstance(val, (str, int, float)):
+            elif isinstance(val, str):
+                converted_p_values.append(val)
+            elif isinstance(val, (int, float)):
+                try:
+                    check_number(val)
+                except ValueError as e:
+                    _LOGGER.error("Cannot send command value %r: %s", val, e)
+                    return None
                 converted_p_values.append(val)
             else:
                 _LOGGER.error(
@@ -369,68 +697,34 @@ class GreeDeviceApi:
             "t": "cmd",
         }
 
-        # Construct the inner JSON command payload string using json
+        # Cipher needed for _fetch_result to decrypt the reply
+        cipher_for_fetch: Optional[CipherType] = self._request_cipher("send command")
+        if cipher_for_fetch is None:
+            return None
+
+        # Serialize the inner command pack; a recently repeated command
+        # reuses its encrypted packet
         try:
-            state_pack_json: str = json.dumps(command_payload, separators=(",", ":"))
+            sent_json_payload: bytes = self._cached_packet(
+                # Type-tagged: 25 and 25.0 are equal but serialize differently
+                (
+                    "cmd",
+                    tuple(opt_keys),
+                    tuple((type(value), value) for value in converted_p_values),
+                ),
+                lambda: dumps(command_payload),
+            )
         except TypeError as e:
             _LOGGER.error("Error serializing command payload to JSON: %s", e)
             return None
 
-        _LOGGER.debug("Constructed state_pack_json: %s", state_pack_json)
-
-        sent_json_payload: Optional[str] = None
-        cipher_for_fetch: Optional[CipherType] = None  # Cipher needed for _fetch_result
-
-        if self._encryption_version == 1:
-            if not self._cipher:
-                _LOGGER.error("Cannot send V1 command: ECB cipher not initialized.")
-                # Potentially try to bind/get key first? Or just fail.
-                return None  # Or raise exception
-            cipher_for_fetch = self._cipher  # Use the instance's ECB cipher
-
-            padded_state: bytes = self._pad(state_pack_json).encode("utf8")
-            encrypted_pack_bytes: bytes = cipher_for_fetch.encrypt(padded_state)
-            encrypted_pack: str = base64.b64encode(encrypted_pack_bytes).decode("utf-8")
-
-            sent_json_payload = (
-                f'{{"cid":"app","i":0,"pack":"{encrypted_pack}",'
-                f'"t":"pack","tcid":"{self._mac}",'
-                f'"uid":0}}'  # Assuming uid 0 for commands, confirm if needed
-            )
-
-        elif self._encryption_version == 2:
-            if not self._encryption_key:
-                _LOGGER.error("Cannot send V2 command: Encryption key missing.")
-                # Potentially try to bind/get key first? Or just fail.
-                return None  # Or raise exception
-
-            # Encrypt using the instance's key
-            pack, tag = self._encrypt_gcm(self._encryption_key, state_pack_json)
-
-            # Get the GCM cipher instance required for decrypting the response in _fetch_result
-            cipher_for_fetch = self._get_gcm_cipher(self._encryption_key)
-
-            sent_json_payload = (
-                f'{{"cid":"app","i":0,"pack":"{pack}",'
-                f'"t":"pack","tcid":"{self._mac}",'
-                f'"uid":0,"tag":"{tag}"}}'  # Assuming uid 0 for commands, confirm if needed
-            )
-        else:
-            _LOGGER.error(
-                "Unsupported encryption version: %s. Cannot send command.",
-                self._encryption_version,
-            )
-            return None  # Or raise an exception
-
-        if sent_json_payload is None or cipher_for_fetch is None:
-            _LOGGER.error("Failed to prepare command payload or cipher.")
-            return None  # Should have been caught earlier, but safety check
-
         try:
             # Call the internal fetch method
             _LOGGER.debug("Sending payload: %s", sent_json_payload)
             received_json_pack: Dict[str, Any] = await self._fetch_result(
-                cipher_for_fetch, sent_json_payload
+                cipher_for_fetch,
+                sent_json_payload,
+                ExpectedReply("res", "opt", tuple(opt_keys)),
             )
             _LOGGER.debug("Received response pack: %s", received_json_pack)
             return received_json_pack
@@ -441,6 +735,9 @@ class GreeDeviceApi:
         ) as e:  # FIX: Catch specific socket/connection errors
             _LOGGER.error("Socket/Connection error sending command: %s", e)
             return None
+        except DecryptionError as e:
+            self._on_decryption_error(e)
+            return None
         except (
             json.JSONDecodeError,
             ValueError,
@@ -452,78 +749,150 @@ class GreeDeviceApi:
         # FIX: Removed broad Exception catch
 
     async def get_status(
-        self, property_names: List[str]
+        self, property_names: List[str], exact: bool = False
     ) -> Optional[List[Any]]:  # Changed return type hint
-        """Fetches the status of specified properties from the device."""
+        """Fetches the status of specified properties from the device.
+
+        Columns read within the freshness TTL are answered from the last
+        response. Concurrent callers share one in-flight status request: a
+        request not sent yet is widened to the union of their columns, and one
+        already sent is joined if it covers the caller's columns. Once every
+        caller sharing a request has given up (e.g. a poll interrupted by a
+        command), the request is stopped.
+
+        With exact=True the request goes out with exactly property_names and
+        only shares a request for the same columns, so a device rejecting
+        another caller's column cannot fail it, and cached values are not used
+        (capability probing relies on the device answering now). Firmware may
+        drop such a request, so it going unanswered does not count toward the
+        circuit breaker.
+        """
         if not self._is_bound:
             _LOGGER.error("Cannot get status: API is not bound (key missing).")
             return None
 
-        _LOGGER.debug("Preparing to get status for properties: %s", property_names)
-
-        # Construct the inner JSON status request payload
+        now = time.monotonic()
+        if not exact and all(
+            column in self._status_cache
+            and now - self._status_cache[column][0] < self.status_ttl
+            for column in property_names
+        ):
+            self.status_cache_hits += 1
+            return [self._status_cache[column][1] for column in property_names]
+        if not await self._async_breaker_allows():
+            return None  # Unreachable: answer at once instead of timing out
+
+        flight = self._join_status_flight(property_names, exact)
+        flight.waiters += 1
         try:
-            cols_json: str = json.dumps(property_names)
-        except TypeError as e:
-            _LOGGER.error("Error serializing property names to JSON: %s", e)
+            # Shielded: one caller giving up must not cancel the others' request
+            values = await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and flight.task is not None:
+                flight.task.cancel()  # The last caller gave up: stop retransmitting
+            raise
+        finally:
+            flight.waiters -= 1
+        if values is None:
             return None
-
-        plaintext_payload: str = (
-            f'{{"cols":{cols_json},"mac":"{self._mac}","t":"status"}}'
+        return [values[column] for column in property_names]
+
+    def _join_status_flight(
+        self, property_names: List[str], exact: bool = False
+    ) -> "_StatusFlight":
+        """Return the shared status request that will answer property_names."""
+        for flight in self._status_flights:
+            if flight.generation != self._status_generation:
+                continue  # Started before a command; may return stale values
+            if exact or flight.exact:
+                if set(property_names) != set(flight.columns):
+                    continue
+            elif not flight.sent:
+                flight.columns.extend(
+                    column for column in property_names if column not in flight.columns
+                )
+            elif not set(property_names) <= set(flight.columns):
+                continue
+            self.status_requests_shared += 1
+            return flight
+        flight = _StatusFlight(
+            list(dict.fromkeys(property_names)),
+            asyncio.get_running_loop().create_future(),
+            self._status_generation,
+            exact=exact,
         )
+        self._status_flights.append(flight)
+        flight.task = asyncio.ensure_future(self._async_run_status_flight(flight))
+        return flight
 
-        sent_json_payload: Optional[str] = None
-        cipher_for_fetch: Optional[CipherType] = None  # Cipher needed for _fetch_result
-
-        if self._encryption_version == 1:
-            if not self._cipher:
-                _LOGGER.error("Cannot get V1 status: ECB cipher not initialized.")
-                return None  # Or raise exception
-            cipher_for_fetch = self._cipher
-
-            padded_state: bytes = self._pad(plaintext_payload).encode("utf8")
-            encrypted_pack_bytes: bytes = cipher_for_fetch.encrypt(padded_state)
-            encrypted_pack: str = base64.b64encode(encrypted_pack_bytes).decode("utf-8")
-
-            sent_json_payload = (
-                f'{{"cid":"app","i":0,"pack":"{encrypted_pack}",'
-                f'"t":"pack","tcid":"{self._mac}",'
-                f'"uid":0}}'  # Assuming uid 0 for status, confirm if needed
+    async def _async_run_status_flight(self, flight: "_StatusFlight") -> None:
+        """Send a shared status request and hand its result to every caller."""
+        flight.sent = True  # Callers arriving from now on cannot widen it
+        try:
+            status = await self._async_fetch_status(
+                flight.columns, count_failures=not flight.exact
+            )
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            flight.future.set_exception(err)
+            flight.future.exception()  # Raised to the callers; avoid orphan warning
+            return
+        finally:
+            self._status_flights.remove(flight)
+        if status is None:
+            flight.future.set_result(None)
+            return
+        values = dict(zip(flight.columns, status))
+        if flight.generation == self._status_generation:
+            now = time.monotonic()
+            self._status_cache.update(
+                (column, (now, value)) for column, value in values.items()
             )
+        flight.future.set_result(values)
 
-        elif self._encryption_version == 2:
-            if not self._encryption_key:
-                _LOGGER.error("Cannot get V2 status: Encryption key missing.")
-                return None  # Or raise exception
+    def _invalidate_status(self) -> None:
+        """Forget cached status and stop sharing requests sent before now."""
+        self._status_cache.clear()
+        self._status_generation += 1
 
-            # Encrypt using the instance's key
-            pack, tag = self._encrypt_gcm(self._encryption_key, plaintext_payload)
+    async def _async_fetch_status(
+        self,
+        property_names: List[str],
+        policy: Optional[RetryPolicy] = None,
+        count_failures: bool = True,
+    ) -> Optional[List[Any]]:
+        """Send one status request for property_names and return the values."""
+        _LOGGER.debug("Preparing to get status for properties: %s", property_names)
 
-            # Get the GCM cipher instance required for decrypting the response
-            cipher_for_fetch = self._get_gcm_cipher(self._encryption_key)
+        # Cipher needed for _fetch_result to decrypt the reply
+        cipher_for_fetch: Optional[CipherType] = self._request_cipher("get status")
+        if cipher_for_fetch is None:
+            return None
 
-            sent_json_payload = (
-                f'{{"cid":"app","i":0,"pack":"{pack}",'
-                f'"t":"pack","tcid":"{self._mac}",'
-                f'"uid":0,"tag":"{tag}"}}'  # Assuming uid 0 for status, confirm if needed
-            )
-        else:
-            _LOGGER.error(
-                "Unsupported encryption version: %s. Cannot get status.",
-                self._encryption_version,
+        # The request for a column set is the same every poll: reuse its packet
+        try:
+            sent_json_payload: bytes = self._cached_packet(
+                ("status", tuple(property_names)),
+                lambda: dumps(
+                    {"cols": property_names, "mac": str(self._mac), "t": "status"}
+                ),
             )
-            return None  # Or raise an exception
-
-        if sent_json_payload is None or cipher_for_fetch is None:
-            _LOGGER.error("Failed to prepare status request payload or cipher.")
-            return None  # Should have been caught earlier, but safety check
+        except TypeError as e:
+            _LOGGER.error("Error serializing property names to JSON: %s", e)
+            return None
 
         try:
             # Call the internal fetch method
             _LOGGER.debug("Sending status request payload: %s", sent_json_payload)
             received_json_pack: Dict[str, Any] = (
                 await self._fetch_result(  # <<< Added await here
-                    cipher_for_fetch, sent_json_payload
+                    cipher_for_fetch,
+                    sent_json_payload,
+                    ExpectedReply("dat", "cols", tuple(property_names)),
+                    policy,
+                    count_failures,
                 )
             )
             _LOGGER.debug("Received status response pack: %s", received_json_pack)
@@ -562,6 +931,9 @@ class GreeDeviceApi:
         ) as e:  # FIX: Catch specific socket/connection errors
             _LOGGER.error("Socket/Connection error getting status: %s", e)
             return None
+        except DecryptionError as e:
+            self._on_decryption_error(e)
+            return None
         except (
             json.JSONDecodeError,
             ValueError,
@@ -572,6 +944,15 @@ class GreeDeviceApi:
             return None
         # FIX: Removed broad Exception catch
 
+    def _on_decryption_error(self, error: DecryptionError) -> None:
+        """Drop a key the device no longer accepts so the next update re-binds."""
+        _LOGGER.warning(
+            "Reply from %s could not be decrypted (%s); marking API as unbound.",
+            self._host,
+            error,
+        )
+        self._is_bound = False
+
     # Method definition should be at class level indentation
     def update_encryption_key(self, new_key: bytes) -> None:
         """
@@ -583,10 +964,12 @@ class GreeDeviceApi:
         """
         _LOGGER.debug("Updating internal API encryption key.")
         self._encryption_key = new_key
+        self._invalidate_status()
+        self._packets.clear()
 
         # If using V1 (ECB), the cipher instance depends on the key, so recreate it.
         if self._encryption_version == 1:
-            self._cipher = AES.new(self._encryption_key, AES.MODE_ECB)
+            self._cipher = EcbCipher(self._encryption_key)
         # For V2 (GCM) or other versions, we don't store a persistent cipher instance
         # based on the device key in self._cipher. Ensure it's None if set previously.
         elif self._cipher is not None:
@@ -0,0 +1,145 @@
+"""Discovery of Gree devices on the local network using the `t: scan` packet."""
+
+import asyncio
+import base64
+import ipaddress
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import const
+from .codec import decode_pack, loads
+from .crypto import EcbCipher, GcmCipher
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_PAYLOAD: bytes = b'{"t":"scan"}'
+SWEEP_BATCH_SIZE: int = 64  # Unicast probes sent before yielding to the loop
+
+
+@dataclass(frozen=True)
+class DiscoveredDevice:
+    """A device that answered a scan request."""
+
+    host: str
+    port: int
+    mac: str
+    name: str
+    model: str
+    firmware: str
+    brand: str
+    encryption_version: int
+    model_id: str = ""  # `mid`, distinguishes hardware sharing a model name
+
+
+def decode_scan_reply(data: bytes, host: str, port: int) -> DiscoveredDevice:
+    """Decrypt a scan reply with the generic key.
+
+    V2 (GCM) devices include a `tag` in the envelope; V1 (ECB) devices do not.
+    Raises ValueError (or KeyError) if the datagram is not a scan reply.
+    """
+    envelope: Dict[str, Any] = loads(data)
+    encrypted: bytes = base64.b64decode(envelope["pack"])
+    if "tag" in envelope:
+        decrypted: bytes = GcmCipher(
+            const.GCM_DEFAULT_KEY.encode("utf8")
+        ).decrypt_and_verify(encrypted, base64.b64decode(envelope["tag"]))
+        encryption_version = 2
+    else:
+        decrypted = EcbCipher(const.GENERIC_KEY.encode("utf8")).decrypt(encrypted)
+        encryption_version = 1
+    pack: Dict[str, Any] = decode_pack(decrypted)
+    if pack.get("t") != "dev":
+        raise ValueError(f"Not a scan reply: t={pack.get('t')!r}")
+    mac: str = pack.get("mac") or envelope["cid"]
+    return DiscoveredDevice(
+        host=host,
+        port=port,
+        mac=mac,
+        name=pack.get("name") or mac,
+        model=pack.get("model", ""),
+        firmware=pack.get("ver", ""),
+        brand=pack.get("brand", ""),
+        encryption_version=encryption_version,
+        model_id=str(pack.get("mid", "")),
+    )
+
+
+class GreeScanProtocol(asyncio.DatagramProtocol):
+    """Collects scan replies, keyed by MAC, for the duration of a scan."""
+
+    def __init__(self) -> None:
+        """Initialize an empty result set."""
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.devices: Dict[str, DiscoveredDevice] = {}
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store the datagram transport once the socket is bound."""
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: Tuple[Any, ...]) -> None:
+        """Decode a scan reply; anything else is ignored."""
+        try:
+            device = decode_scan_reply(data, addr[0], addr[1])
+        except (ValueError, KeyError, TypeError) as err:
+            _LOGGER.debug("Ignoring non-scan datagram from %s: %s", addr[0], err)
+            return
+        if device.mac not in self.devices:
+            _LOGGER.debug("Discovered Gree device %s at %s", device.mac, device.host)
+        self.devices[device.mac] = device
+
+    def error_received(self, exc: Exception) -> None:
+        """Log socket errors (e.g. ICMP unreachable from a swept address)."""
+        _LOGGER.debug("Scan socket error: %s", exc)
+
+
+def _scan_targets(target: Optional[str]) -> Tuple[List[str], List[str]]:
+    """Return (broadcast addresses, unicast hosts) to probe for a scan target.
+
+    No target broadcasts to the local network. A CIDR broadcasts to the
+    subnet and sweeps its hosts with unicast probes (some routers drop
+    broadcasts); a single address is probed directly.
+    """
+    if not target:
+        return [const.DEFAULT_BROADCAST_ADDRESS], []
+    network = ipaddress.ip_network(target.strip(), strict=False)
+    if network.version != 4:
+        raise ValueError("Only IPv4 networks can be scanned")
+    if network.num_addresses == 1:
+        return [], [str(network.network_address)]
+    if network.num_addresses > const.MAX_SWEEP_HOSTS:
+        raise ValueError(
+            f"{network} is too large to sweep (max {const.MAX_SWEEP_HOSTS} addresses)"
+        )
+    return [str(network.broadcast_address)], [str(host) for host in network.hosts()]
+
+
+async def async_scan(
+    target: Optional[str] = None,
+    window: float = const.DEFAULT_SCAN_WINDOW,
+    port: int = const.DEFAULT_PORT,
+) -> List[DiscoveredDevice]:
+    """Scan for Gree devices and return every device that replied within window.
+
+    `target` may be empty (local broadcast), a CIDR such as 192.168.1.0/24, or
+    a single IP address. Raises ValueError for an invalid target.
+    """
+    broadcasts, hosts = _scan_targets(target)
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        GreeScanProtocol, local_addr=("0.0.0.0", 0), allow_broadcast=True
+    )
+    try:
+        for address in broadcasts:
+            transport.sendto(SCAN_PAYLOAD, (address, port))
+        for index, host in enumerate(hosts, start=1):
+            transport.sendto(SCAN_PAYLOAD, (host, port))
+            if index % SWEEP_BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+        await asyncio.sleep(window)
+    finally:
+        transport.close()
+    _LOGGER.debug(
+        "Scan of %s found %d device(s)", target or "broadcast", len(protocol.devices)
+    )
+    return sorted(protocol.devices.values(), key=lambda device: device.host)
@@ -0,0 +1,64 @@
+"""Round-trip time estimation used to derive adaptive per-device timeouts."""
+
+from typing import Any, Dict, Optional
+
+
+class RttEstimator:
+    """Smoothed RTT and variance estimator (TCP-style RTO, RFC 6298).
+
+    The timeout is srtt + 4 * rttvar clamped to [floor, ceiling]. Each timeout
+    doubles it (up to the ceiling) until the next successful sample.
+    """
+
+    ALPHA: float = 0.125  # Gain for the smoothed RTT
+    BETA: float = 0.25  # Gain for the RTT variance
+    K: float = 4.0  # Variance multiplier
+    MAX_BACKOFF: int = 64
+
+    def __init__(self, floor: float, ceiling: float) -> None:
+        """Initialize the estimator; the timeout starts at the ceiling."""
+        self.floor: float = floor
+        self.ceiling: float = max(floor, ceiling)
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.samples: int = 0
+        self.timeouts: int = 0
+        self._backoff: int = 1
+
+    @property
+    def timeout(self) -> float:
+        """Return the current timeout in seconds."""
+        if self.srtt is None or self.rttvar is None:
+            return self.ceiling
+        rto = max(self.floor, self.srtt + self.K * self.rttvar)
+        return min(self.ceiling, rto * self._backoff)
+
+    def add_sample(self, rtt: float) -> None:
+        """Feed a measured round-trip time (seconds) from an answered request."""
+        if self.srtt is None or self.rttvar is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(
+                self.srtt - rtt
+            )
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+        self._backoff = 1
+
+    def on_timeout(self) -> None:
+        """Back off after a request went unanswered."""
+        self.timeouts += 1
+        self._backoff = min(self._backoff * 2, self.MAX_BACKOFF)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the estimator state for diagnostics."""
+        return {
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "timeout": self.timeout,
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+            "samples": self.samples,
+            "timeouts": self.timeouts,
+        }
@@ -0,0 +1,452 @@
+"""Asyncio UDP transport used to exchange datagrams with Gree devices."""
+
+import asyncio
+import collections
+import heapq
+import ipaddress
+import itertools
+import logging
+import socket
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .codec import envelope_field
+from .const import PACKET_BURST, PACKET_RATE, PRIORITY_POLL, RECEIVE_BUFFER_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+Address = Tuple[str, int]
+
+# One shared endpoint per running event loop (i.e. per Home Assistant instance).
+_ENDPOINTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, GreeUdpEndpoint]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class StaleDatagramError(Exception):
+    """Raised by a reply matcher when a datagram does not answer its request."""
+
+
+@dataclass
+class InFlightRequest:
+    """A request waiting for its reply on the shared endpoint.
+
+    Retransmissions reuse the same in-flight request, so whichever copy is
+    answered first resolves it exactly once and later replies count as late.
+    A request closed with a linger stays indexed until `late_until`, to drop
+    the `late_replies` its unanswered copies may still draw.
+    """
+
+    seq: int
+    addr: Address
+    mac: str
+    waiter: "asyncio.Future[Any]"
+    accept: Optional[Callable[[memoryview], Any]]
+    transmissions: int = 0
+    sent_at: float = 0.0  # Monotonic time of the latest transmission
+    late_until: float = 0.0  # Monotonic time the closed request stops lingering
+    late_replies: int = 0  # Replies its unanswered copies may still draw
+
+
+class TokenBucket:
+    """Paces outbound packets to `rate` per second, allowing bursts of `burst`.
+
+    Waiters are served by priority (the const.PRIORITY_* lanes, lower first)
+    and in arrival order within one, so a fleet starting together drains at
+    the bucket's rate while a command packet skips queued polls and retries.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize a full bucket."""
+        self.rate: float = rate
+        self.burst: int = burst
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.delayed: int = 0  # Packets that had to wait for a token
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def async_acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Wait until a packet of the given priority may be sent."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        self.delayed += 1
+        loop = asyncio.get_running_loop()
+        waiter: "asyncio.Future[None]" = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+        if self._timer is None:
+            self._schedule_release(loop)
+        await waiter
+
+    def _schedule_release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Wake up once the next token has been earned."""
+        self._timer = loop.call_later(
+            max(0.0, (1 - self._tokens) / self.rate), self._release, loop
+        )
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Hand the earned tokens to the most urgent waiters."""
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue  # Its caller gave up
+            self._tokens -= 1
+            waiter.set_result(None)
+        if self._waiters:
+            self._schedule_release(loop)
+
+    def close(self) -> None:
+        """Stop the release timer and fail every waiter."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        waiters, self._waiters = self._waiters, []
+        for _, _, waiter in waiters:
+            if not waiter.done():
+                waiter.set_exception(ConnectionError("Packet budget closed"))
+
+
+class GreeUdpEndpoint:
+    """Long-lived UDP socket multiplexing requests for every Gree device.
+
+    In-flight requests are indexed by the device address (and by MAC as a
+    fallback), so each incoming datagram is routed with a dict lookup. A
+    request's `accept` callback decodes the datagram and raises
+    StaleDatagramError if it answers a different request; such datagrams are
+    dropped and counted, as are replies arriving with no request in flight.
+    A datagram `accept` cannot decode (ValueError, KeyError, TypeError) is
+    offered to the other requests in flight too, and only fails the request
+    when it is the only one waiting on that device.
+
+    A request abandoned with copies still unanswered can be closed with a
+    linger: it is kept for that long so the late replies it matches are
+    dropped rather than taken by the next identical request.
+
+    Datagrams are received into one buffer allocated with the socket
+    (asyncio's datagram transport allocates 256 KiB per datagram). `accept`
+    gets a memoryview of it, valid only during the call.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an endpoint that is not yet bound to a socket."""
+        self._sock: Optional[socket.socket] = None
+        self._buffer = bytearray(RECEIVE_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._closed: bool = False
+        self._in_flight_by_addr: Dict[Address, Deque[InFlightRequest]] = {}
+        self._in_flight_by_mac: Dict[str, Deque[InFlightRequest]] = {}
+        self._seq = itertools.count(1)
+        self.pacer = TokenBucket(PACKET_RATE, PACKET_BURST)  # Shared by every device
+        self.late_datagrams: int = 0  # No request in flight (late or duplicate)
+        self.stale_datagrams: int = 0  # Rejected by every in-flight request
+        self.oversized_datagrams: int = 0  # Did not fit the receive buffer
+
+    @property
+    def closed(self) -> bool:
+        """Return True once the underlying socket has been closed."""
+        return self._closed
+
+    @property
+    def sockname(self) -> Optional[Address]:
+        """Return the local address of the socket, once bound."""
+        return self._sock.getsockname() if self._sock is not None else None
+
+    async def async_start(self) -> None:
+        """Bind the shared socket and start reading from it (only once)."""
+        if self._sock is not None:
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            sock.bind(("0.0.0.0", 0))
+            asyncio.get_running_loop().add_reader(sock.fileno(), self._read_ready)
+        except BaseException:
+            sock.close()
+            raise
+        self._sock = sock
+        _LOGGER.debug("Shared Gree UDP endpoint bound to %s", self.sockname)
+
+    def close(self) -> None:
+        """Close the shared socket and fail any pending waiters."""
+        self._closed = True
+        self.pacer.close()
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(sock.fileno())
+        sock.close()
+        self._fail_pending(ConnectionError("Shared Gree UDP endpoint closed"))
+
+    # --- Socket callbacks ---
+    def _read_ready(self) -> None:
+        """Receive one datagram into the buffer and dispatch a view of it."""
+        if self._sock is None:
+            return
+        try:
+            size, addr = self._sock.recvfrom_into(self._buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as exc:
+            self.error_received(exc)
+            return
+        if size == len(self._buffer):  # Possibly truncated
+            self.oversized_datagrams += 1
+            _LOGGER.debug("Dropping oversized datagram from %s", addr)
+            return
+        self.datagram_received(self._view[:size], addr)
+
+    def datagram_received(self, data: memoryview, addr: Tuple[Any, ...]) -> None:
+        """Hand a datagram to the oldest in-flight request it answers."""
+        source: Address = (addr[0], addr[1])
+        requests = self._pending(self._in_flight_by_addr, source)
+        if not requests:
+            # Reply from an unexpected address: fall back to the MAC in the envelope.
+            cid = envelope_field(data, "cid")
+            requests = self._pending(
+                self._in_flight_by_mac,
+                _normalize_mac(str(cid, "ascii", "replace") if cid else None),
+            )
+        if not requests:
+            self.late_datagrams += 1
+            _LOGGER.debug("Dropping late/duplicate datagram from %s", source)
+            return
+        for request in requests:
+            try:
+                result = request.accept(data) if request.accept else bytes(data)
+            except (StaleDatagramError, ValueError, KeyError, TypeError) as err:
+                # Undecodable for this request (e.g. encrypted with another
+                # request's key): it may still answer the next one
+                _LOGGER.debug(
+                    "Datagram from %s does not answer request #%d: %s",
+                    source,
+                    request.seq,
+                    err,
+                )
+                if len(requests) == 1 and not isinstance(err, StaleDatagramError):
+                    if not request.waiter.done():
+                        # No other request it could answer: report why it failed
+                        request.waiter.set_exception(err)
+                        return
+                continue
+            if request.waiter.done():
+                # A late reply to a closed request: keep it from the next one
+                request.late_replies -= 1
+                self.late_datagrams += 1
+                _LOGGER.debug(
+                    "Dropping late reply to closed request #%d from %s",
+                    request.seq,
+                    source,
+                )
+                return
+            request.waiter.set_result(result)
+            return
+        self.stale_datagrams += 1
+        _LOGGER.debug("Dropping stale datagram from %s", source)
+
+    def error_received(self, exc: Exception) -> None:
+        """Log socket errors; unconnected UDP errors cannot be attributed to a device."""
+        _LOGGER.debug("Shared Gree UDP endpoint error: %s", exc)
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail all pending waiters when the socket goes away."""
+        for requests in self._in_flight_by_addr.values():
+            for request in requests:
+                if not request.waiter.done():
+                    request.waiter.set_exception(error)
+        self._in_flight_by_addr.clear()
+        self._in_flight_by_mac.clear()
+
+    # --- Requests ---
+    async def async_open_request(
+        self,
+        host: str,
+        port: int,
+        mac: Optional[str] = None,
+        accept: Optional[Callable[[memoryview], Any]] = None,
+    ) -> InFlightRequest:
+        """Register a request so replies from the device can be routed to it."""
+        if self._sock is None:
+            raise ConnectionError("Shared Gree UDP endpoint is not running")
+        addr = await self._async_resolve(host, port)
+        device_mac = _normalize_mac(mac)
+        # Drop closed requests done lingering, even if the device went silent
+        self._pending(self._in_flight_by_addr, addr)
+        self._pending(self._in_flight_by_mac, device_mac)
+        request = InFlightRequest(
+            next(self._seq),
+            addr,
+            device_mac,
+            asyncio.get_running_loop().create_future(),
+            accept,
+        )
+        self._in_flight_by_addr.setdefault(addr, collections.deque()).append(request)
+        if request.mac:
+            self._in_flight_by_mac.setdefault(request.mac, collections.deque()).append(
+                request
+            )
+        return request
+
+    def send(self, request: InFlightRequest, payload: bytes) -> None:
+        """Transmit (or retransmit) the payload of an open request now."""
+        if self._sock is None:
+            raise ConnectionError("Shared Gree UDP endpoint is not running")
+        request.transmissions += 1
+        request.sent_at = time.monotonic()
+        try:
+            self._sock.sendto(payload, request.addr)
+        except OSError as exc:  # Lost like any datagram; retries resend it
+            self.error_received(exc)
+
+    async def async_send(
+        self, request: InFlightRequest, payload: bytes, priority: int = PRIORITY_POLL
+    ) -> None:
+        """Transmit the payload once the fleet-wide packet budget allows it."""
+        await self.pacer.async_acquire(priority)
+        self.send(request, payload)
+
+    def close_request(self, request: InFlightRequest, linger: float = 0.0) -> None:
+        """Stop routing replies to a finished request.
+
+        With a linger, a request whose copies were not all answered keeps
+        dropping the late replies it matches until `linger` seconds after
+        its latest transmission.
+        """
+        answered = request.waiter.done() and not request.waiter.cancelled()
+        late_replies = request.transmissions - (1 if answered else 0)
+        late_until = request.sent_at + linger
+        if linger > 0 and late_replies > 0 and late_until > time.monotonic():
+            if not request.waiter.done():
+                request.waiter.cancel()
+            request.late_until = late_until
+            request.late_replies = late_replies
+            return
+        self._discard(self._in_flight_by_addr, request.addr, request)
+        if request.mac:
+            self._discard(self._in_flight_by_mac, request.mac, request)
+
+    async def async_request(
+        self,
+        host: str,
+        port: int,
+        payload: bytes,
+        timeout: float,
+        mac: Optional[str] = None,
+        accept: Optional[Callable[[memoryview], Any]] = None,
+    ) -> Any:
+        """Send a datagram to a device and wait for the reply that answers it.
+
+        Returns the raw datagram (bytes), or whatever `accept` returns for it.
+        Raises TimeoutError (socket.timeout) if no reply arrives within timeout.
+        """
+        request = await self.async_open_request(host, port, mac, accept)
+        try:
+            async with asyncio.timeout(timeout):
+                await self.async_send(request, payload)
+                return await request.waiter
+        finally:
+            self.close_request(request)
+
+    @staticmethod
+    def _pending(
+        index: Dict[Any, Deque[InFlightRequest]], key: Any
+    ) -> Tuple[InFlightRequest, ...]:
+        """Return the requests a reply may still answer, oldest first.
+
+        That is the requests waiting for a reply and the closed ones still
+        lingering; closed requests done lingering are dropped from the index.
+        """
+        requests = index.get(key)
+        if not requests:
+            return ()
+        now = time.monotonic()
+        live = [
+            request
+            for request in requests
+            if not request.waiter.done()
+            or (request.late_replies > 0 and request.late_until > now)
+        ]
+        if len(live) < len(requests):
+            if live:
+                index[key] = collections.deque(live)
+            else:
+                del index[key]
+        return tuple(live)
+
+    @staticmethod
+    def _discard(
+        index: Dict[Any, Deque[InFlightRequest]], key: Any, request: InFlightRequest
+    ) -> None:
+        """Remove a finished request from an index, dropping the bucket once empty."""
+        requests = index.get(key)
+        if requests is None or request not in requests:
+            return
+        requests.remove(request)
+        if not requests:
+            del index[key]
+
+    @staticmethod
+    async def _async_resolve(host: str, port: int) -> Address:
+        """Resolve a hostname without blocking the loop (IP literals pass through)."""
+        try:
+            ipaddress.ip_address(host)
+            return (host, port)
+        except ValueError:
+            pass
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, family=socket.AF_INET, type=socket.SOCK_DGRAM
+        )
+        if not infos:
+            raise ConnectionError(f"Could not resolve host {host}")
+        return (infos[0][4][0], port)
+
+
+def _normalize_mac(mac: Optional[str]) -> str:
+    """Normalize a MAC for indexing (devices report it without separators)."""
+    return mac.replace(":", "").replace("-", "").lower() if mac else ""
+
+
+async def async_get_endpoint() -> GreeUdpEndpoint:
+    """Return the shared endpoint for the running loop, starting it if needed."""
+    loop = asyncio.get_running_loop()
+    endpoint = _ENDPOINTS.get(loop)
+    if endpoint is None or endpoint.closed:
+        endpoint = GreeUdpEndpoint()
+        _ENDPOINTS[loop] = endpoint
+    await endpoint.async_start()
+    return endpoint
+
+
+def async_close_endpoint() -> None:
+    """Close the shared endpoint for the running loop, if one exists."""
+    endpoint = _ENDPOINTS.pop(asyncio.get_running_loop(), None)
+    if endpoint is not None:
+        endpoint.close()
+
+
+async def async_send_and_receive(
+    host: str,
+    port: int,
+    payload: bytes,
+    timeout: float,
+    mac: Optional[str] = None,
+    accept: Optional[Callable[[memoryview], Any]] = None,
+) -> Any:
+    """Send a single datagram through the shared endpoint and wait for the reply.
+
+    Raises TimeoutError (socket.timeout) if no reply arrives within timeout.
+    """
+    endpoint = await async_get_endpoint()
+    return await endpoint.async_request(host, port, payload, timeout, mac, accept)
@@ -0,0 +1,39 @@
+"""Benchmarks comparing backends on the integration's real packets."""
+
+import time
+from typing import Callable, Dict, Hashable, Protocol, Sequence, TypeVar
+
+
+class _Backend(Protocol):
+    """Any backend: crypto.CryptoBackend or codec.JsonBackend."""
+
+    name: str
+
+
+_B = TypeVar("_B", bound=_Backend)
+
+
+def mean_time(operation: Callable[[], object], iterations: int) -> float:
+    """Return the mean time of one call, in microseconds."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def report_backend_costs(
+    backends: Sequence[_B],
+    output: Callable[[_B], Hashable],
+    costs: Callable[[_B], Dict[str, float]],
+    header: str,
+) -> None:
+    """Check every backend produces the same output, then print their costs."""
+    assert len({output(backend) for backend in backends}) == 1
+
+    print(f"\n{header}")
+    width = max(len(backend.name) for backend in backends)
+    for backend in backends:
+        print(
+            f"{backend.name:>{width}}: "
+            + " ".join(f"{name}={cost:.2f}us" for name, cost in costs(backend).items())
+        )
@@ -0,0 +1,66 @@
+"""Benchmark: AES backends on the packets a poll and a command exchange."""
+
+import json
+from typing import Dict
+
+from custom_components.greev2.const import COLUMN_TIERS
+from custom_components.greev2.crypto import CryptoBackend, available_backends
+
+from ..conftest import MOCK_MAC
+from . import mean_time, report_backend_costs
+
+ITERATIONS = 2000
+KEY = b"0123456789abcdef"
+
+# Plaintexts of real size: a full status request and its reply, and a command
+COLUMNS = list(COLUMN_TIERS)
+STATUS_REQUEST = json.dumps({"cols": COLUMNS, "mac": MOCK_MAC, "t": "status"}).encode()
+STATUS_REPLY = json.dumps(
+    {"t": "dat", "mac": MOCK_MAC, "r": 200, "cols": COLUMNS, "dat": [1] * len(COLUMNS)}
+).encode()
+COMMAND = json.dumps(
+    {"opt": ["Pow", "Mod", "SetTem"], "p": [1, 1, 24], "t": "cmd"}, separators=(",", ":")
+).encode()
+
+
+def _pad(data: bytes) -> bytes:
+    """Pad to the AES block size as the V1 protocol does."""
+    size = 16 - len(data) % 16
+    return data + bytes([size]) * size
+
+
+def _exchange_costs(backend: CryptoBackend) -> Dict[str, float]:
+    """Time the crypto work of one poll and one command with V1 and V2."""
+    sealed_reply = backend.gcm_seal(KEY, STATUS_REPLY)
+    ecb_reply = backend.ecb_encrypt(KEY, _pad(STATUS_REPLY))
+    return {
+        "v2 poll": mean_time(
+            lambda: (
+                backend.gcm_seal(KEY, STATUS_REQUEST),
+                backend.gcm_open(KEY, *sealed_reply),
+            ),
+            ITERATIONS,
+        ),
+        "v2 command": mean_time(lambda: backend.gcm_seal(KEY, COMMAND), ITERATIONS),
+        "v1 poll": mean_time(
+            lambda: (
+                backend.ecb_encrypt(KEY, _pad(STATUS_REQUEST)),
+                backend.ecb_decrypt(KEY, ecb_reply),
+            ),
+            ITERATIONS,
+        ),
+    }
+
+
+def test_crypto_backend_costs() -> None:
+    """Compare the backends on real packet sizes; they must agree byte for byte."""
+    report_backend_costs(
+        available_backends(),
+        lambda backend: (
+            backend.gcm_seal(KEY, STATUS_REQUEST),
+            backend.ecb_encrypt(KEY, _pad(STATUS_REQUEST)),
+        ),
+        _exchange_costs,
+        f"request={len(STATUS_REQUEST)}B reply={len(STATUS_REPLY)}B "
+        f"command={len(COMMAND)}B, mean of {ITERATIONS} runs",
+    )
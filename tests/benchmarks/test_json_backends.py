@@ -0,0 +1,77 @@
+"""Benchmark: JSON backends on the packs and envelopes of a poll and a command."""
+
+from typing import Dict
+
+import pytest
+
+from custom_components.greev2.codec import (
+    JsonBackend,
+    available_json_backends,
+    check_number,
+)
+from custom_components.greev2.const import COLUMN_TIERS
+
+from ..conftest import MOCK_MAC
+from . import mean_time, report_backend_costs
+
+ITERATIONS = 5000
+
+# Packets of real size: a full status request and reply, commands with
+# integer and float values, and the envelope carrying the status request
+COLUMNS = list(COLUMN_TIERS)
+STATUS_REQUEST = {"cols": COLUMNS, "mac": MOCK_MAC, "t": "status"}
+STATUS_REPLY = {
+    "t": "dat",
+    "mac": MOCK_MAC,
+    "r": 200,
+    "cols": COLUMNS,
+    "dat": [1] * len(COLUMNS),
+}
+COMMAND = {"opt": ["Pow", "Mod", "SetTem"], "p": [1, 1, 24], "t": "cmd"}
+FLOAT_COMMAND = {"opt": ["SetTem", "TemRec", "TemUn"], "p": [24.5, 0.1, 0], "t": "cmd"}
+ENVELOPE = {
+    "cid": "app",
+    "i": 0,
+    "pack": "A" * 344,  # base64 of the encrypted status request
+    "t": "pack",
+    "tcid": MOCK_MAC,
+    "uid": 0,
+}
+
+
+def _packet_costs(backend: JsonBackend) -> Dict[str, float]:
+    """Time encoding each request and decoding the status reply and envelope."""
+    reply = memoryview(backend.dumps(STATUS_REPLY))
+    envelope = backend.dumps(ENVELOPE)
+    return {
+        "encode status": mean_time(lambda: backend.dumps(STATUS_REQUEST), ITERATIONS),
+        "encode command": mean_time(lambda: backend.dumps(COMMAND), ITERATIONS),
+        "encode float command": mean_time(
+            lambda: backend.dumps(FLOAT_COMMAND), ITERATIONS
+        ),
+        "encode envelope": mean_time(lambda: backend.dumps(ENVELOPE), ITERATIONS),
+        "decode reply": mean_time(lambda: backend.loads(reply), ITERATIONS),
+        "decode envelope": mean_time(lambda: backend.loads(envelope), ITERATIONS),
+    }
+
+
+def test_json_backend_costs() -> None:
+    """Compare the backends per packet; they must agree byte for byte."""
+    # Values they would not agree on are refused before serializing
+    with pytest.raises(ValueError):
+        check_number(float("nan"))
+    report_backend_costs(
+        available_json_backends(),
+        lambda backend: tuple(
+            backend.dumps(packet)
+            for packet in (
+                STATUS_REQUEST,
+                STATUS_REPLY,
+                COMMAND,
+                FLOAT_COMMAND,
+                ENVELOPE,
+            )
+        ),
+        _packet_costs,
+        f"mean of {ITERATIONS} runs per packet",
+    )
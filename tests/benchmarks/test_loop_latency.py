@@ -0,0 +1,63 @@
+"""Benchmark: event loop latency while many simulated devices time out."""
+
+import asyncio
+import time
+from typing import List
+
+from custom_components.greev2.device_api import GreeDeviceApi
+
+from ..conftest import MOCK_MAC
+from ..device_api.test_transport import LOCALHOST, V1_TEST_KEY, start_fake_device
+
+DEVICE_COUNT = 40
+DEVICE_TIMEOUT = 0.3
+TICK_INTERVAL = 0.005
+# Generous bound so the benchmark is stable on loaded CI machines; a blocking
+# recvfrom would stall the loop for DEVICE_TIMEOUT per device (12 s in total).
+MAX_ALLOWED_LAG = 0.1
+
+
+async def _measure_loop_lag(stop: asyncio.Event, samples: List[float]) -> None:
+    """Record how late each periodic tick wakes up compared to its schedule."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_INTERVAL)
+        samples.append(time.perf_counter() - start - TICK_INTERVAL)
+
+
+async def test_loop_latency_flat_with_dead_devices(shared_endpoint: None) -> None:
+    """Loop lag stays flat while N unresponsive devices are polled concurrently."""
+    transport, _, port = await start_fake_device(None)  # Never answers
+    apis = [
+        GreeDeviceApi(
+            host=LOCALHOST,
+            port=port,
+            mac=MOCK_MAC,
+            timeout=DEVICE_TIMEOUT,
+            encryption_key=V1_TEST_KEY,
+            encryption_version=1,
+        )
+        for _ in range(DEVICE_COUNT)
+    ]
+    stop = asyncio.Event()
+    samples: List[float] = []
+    ticker = asyncio.create_task(_measure_loop_lag(stop, samples))
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(api.get_status(["Pow"]) for api in apis))
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker
+        transport.close()
+
+    assert results == [None] * DEVICE_COUNT
+    # All devices time out concurrently rather than one after another.
+    assert elapsed < DEVICE_TIMEOUT * 3
+    max_lag = max(samples)
+    print(
+        f"\n{DEVICE_COUNT} dead devices: elapsed={elapsed:.3f}s "
+        f"ticks={len(samples)} max_lag={max_lag * 1000:.1f}ms "
+        f"mean_lag={sum(samples) / len(samples) * 1000:.2f}ms"
+    )
+    assert max_lag < MAX_ALLOWED_LAG
@@ -0,0 +1,105 @@
+"""Benchmark: memory allocated by sustained 10 Hz polling of one device."""
+
+import asyncio
+import logging
+import socket
+import tracemalloc
+from typing import List, Tuple
+
+import pytest
+
+from custom_components.greev2.const import COLUMN_TIERS
+from custom_components.greev2.device_api import GreeDeviceApi
+
+from ..conftest import MOCK_MAC
+from ..device_api.test_transport import LOCALHOST, V1_TEST_KEY, v1_reply
+
+POLL_INTERVAL = 0.1  # 10 Hz
+WARMUP_POLLS = 10
+MEASURED_POLLS = 30
+TRACEBACK_FRAMES = 32  # Deep enough to see the integration from the loop
+COLUMNS = list(COLUMN_TIERS)
+# Per poll: the request, the reply pack and its dict. asyncio's datagram
+# transport allocated 256 KiB for every datagram received.
+MAX_POLL_PEAK = 32 * 1024
+# What a poll leaves behind: nothing but CPython free lists filling up
+# (bounded, e.g. 2000 tuples of each small size)
+MAX_GROWTH_PER_POLL = 256
+
+
+def _integration_snapshot() -> tracemalloc.Snapshot:
+    """Return the live blocks allocated with the integration on the stack."""
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, "*/custom_components/greev2/*", all_frames=True)]
+    )
+
+
+def _start_device(reply: bytes) -> Tuple[socket.socket, int]:
+    """Start a fake device that allocates nothing while answering."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    sock.bind((LOCALHOST, 0))
+    buffer = bytearray(2048)
+
+    def answer() -> None:
+        _, addr = sock.recvfrom_into(buffer)
+        sock.sendto(reply, addr)
+
+    asyncio.get_running_loop().add_reader(sock.fileno(), answer)
+    return sock, sock.getsockname()[1]
+
+
+async def test_polling_allocation_profile_is_flat(
+    shared_endpoint: None, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Each poll allocates a few KB and nothing accumulates across polls."""
+    # Debug records and the debug loop's tracebacks would dwarf the transport
+    caplog.set_level(logging.INFO, logger="custom_components.greev2")
+    loop = asyncio.get_running_loop()
+    debug = loop.get_debug()
+    loop.set_debug(False)
+    reply = v1_reply(
+        {"t": "dat", "mac": MOCK_MAC, "r": 200, "cols": COLUMNS, "dat": [1] * len(COLUMNS)}
+    )
+    sock, port = _start_device(reply)
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+        status_ttl=0,
+    )
+    peaks: List[int] = []
+    try:
+        for _ in range(WARMUP_POLLS):
+            assert await api.get_status(COLUMNS)
+            await asyncio.sleep(POLL_INTERVAL)
+        tracemalloc.start(TRACEBACK_FRAMES)
+        try:
+            baseline = _integration_snapshot()
+            for _ in range(MEASURED_POLLS):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                assert await api.get_status(COLUMNS)
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+                await asyncio.sleep(POLL_INTERVAL)
+            growth = sum(
+                stat.size_diff
+                for stat in _integration_snapshot().compare_to(baseline, "filename")
+            )
+        finally:
+            tracemalloc.stop()
+    finally:
+        loop.remove_reader(sock.fileno())
+        sock.close()
+        loop.set_debug(debug)
+
+    print(
+        f"\n{MEASURED_POLLS} polls at 10 Hz, reply={len(reply)}B: "
+        f"max poll peak={max(peaks) / 1024:.1f}KiB "
+        f"mean={sum(peaks) / len(peaks) / 1024:.1f}KiB growth={growth / 1024:.1f}KiB"
+    )
+    assert max(peaks) < MAX_POLL_PEAK
+    assert growth / MEASURED_POLLS < MAX_GROWTH_PER_POLL
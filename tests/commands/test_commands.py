@@ -146,9 +146,7 @@ async def test_set_hvac_mode_integration(
     await device.async_set_hvac_mode(HVACMode.HEAT)  # Call async version
 
     # Assert
-    device._api.get_status.assert_called_once_with(
-        initial_options
-    )  # Called by _async_sync_state
+    device._api.get_status.assert_not_called()  # Write-only: no read first
     device._api.send_command.assert_called_once()
     call_args, _ = device._api.send_command.call_args
     sent_opt_keys = call_args[0]
@@ -187,7 +185,7 @@ async def test_set_temperature_integration(
     await device.async_set_temperature(temperature=22.0)  # Call async version
 
     # Assert
-    device._api.get_status.assert_called_once_with(initial_options)
+    device._api.get_status.assert_not_called()  # Write-only: no read first
     device._api.send_command.assert_called_once()
     call_args, _ = device._api.send_command.call_args
     sent_opt_keys = call_args[0]
@@ -228,7 +226,7 @@ async def test_set_fan_mode_integration(
     )  # FIX: Use component's Medium (Index 3)
 
     # Assert
-    device._api.get_status.assert_called_once_with(initial_options)
+    device._api.get_status.assert_not_called()  # Write-only: no read first
     device._api.send_command.assert_called_once()
     call_args, _ = device._api.send_command.call_args
     sent_opt_keys = call_args[0]
@@ -271,7 +269,7 @@ async def test_turn_on_integration(
     await device.async_turn_on()  # Call async version
 
     # Assert
-    device._api.get_status.assert_called_once_with(initial_options)
+    device._api.get_status.assert_not_called()  # Write-only: no read first
     device._api.send_command.assert_called_once()
     call_args, _ = device._api.send_command.call_args
     sent_opt_keys = call_args[0]
@@ -308,7 +306,7 @@ async def test_turn_off_integration(
     await device.async_turn_off()  # Call async version
 
     # Assert
-    device._api.get_status.assert_called_once_with(initial_options)
+    device._api.get_status.assert_not_called()  # Write-only: no read first
     device._api.send_command.assert_called_once()
     call_args, _ = device._api.send_command.call_args
     sent_opt_keys = call_args[0]
@@ -316,3 +314,60 @@ async def test_turn_off_integration(
     assert "Pow" in sent_opt_keys
     pow_index = sent_opt_keys.index("Pow")
     assert sent_p_values[pow_index] == 0  # Power OFF
+
+
+async def test_command_applied_optimistically_when_send_fails(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test a command updates the state at once and schedules a fast poll."""
+    device = gree_climate_device()
+    device._state.update_options({"Pow": 1, "Mod": 1, "SetTem": 24})
+    device._api.get_status = AsyncMock()  # type: ignore[method-assign]
+    device._api.send_command = AsyncMock(  # type: ignore[method-assign]
+        side_effect=ConnectionError("no reply")
+    )
+
+    await device.async_set_temperature(temperature=20.0)
+
+    device._api.get_status.assert_not_called()
+    device._api.send_command.assert_awaited_once_with(["SetTem", "StHt"], [20, 0])
+    assert device.target_temperature == 20
+    # Reconciled by a fast poll rather than trusted indefinitely
+    assert device.coordinator.delay == 5
+
+
+async def test_command_reply_confirms_state_without_poll(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test values echoed in the command reply are applied and not re-read."""
+    device = gree_climate_device()
+    device._state.update_options({"Pow": 1, "Mod": 1, "SetTem": 24})
+    device._api.send_command = AsyncMock(  # type: ignore[method-assign]
+        return_value={"t": "res", "r": 200, "opt": ["SetTem", "StHt"], "val": [21, 0]}
+    )
+
+    await device.async_set_temperature(temperature=21.0)
+
+    assert device.target_temperature == 21
+    assert device._command_mismatches == {}
+    # No fast verification poll; the confirmed columns are not re-read
+    assert device.coordinator.delay != 5
+    assert "SetTem" not in device._columns._requested
+    assert "TemRec" in device._columns._requested  # Related side effect
+
+
+async def test_command_reply_flags_mismatched_column(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test a column the device set differently is flagged and re-read."""
+    device = gree_climate_device()
+    device._state.update_options({"Pow": 1, "Mod": 1, "SetTem": 24})
+    device._api.send_command = AsyncMock(  # type: ignore[method-assign]
+        return_value={"t": "res", "r": 200, "opt": ["SetTem", "StHt"], "val": [16, 0]}
+    )
+
+    await device.async_set_temperature(temperature=21.0)
+
+    assert device.target_temperature == 16  # What the device reported
+    assert device._command_mismatches == {"SetTem": (21, 16)}
+    assert "SetTem" in device._columns._requested
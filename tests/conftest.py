@@ -15,6 +15,7 @@ from homeassistant.components.climate import ClimateEntityFeature
 
 # Assuming climate.py is in custom_components/gree relative to the root
 from custom_components.greev2.climate import GreeClimate
+from custom_components.greev2.transport import async_close_endpoint
 from custom_components.greev2.const import (
     DEFAULT_PORT,
     # DEFAULT_TARGET_TEMP_STEP, # Removed unused
@@ -52,6 +53,13 @@ def auto_enable_custom_integrations(enable_custom_integrations):
     yield
 
 
+@pytest.fixture
+async def shared_endpoint(socket_enabled: None) -> AsyncGenerator[None, None]:
+    """Enable real sockets and close the shared UDP endpoint after the test."""
+    yield
+    async_close_endpoint()
+
+
 @pytest.fixture
 async def mock_hass() -> AsyncGenerator[HomeAssistant, None]:
     """Fixture for a basic mock Home Assistant Core object."""
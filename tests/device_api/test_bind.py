@@ -79,8 +79,8 @@ async def test_api_bind_and_get_key_v2_success() -> None:
         assert api._cipher is None
 
         expected_bind_plaintext = (
-            f'{{"cid":"{MOCK_MAC}", "mac":"{MOCK_MAC}","t":"bind","uid":0}}'
-        )
+            f'{{"cid":"{MOCK_MAC}","mac":"{MOCK_MAC}","t":"bind","uid":0}}'
+        ).encode()
         mock_encrypt_gcm.assert_called_once_with(
             generic_gcm_key_bytes, expected_bind_plaintext
         )
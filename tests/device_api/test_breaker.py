@@ -0,0 +1,204 @@
+# pylint: disable=protected-access
+"""Tests for the per-device circuit breaker."""
+
+import asyncio
+from typing import List, Optional
+from unittest.mock import AsyncMock, patch
+
+from custom_components.greev2.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+from custom_components.greev2.const import OPERATION_STATUS
+from custom_components.greev2.device_api import (
+    PROBE_COLUMNS,
+    PROBE_RETRY_POLICY,
+    GreeDeviceApi,
+    RetryPolicy,
+)
+
+from ..conftest import MOCK_MAC
+from .test_retry import STATUS_REPLY
+from .test_transport import LOCALHOST, V1_TEST_KEY, start_fake_device, v1_reply
+
+
+def test_breaker_opens_at_threshold_and_backs_off() -> None:
+    """Test consecutive failures open it and each failed probe doubles the delay."""
+    breaker = CircuitBreaker(failure_threshold=3, base_delay=10, max_delay=25)
+
+    breaker.record_failure(now=0)
+    breaker.record_failure(now=1)
+    assert breaker.state(now=1) == STATE_CLOSED
+    breaker.record_failure(now=2)
+    assert breaker.state(now=2) == STATE_OPEN
+    assert breaker.state(now=12) == STATE_HALF_OPEN
+
+    breaker.record_failure(now=12)  # Failed probe
+    assert breaker.state(now=31) == STATE_OPEN
+    assert breaker.state(now=32) == STATE_HALF_OPEN
+    breaker.record_failure(now=32)
+    assert breaker.state(now=56) == STATE_OPEN
+    assert breaker.state(now=57) == STATE_HALF_OPEN  # Capped at max_delay
+
+
+def test_breaker_success_closes_and_resets() -> None:
+    """Test an answer closes the breaker and restarts the delay schedule."""
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=10, max_delay=100)
+    breaker.record_failure(now=0)
+    breaker.record_failure(now=10)
+    breaker.record_failure(now=15)  # Late failure while open is not counted
+
+    breaker.record_success()
+    assert breaker.state(now=15) == STATE_CLOSED
+    assert breaker.as_dict()["trips"] == 0
+
+    breaker.record_failure(now=20)
+    assert breaker.state(now=29) == STATE_OPEN
+    assert breaker.state(now=30) == STATE_HALF_OPEN
+
+
+async def test_api_open_breaker_answers_without_traffic() -> None:
+    """Test an open breaker refuses reads and commands without sending."""
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=7000,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    api.breaker = CircuitBreaker(failure_threshold=1, base_delay=60)
+    api.breaker.record_failure()
+
+    with (
+        patch.object(api, "_async_fetch_status", AsyncMock()) as mock_fetch,
+        patch.object(api, "_fetch_result", AsyncMock()) as mock_fetch_result,
+    ):
+        assert await api.get_status(["Pow"]) is None
+        assert await api.send_command(["Pow"], [1]) is None
+
+    mock_fetch.assert_not_awaited()
+    mock_fetch_result.assert_not_awaited()
+    assert api.breaker.rejected == 2
+
+
+async def test_api_half_open_callers_share_one_probe() -> None:
+    """Test callers arriving while half-open wait for a single cheap probe."""
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=7000,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    api.breaker = CircuitBreaker(failure_threshold=1, base_delay=0)
+    api.breaker.record_failure()
+
+    async def fetch(
+        columns: List[str],
+        policy: Optional[RetryPolicy] = None,
+        count_failures: bool = True,
+    ):
+        if policy is PROBE_RETRY_POLICY:
+            api.breaker.record_success()
+        return [1] * len(columns)
+
+    with patch.object(
+        api, "_async_fetch_status", AsyncMock(side_effect=fetch)
+    ) as mock_fetch:
+        results = await asyncio.gather(
+            api.get_status(["Pow"]), api.get_status(["SetTem"])
+        )
+
+    assert results == [[1], [1]]
+    assert mock_fetch.await_args_list[0].args == (PROBE_COLUMNS, PROBE_RETRY_POLICY)
+    assert mock_fetch.await_count == 2  # The probe, then one shared read
+
+
+async def test_api_breaker_stops_traffic_and_recovers(shared_endpoint: None) -> None:
+    """Test a silent device is left alone until a probe sees it answer again."""
+    online: List[bool] = [False]
+    transport, device, port = await start_fake_device(
+        lambda data: v1_reply(STATUS_REPLY) if online[0] else None
+    )
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=0.1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+        retry_policies={
+            OPERATION_STATUS: RetryPolicy(
+                attempts=1, base_delay=0.01, max_delay=0.01, deadline=0.1
+            )
+        },
+        status_ttl=0,
+    )
+    api.breaker = CircuitBreaker(failure_threshold=2, base_delay=0.05)
+    try:
+        assert await api.get_status(["Pow"]) is None
+        assert await api.get_status(["Pow"]) is None
+        assert api.breaker.state() == STATE_OPEN
+        assert await api.get_status(["Pow"]) is None
+        assert len(device.requests) == 2  # The open breaker sent nothing
+
+        online[0] = True
+        await asyncio.sleep(0.06)
+        assert await api.get_status(["Pow"]) == [1]
+    finally:
+        transport.close()
+    assert len(device.requests) == 4  # The probe, then the read
+    assert api.breaker.state() == STATE_CLOSED
+
+
+async def test_api_unanswered_exact_request_not_counted(shared_endpoint: None) -> None:
+    """Test probe requests that firmware may drop do not open the breaker."""
+    transport, _, port = await start_fake_device(None)
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=0.1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+        retry_policies={
+            OPERATION_STATUS: RetryPolicy(
+                attempts=1, base_delay=0.01, max_delay=0.01, deadline=0.1
+            )
+        },
+    )
+    api.breaker = CircuitBreaker(failure_threshold=1)
+    try:
+        assert await api.get_status(["Dwet"], exact=True) is None
+        assert api.breaker.state() == STATE_CLOSED
+        assert await api.get_status(["Pow"]) is None
+    finally:
+        transport.close()
+    assert api.breaker.state() == STATE_OPEN
+
+
+async def test_api_bind_gated_by_breaker(shared_endpoint: None) -> None:
+    """Test an unplugged device is not bound on every poll; binding probes it."""
+    bind_reply = v1_reply(
+        {"t": "bindok", "mac": MOCK_MAC, "key": "fedcba9876543210"},
+        key=b"a3K8Bx%2r8Y7#xDh",
+    )
+    transport, device, port = await start_fake_device(lambda _: bind_reply)
+    api = GreeDeviceApi(
+        host=LOCALHOST, port=port, mac=MOCK_MAC, timeout=1, encryption_version=1
+    )
+    api.breaker = CircuitBreaker(failure_threshold=1, base_delay=0.05)
+    api.breaker.record_failure()
+    try:
+        assert await api.bind_and_get_key() is False
+        assert not device.requests  # Refused without traffic while open
+        await asyncio.sleep(0.06)
+        assert await api.bind_and_get_key() is True  # Half-open: the bind probes
+    finally:
+        transport.close()
+    assert len(device.requests) == 1
+    assert api.breaker.state() == STATE_CLOSED
@@ -1,6 +1,7 @@
 # pylint: disable=protected-access
 """Tests for the GreeDeviceApi get_status method."""
 
+import asyncio
 import json
 import socket  # Import socket for timeout exception
 from unittest.mock import patch, MagicMock, AsyncMock
@@ -8,6 +9,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
 
 # Import the class to test
+from custom_components.greev2.codec import pad
 from custom_components.greev2.device_api import GreeDeviceApi
 from custom_components.greev2.const import DEFAULT_TIMEOUT
 
@@ -37,16 +39,14 @@ async def test_api_get_status_v1_success() -> None:
     # Mock dependencies
     with (
         patch.object(api, "_fetch_result", new_callable=AsyncMock) as mock_fetch_result,
-        patch.object(api, "_pad") as mock_pad,  # pylint: disable=unused-variable
         patch("base64.b64encode") as mock_b64encode,  # pylint: disable=unused-variable
     ):
 
         # Configure mocks
         mock_fetch_result.return_value = expected_response_pack
-        cols_json = json.dumps(properties_to_get)
-        plaintext_payload = f'{{"cols":{cols_json},"mac":"{MOCK_MAC}","t":"status"}}'
-        mock_padded_payload = plaintext_payload + "padding"  # Simplified mock padding
-        mock_pad.return_value = mock_padded_payload
+        plaintext_payload = (
+            f'{{"cols":["Pow","SetTem","Lig"],"mac":"{MOCK_MAC}","t":"status"}}'
+        ).encode()
         mock_encrypted_bytes = b"encrypted_data"
         mock_cipher.encrypt.return_value = mock_encrypted_bytes
         mock_b64_encoded_pack = "ZW5jcnlwdGVkX2RhdGE="  # base64 of "encrypted_data"
@@ -61,8 +61,7 @@ async def test_api_get_status_v1_success() -> None:
         assert status_result == expected_status_values
 
         # Verify mocks
-        mock_pad.assert_called_once_with(plaintext_payload)
-        mock_cipher.encrypt.assert_called_once_with(mock_padded_payload.encode("utf8"))
+        mock_cipher.encrypt.assert_called_once_with(pad(plaintext_payload))
         mock_b64encode.assert_called_once_with(mock_encrypted_bytes)
 
         expected_sent_payload_dict = {
@@ -117,8 +116,9 @@ async def test_api_get_status_v2_success() -> None:
         # _fetch_result needs to return the *decrypted* pack for get_status to process
         mock_fetch_result.return_value = expected_response_pack_decrypted
 
-        cols_json = json.dumps(properties_to_get)
-        plaintext_payload = f'{{"cols":{cols_json},"mac":"{MOCK_MAC}","t":"status"}}'
+        plaintext_payload = (
+            f'{{"cols":["Pow","SetTem","Lig"],"mac":"{MOCK_MAC}","t":"status"}}'
+        ).encode()
 
         # Act
         status_result = await api.get_status(properties_to_get)
@@ -201,9 +201,6 @@ async def test_api_get_status_failure(
     # Patch dependencies
     with (
         patch.object(api, "_fetch_result", new_callable=AsyncMock) as mock_fetch_result,
-        patch.object(
-            api, "_pad", return_value="padded"
-        ) as mock_pad,  # pylint: disable=unused-variable
         patch(
             "base64.b64encode", return_value=b"encoded"
         ) as mock_b64encode,  # pylint: disable=unused-variable
@@ -250,3 +247,180 @@ async def test_api_get_status_failure(
                 await api.get_status(properties_to_get)
             # Ensure fetch was still called
             mock_fetch_result.assert_awaited_once()
+
+
+def _bound_api(status_ttl: float = 1.0) -> GreeDeviceApi:
+    """Return a bound V2 API whose status requests are answered by a mock."""
+    return GreeDeviceApi(
+        host=MOCK_IP,
+        port=MOCK_PORT,
+        mac=MOCK_MAC,
+        timeout=DEFAULT_TIMEOUT,
+        encryption_key=b"test_device_key1",
+        encryption_version=2,
+        status_ttl=status_ttl,
+    )
+
+
+def _device_values(columns, count_failures=True):
+    """Return a distinct value per column, as a device would."""
+    return [f"{column}-value" for column in columns]
+
+
+async def test_api_get_status_concurrent_callers_share_superset_request() -> None:
+    """Test concurrent callers share one request widened to all their columns."""
+    api = _bound_api()
+    with patch.object(
+        api, "_async_fetch_status", AsyncMock(side_effect=_device_values)
+    ) as mock_fetch:
+        results = await asyncio.gather(
+            api.get_status(["Pow", "SetTem"]),
+            api.get_status(["SetTem", "Lig"]),
+            api.get_status(["Pow"]),
+        )
+
+    mock_fetch.assert_awaited_once_with(["Pow", "SetTem", "Lig"], count_failures=True)
+    assert results == [
+        ["Pow-value", "SetTem-value"],
+        ["SetTem-value", "Lig-value"],
+        ["Pow-value"],
+    ]
+    assert api.status_requests_shared == 2
+
+
+async def test_api_get_status_joins_sent_request_only_if_it_covers() -> None:
+    """Test a request already sent is joined only by callers it answers."""
+    api = _bound_api(status_ttl=0)
+    release = asyncio.Event()
+
+    async def slow_device(columns, count_failures=True):
+        await release.wait()
+        return _device_values(columns)
+
+    with patch.object(
+        api, "_async_fetch_status", AsyncMock(side_effect=slow_device)
+    ) as mock_fetch:
+        first = asyncio.ensure_future(api.get_status(["Pow", "SetTem"]))
+        await asyncio.sleep(0)  # Let the request go out
+        covered = asyncio.ensure_future(api.get_status(["SetTem"]))
+        uncovered = asyncio.ensure_future(api.get_status(["Lig"]))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(first, covered, uncovered)
+
+    assert [call.args[0] for call in mock_fetch.await_args_list] == [
+        ["Pow", "SetTem"],
+        ["Lig"],
+    ]
+    assert results == [["Pow-value", "SetTem-value"], ["SetTem-value"], ["Lig-value"]]
+
+
+async def test_api_get_status_answers_from_last_response_within_ttl() -> None:
+    """Test fresh columns are served from cache and stale ones are re-read."""
+    api = _bound_api(status_ttl=30)
+    with patch.object(
+        api, "_async_fetch_status", AsyncMock(side_effect=_device_values)
+    ) as mock_fetch:
+        await api.get_status(["Pow", "SetTem"])
+        assert await api.get_status(["SetTem"]) == ["SetTem-value"]
+        assert mock_fetch.await_count == 1
+        assert api.status_cache_hits == 1
+
+        await api.get_status(["SetTem", "Lig"])  # Lig was never read
+        assert mock_fetch.await_count == 2
+
+        api.status_ttl = 0
+        await api.get_status(["Pow"])
+        assert mock_fetch.await_count == 3
+
+
+async def test_api_get_status_failure_is_not_cached() -> None:
+    """Test a failed read reaches every caller and is not served later."""
+    api = _bound_api(status_ttl=30)
+    with patch.object(
+        api, "_async_fetch_status", AsyncMock(return_value=None)
+    ) as mock_fetch:
+        assert await asyncio.gather(
+            api.get_status(["Pow"]), api.get_status(["Pow"])
+        ) == [None, None]
+        mock_fetch.return_value = [1]
+        assert await api.get_status(["Pow"]) == [1]
+        assert mock_fetch.await_count == 2
+
+
+async def test_api_get_status_command_invalidates_cache() -> None:
+    """Test a command or a new key makes the next read go to the device."""
+    api = _bound_api(status_ttl=30)
+    with (
+        patch.object(
+            api, "_async_fetch_status", AsyncMock(side_effect=_device_values)
+        ) as mock_fetch,
+        patch.object(
+            api, "_fetch_result", AsyncMock(return_value={"t": "res", "r": 200})
+        ),
+    ):
+        await api.get_status(["Pow"])
+        await api.send_command(["Pow"], [1])
+        await api.get_status(["Pow"])
+        assert mock_fetch.await_count == 2
+
+        api.update_encryption_key(b"other_device_key")
+        await api.get_status(["Pow"])
+        assert mock_fetch.await_count == 3
+
+
+async def test_api_status_packet_is_encrypted_once_per_column_set() -> None:
+    """Test repeated polls reuse the encrypted packet until the key changes."""
+    api = _bound_api(status_ttl=0)
+    with (
+        patch.object(api, "_encrypt_gcm", wraps=api._encrypt_gcm) as spy_encrypt,
+        patch.object(
+            api,
+            "_fetch_result",
+            AsyncMock(return_value={"t": "dat", "dat": [1]}),
+        ) as mock_fetch_result,
+    ):
+        await api.get_status(["Pow"])
+        await api.get_status(["Pow"])
+        assert spy_encrypt.call_count == 1
+        assert api.packet_cache_hits == 1
+        first, second = (call.args[1] for call in mock_fetch_result.await_args_list)
+        assert first == second
+
+        await api.get_status(["Lig"])  # Another column set is another packet
+        assert spy_encrypt.call_count == 2
+
+        api.update_encryption_key(b"other_device_key")
+        await api.get_status(["Pow"])
+        assert spy_encrypt.call_count == 3
+        assert mock_fetch_result.await_args.args[1] != first
+
+
+async def test_api_command_packets_are_kept_in_an_lru() -> None:
+    """Test recently repeated commands reuse their packet, oldest evicted first."""
+    api = _bound_api()
+    with (
+        patch("custom_components.greev2.const.PACKET_CACHE_SIZE", 2),
+        patch.object(api, "_encrypt_gcm", wraps=api._encrypt_gcm) as spy_encrypt,
+        patch.object(api, "_fetch_result", AsyncMock(return_value={"t": "res"})),
+    ):
+        for value in (1, 0, 1, 2, 0):
+            await api.send_command(["Pow"], [value])
+
+    # Pow=1 is reused; Pow=0 was evicted by Pow=2 and encrypted again
+    assert spy_encrypt.call_count == 4
+    assert api.packet_cache_hits == 1
+
+
+async def test_api_command_packet_cache_tells_int_from_float() -> None:
+    """Test equal values of different types do not share a cached packet."""
+    api = _bound_api()
+    with patch.object(
+        api, "_fetch_result", AsyncMock(return_value={"t": "res"})
+    ) as mock_fetch_result:
+        await api.send_command(["SetTem"], [25])
+        await api.send_command(["SetTem"], [25.0])
+
+    assert api.packet_cache_hits == 0
+    first, second = (call.args[1] for call in mock_fetch_result.await_args_list)
+    assert first != second
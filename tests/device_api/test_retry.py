@@ -0,0 +1,132 @@
+# pylint: disable=protected-access
+"""Tests for the GreeDeviceApi retry policy."""
+
+import asyncio
+import json
+from typing import Optional
+
+from custom_components.greev2.const import OPERATION_COMMAND, OPERATION_STATUS
+from custom_components.greev2.device_api import (
+    DEFAULT_RETRY_POLICIES,
+    GreeDeviceApi,
+    RetryPolicy,
+)
+from custom_components.greev2.transport import async_get_endpoint
+
+from ..conftest import MOCK_MAC
+from .test_transport import LOCALHOST, V1_TEST_KEY, start_fake_device, v1_reply
+
+STATUS_REPLY = {"t": "dat", "cols": ["Pow"], "dat": [1]}
+COMMAND_ACK = {"t": "res", "opt": ["Pow"], "p": [1], "val": [1]}
+FAST_COMMAND_RETRIES = {
+    OPERATION_COMMAND: RetryPolicy(
+        attempts=3, base_delay=0.01, max_delay=0.02, deadline=2.0
+    )
+}
+
+
+def _api(port: int, timeout: float = 2.0, **kwargs) -> GreeDeviceApi:
+    return GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=timeout,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+        **kwargs,
+    )
+
+
+def _drop_first(reply: bytes):
+    """Return a device reply callback that ignores the first request."""
+    seen = []
+
+    def answer(data: bytes) -> Optional[bytes]:
+        seen.append(data)
+        return reply if len(seen) > 1 else None
+
+    return answer
+
+
+def test_backoff_delay_is_exponential_capped_and_jittered() -> None:
+    """Test backoff doubles per retry, is capped, and jitter only shortens it."""
+    policy = RetryPolicy(attempts=5, base_delay=0.1, max_delay=0.3, deadline=5)
+    for _ in range(20):
+        assert 0.05 <= policy.backoff_delay(1) <= 0.1
+        assert 0.1 <= policy.backoff_delay(2) <= 0.2
+        assert 0.15 <= policy.backoff_delay(4) <= 0.3
+    no_jitter = RetryPolicy(attempts=2, base_delay=0.1, max_delay=1, deadline=5, jitter=0)
+    assert no_jitter.backoff_delay(1) == 0.1
+
+
+def test_default_policies() -> None:
+    """Test only idempotent status reads are hedged."""
+    assert DEFAULT_RETRY_POLICIES[OPERATION_STATUS].hedge is True
+    assert DEFAULT_RETRY_POLICIES[OPERATION_COMMAND].hedge is False
+    assert all(policy.attempts > 1 for policy in DEFAULT_RETRY_POLICIES.values())
+
+
+async def test_status_hedge_answers_dropped_request(shared_endpoint: None) -> None:
+    """Test a status read survives a dropped datagram via the hedged copy."""
+    transport, device, port = await start_fake_device(
+        _drop_first(v1_reply(STATUS_REPLY))
+    )
+    api = _api(port, timeout=0.5)
+    try:
+        assert await api.get_status(["Pow"]) == [1]
+    finally:
+        transport.close()
+    assert len(device.requests) == 2
+    assert device.requests[0] == device.requests[1]
+    # Karn: an answer to a retransmitted request is not an RTT sample.
+    assert api.rtt_diagnostics[OPERATION_STATUS]["samples"] == 0
+
+
+async def test_command_retransmitted_after_timeout(shared_endpoint: None) -> None:
+    """Test a command is retransmitted with backoff when the ack is lost."""
+    transport, device, port = await start_fake_device(
+        _drop_first(v1_reply(COMMAND_ACK))
+    )
+    api = _api(port, retry_policies=FAST_COMMAND_RETRIES)
+    api._rtt[OPERATION_COMMAND].add_sample(0.01)  # Attempt timeout = floor
+    try:
+        result = await api.send_command(["Pow"], [1])
+    finally:
+        transport.close()
+    assert result is not None and result["opt"] == ["Pow"]
+    assert len(device.requests) == 2
+    assert api.rtt_diagnostics[OPERATION_COMMAND]["timeouts"] == 1
+
+
+async def test_duplicate_acks_applied_once(shared_endpoint: None) -> None:
+    """Test duplicate acks for one command resolve it once; the rest are late."""
+    ack = v1_reply(COMMAND_ACK)
+    transport, device, port = await start_fake_device(None)
+
+    def answer_twice(_: bytes) -> bytes:
+        device.transport.sendto(ack, device.last_addr)
+        return ack
+
+    device._reply = answer_twice
+    api = _api(port)
+    endpoint = await async_get_endpoint()
+    try:
+        result = await api.send_command(["Pow"], [1])
+        await asyncio.sleep(0.05)
+    finally:
+        transport.close()
+    assert result is not None
+    assert len(device.requests) == 1
+    assert endpoint.late_datagrams == 1
+
+
+async def test_gives_up_after_deadline(shared_endpoint: None) -> None:
+    """Test retries stop at the per-operation deadline."""
+    transport, device, port = await start_fake_device(None)
+    api = _api(port, timeout=0.2, retry_policies=FAST_COMMAND_RETRIES)
+    try:
+        assert await api.send_command(["Pow"], [1]) is None
+    finally:
+        transport.close()
+    assert 1 <= len(device.requests) <= 3
+    assert json.loads(device.requests[0])["tcid"] == MOCK_MAC
@@ -0,0 +1,109 @@
+# pylint: disable=protected-access
+"""Tests for RTT estimation and adaptive timeouts."""
+
+import pytest
+
+from custom_components.greev2.const import (
+    DEFAULT_TIMEOUT,
+    OPERATION_BIND,
+    OPERATION_COMMAND,
+    OPERATION_STATUS,
+)
+from custom_components.greev2.device_api import GreeDeviceApi
+from custom_components.greev2.rtt import RttEstimator
+
+from ..conftest import MOCK_MAC
+from .test_transport import LOCALHOST, V1_TEST_KEY, start_fake_device, v1_reply
+
+
+def test_estimator_starts_at_ceiling() -> None:
+    """Test the timeout is the ceiling until the first sample arrives."""
+    estimator = RttEstimator(floor=0.5, ceiling=5.0)
+    assert estimator.timeout == 5.0
+    assert estimator.srtt is None
+
+
+def test_estimator_converges_to_floor_for_fast_device() -> None:
+    """Test a fast, stable device drives the timeout down to the floor."""
+    estimator = RttEstimator(floor=0.5, ceiling=5.0)
+    for _ in range(20):
+        estimator.add_sample(0.04)
+    assert estimator.srtt == pytest.approx(0.04)
+    assert estimator.timeout == 0.5
+    assert estimator.samples == 20
+
+
+def test_estimator_tracks_variance() -> None:
+    """Test jittery samples raise the timeout above srtt."""
+    estimator = RttEstimator(floor=0.1, ceiling=5.0)
+    for rtt in (0.2, 0.8, 0.2, 0.8, 0.2, 0.8):
+        estimator.add_sample(rtt)
+    assert estimator.srtt is not None and estimator.rttvar is not None
+    assert estimator.timeout == pytest.approx(estimator.srtt + 4 * estimator.rttvar)
+    assert estimator.timeout > 0.8
+
+
+def test_estimator_backs_off_on_timeout() -> None:
+    """Test timeouts double the timeout up to the ceiling, and a sample resets it."""
+    estimator = RttEstimator(floor=0.5, ceiling=3.0)
+    estimator.add_sample(0.05)
+    assert estimator.timeout == 0.5
+    estimator.on_timeout()
+    assert estimator.timeout == 1.0
+    estimator.on_timeout()
+    estimator.on_timeout()
+    assert estimator.timeout == 3.0
+    assert estimator.timeouts == 3
+    estimator.add_sample(0.05)
+    assert estimator.timeout == 0.5
+
+
+def test_api_has_budget_per_operation() -> None:
+    """Test each operation gets its own estimator capped by the API timeout."""
+    api = GreeDeviceApi(
+        host=LOCALHOST, port=0, mac=MOCK_MAC, timeout=DEFAULT_TIMEOUT
+    )
+    diagnostics = api.rtt_diagnostics
+    assert set(diagnostics) == {OPERATION_BIND, OPERATION_STATUS, OPERATION_COMMAND}
+    assert all(d["ceiling"] <= DEFAULT_TIMEOUT for d in diagnostics.values())
+
+
+async def test_api_records_rtt_samples(shared_endpoint: None) -> None:
+    """Test a successful status request feeds the status estimator."""
+    transport, _, port = await start_fake_device(
+        lambda _: v1_reply({"t": "dat", "cols": ["Pow"], "dat": [1]})
+    )
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=DEFAULT_TIMEOUT,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        assert await api.get_status(["Pow"]) == [1]
+    finally:
+        transport.close()
+    status = api.rtt_diagnostics[OPERATION_STATUS]
+    assert status["samples"] == 1
+    assert status["timeout"] < DEFAULT_TIMEOUT
+    assert api.rtt_diagnostics[OPERATION_COMMAND]["samples"] == 0
+
+
+async def test_api_backs_off_after_timeout(shared_endpoint: None) -> None:
+    """Test an unanswered request backs off the estimator for that operation."""
+    transport, _, port = await start_fake_device(None)
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=0.05,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        assert await api.get_status(["Pow"]) is None
+    finally:
+        transport.close()
+    assert api.rtt_diagnostics[OPERATION_STATUS]["timeouts"] == 1
@@ -8,7 +8,8 @@ from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
 
 # Import the class to test
-from custom_components.greev2.device_api import GreeDeviceApi
+from custom_components.greev2.codec import pad
+from custom_components.greev2.device_api import GreeDeviceApi, parse_command_response
 from custom_components.greev2.const import DEFAULT_TIMEOUT
 
 # Import constants if needed for setup
@@ -41,16 +42,15 @@ async def test_api_send_command_v1_success() -> None:
     # Mock dependencies
     with (
         patch.object(api, "_fetch_result", new_callable=AsyncMock) as mock_fetch_result,
-        patch.object(api, "_pad") as mock_pad,
         patch("base64.b64encode") as mock_b64encode,
     ):
 
         # Configure mocks
         mock_fetch_result.return_value = expected_response_pack
         command_payload_dict = {"opt": opt_keys, "p": p_values, "t": "cmd"}
-        plaintext_payload = json.dumps(command_payload_dict, separators=(",", ":"))
-        mock_padded_payload = plaintext_payload + "padding"  # Simplified mock padding
-        mock_pad.return_value = mock_padded_payload
+        plaintext_payload = json.dumps(
+            command_payload_dict, separators=(",", ":")
+        ).encode()
         mock_encrypted_bytes = b"encrypted_cmd_data"
         mock_cipher.encrypt.return_value = mock_encrypted_bytes
         mock_b64_encoded_pack = (
@@ -65,8 +65,7 @@ async def test_api_send_command_v1_success() -> None:
         assert command_result == expected_response_pack
 
         # Verify mocks
-        mock_pad.assert_called_once_with(plaintext_payload)
-        mock_cipher.encrypt.assert_called_once_with(mock_padded_payload.encode("utf8"))
+        mock_cipher.encrypt.assert_called_once_with(pad(plaintext_payload))
         mock_b64encode.assert_called_once_with(mock_encrypted_bytes)
 
         expected_sent_payload_dict = {
@@ -122,7 +121,9 @@ async def test_api_send_command_v2_success() -> None:
         mock_fetch_result.return_value = expected_response_pack
 
         command_payload_dict = {"opt": opt_keys, "p": p_values, "t": "cmd"}
-        plaintext_payload = json.dumps(command_payload_dict, separators=(",", ":"))
+        plaintext_payload = json.dumps(
+            command_payload_dict, separators=(",", ":")
+        ).encode()
 
         # Act
         command_result = await api.send_command(opt_keys, p_values)
@@ -211,9 +212,6 @@ async def test_api_send_command_failure(
     # Patch dependencies needed before the potential failure point
     with (
         patch.object(api, "_fetch_result", new_callable=AsyncMock) as mock_fetch_result,
-        patch.object(
-            api, "_pad", return_value="padded"
-        ) as mock_pad,  # pylint: disable=unused-variable
         patch(
             "base64.b64encode", return_value=b"encoded"
         ) as mock_b64encode,  # pylint: disable=unused-variable
@@ -234,8 +232,10 @@ async def test_api_send_command_failure(
         elif isinstance(failure_mode, TypeError) and "JSON serialization error" in str(
             failure_mode
         ):
-            # Patch json.dumps specifically for this case
-            json_dumps_patch = patch("json.dumps", side_effect=failure_mode)
+            # Make the pack serializer fail for this case
+            json_dumps_patch = patch(
+                "custom_components.greev2.device_api.dumps", side_effect=failure_mode
+            )
             json_dumps_patch.start()  # Manually start the patch
             # should_fetch_be_called = False # Logic handled below
         elif isinstance(failure_mode, Exception):
@@ -278,3 +278,42 @@ async def test_api_send_command_failure(
             # Manually stop the patch if it was started
             if json_dumps_patch:
                 json_dumps_patch.stop()
+
+
+@pytest.mark.parametrize("value", [float("nan"), 1e16, 2**70])
+async def test_api_send_command_rejects_unencodable_number(value) -> None:
+    """Test numbers the JSON backends would encode differently are not sent."""
+    api = GreeDeviceApi(
+        host=MOCK_IP,
+        port=MOCK_PORT,
+        mac=MOCK_MAC,
+        timeout=DEFAULT_TIMEOUT,
+        encryption_version=1,
+    )
+    api._is_bound = True
+    api._cipher = MagicMock(name="MockEcbCipher")
+    with patch.object(api, "_fetch_result", new_callable=AsyncMock) as mock_fetch:
+        assert await api.send_command(["SetTem"], [value]) is None
+    mock_fetch.assert_not_awaited()
+
+
+@pytest.mark.parametrize(
+    "response, expected",
+    [
+        (
+            {"t": "res", "r": 200, "opt": ["Pow", "SetTem"], "p": [1, 24], "val": [1, 24]},
+            {"Pow": 1, "SetTem": 24},
+        ),
+        # Older firmware echoes only `p`
+        ({"t": "res", "r": 200, "opt": ["Pow"], "p": [0]}, {"Pow": 0}),
+        # The device applied another value than requested
+        ({"t": "res", "r": 200, "opt": ["SetTem"], "val": [30]}, {"SetTem": 30}),
+        ({"t": "res", "r": 400, "opt": ["Pow"], "val": [1]}, None),
+        ({"t": "res", "r": 200, "opt": ["Pow", "Mod"], "val": [1]}, None),
+        ({"t": "res", "r": 200}, None),
+        (None, None),
+    ],
+)
+def test_parse_command_response(response, expected) -> None:
+    """Test confirmed values are read from the command reply."""
+    assert parse_command_response(response, ["Pow"]) == expected
@@ -0,0 +1,439 @@
+# pylint: disable=protected-access
+"""Tests for the asyncio UDP transport used by GreeDeviceApi."""
+
+import asyncio
+import base64
+import json
+import socket
+from typing import Any, Callable, List, Optional, Tuple
+
+import pytest
+
+from custom_components.greev2.codec import pad
+from custom_components.greev2.const import (
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    RECEIVE_BUFFER_SIZE,
+)
+from custom_components.greev2.device_api import GreeDeviceApi
+from custom_components.greev2.transport import (
+    TokenBucket,
+    async_get_endpoint,
+    async_send_and_receive,
+)
+
+from ..conftest import MOCK_MAC
+
+LOCALHOST = "127.0.0.1"
+V1_TEST_KEY = b"0123456789abcdef"
+
+
+class FakeDeviceProtocol(asyncio.DatagramProtocol):
+    """Local UDP server that answers (or ignores) requests."""
+
+    def __init__(self, reply: Optional[Callable[[bytes], Optional[bytes]]]) -> None:
+        self._reply = reply
+        self.transport: Any = None
+        self.requests: list = []
+        self.last_addr: Any = None
+
+    def connection_made(self, transport: Any) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self.requests.append(data)
+        self.last_addr = addr
+        response = self._reply(data) if self._reply is not None else None
+        if response is not None:
+            self.transport.sendto(response, addr)
+
+
+async def start_fake_device(
+    reply: Optional[Callable[[bytes], Optional[bytes]]],
+) -> Tuple[Any, FakeDeviceProtocol, int]:
+    """Start a fake device on an ephemeral localhost port."""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: FakeDeviceProtocol(reply), local_addr=(LOCALHOST, 0)
+    )
+    return transport, protocol, transport.get_extra_info("sockname")[1]
+
+
+def v1_reply(pack: dict, key: bytes = V1_TEST_KEY) -> bytes:
+    """Build a V1 (ECB) encrypted response envelope for the given pack."""
+    # conftest replaces Crypto.Cipher.AES with a mock, so encrypt through an API
+    # instance (its crypto backend was imported before the patch).
+    device_side = GreeDeviceApi(
+        host=LOCALHOST,
+        port=0,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=key,
+        encryption_version=1,
+    )
+    encrypted = device_side._cipher.encrypt(pad(json.dumps(pack).encode("utf8")))
+    return json.dumps(
+        {"t": "pack", "i": 0, "cid": MOCK_MAC, "pack": base64.b64encode(encrypted).decode()}
+    ).encode("utf8")
+
+
+async def test_send_and_receive_returns_reply(shared_endpoint: None) -> None:
+    """Test the transport returns the datagram sent back by the device."""
+    transport, protocol, port = await start_fake_device(lambda data: b"echo:" + data)
+    try:
+        result = await async_send_and_receive(LOCALHOST, port, b"hello", 1)
+    finally:
+        transport.close()
+    assert result == b"echo:hello"
+    assert protocol.requests == [b"hello"]
+
+
+async def test_send_and_receive_timeout(shared_endpoint: None) -> None:
+    """Test a silent device raises socket.timeout without blocking the loop."""
+    transport, _, port = await start_fake_device(None)
+    try:
+        with pytest.raises(socket.timeout):
+            await async_send_and_receive(LOCALHOST, port, b"hello", 0.05)
+    finally:
+        transport.close()
+
+
+async def test_endpoint_receives_into_reused_buffer(shared_endpoint: None) -> None:
+    """Test replies are views of one buffer and oversized ones are dropped."""
+    replies = [b"a" * RECEIVE_BUFFER_SIZE, b"small"]
+    transport, _, port = await start_fake_device(lambda _: replies.pop(0))
+    endpoint = await async_get_endpoint()
+    views: List[Any] = []
+
+    def accept(data: memoryview) -> bytes:
+        views.append(data.obj)
+        return data.tobytes()
+
+    try:
+        with pytest.raises(socket.timeout):
+            await async_send_and_receive(LOCALHOST, port, b"x", 0.05, accept=accept)
+        result = await async_send_and_receive(LOCALHOST, port, b"x", 1, accept=accept)
+    finally:
+        transport.close()
+    assert result == b"small"
+    assert views == [endpoint._buffer]
+    assert endpoint.oversized_datagrams == 1
+
+
+async def test_get_status_over_udp_v1(shared_endpoint: None) -> None:
+    """Test get_status end-to-end against a fake V1 device."""
+    transport, protocol, port = await start_fake_device(
+        lambda _: v1_reply({"t": "dat", "cols": ["Pow", "SetTem"], "dat": [1, 24]})
+    )
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        result = await api.get_status(["Pow", "SetTem"])
+    finally:
+        transport.close()
+    assert result == [1, 24]
+    assert json.loads(protocol.requests[0])["tcid"] == MOCK_MAC
+
+
+async def test_endpoint_shared_between_requests(shared_endpoint: None) -> None:
+    """Test every request goes through one long-lived socket."""
+    transport, protocol, port = await start_fake_device(lambda data: data)
+    try:
+        first = await async_get_endpoint()
+        await async_send_and_receive(LOCALHOST, port, b"one", 1)
+        await async_send_and_receive(LOCALHOST, port, b"two", 1)
+        second = await async_get_endpoint()
+    finally:
+        transport.close()
+    assert first is second
+    assert protocol.requests == [b"one", b"two"]
+
+
+async def test_endpoint_routes_replies_by_address(shared_endpoint: None) -> None:
+    """Test concurrent requests to different devices get their own replies."""
+    transport_a, _, port_a = await start_fake_device(lambda _: b"device-a")
+    transport_b, _, port_b = await start_fake_device(lambda _: b"device-b")
+    try:
+        results = await asyncio.gather(
+            async_send_and_receive(LOCALHOST, port_a, b"x", 1),
+            async_send_and_receive(LOCALHOST, port_b, b"x", 1),
+        )
+    finally:
+        transport_a.close()
+        transport_b.close()
+    assert results == [b"device-a", b"device-b"]
+
+
+async def test_endpoint_routes_by_mac_from_other_address(
+    shared_endpoint: None,
+) -> None:
+    """Test a reply from an unexpected address is routed by the envelope MAC."""
+    loop = asyncio.get_running_loop()
+    endpoint = await async_get_endpoint()
+    endpoint_port = endpoint.sockname[1]
+    other_socket, _ = await loop.create_datagram_endpoint(
+        asyncio.DatagramProtocol, local_addr=(LOCALHOST, 0)
+    )
+    reply = json.dumps({"t": "pack", "cid": MOCK_MAC.replace(":", "")}).encode()
+
+    def reply_from_other_socket(_: bytes) -> None:
+        other_socket.sendto(reply, (LOCALHOST, endpoint_port))
+
+    transport, _, port = await start_fake_device(reply_from_other_socket)
+    try:
+        result = await async_send_and_receive(LOCALHOST, port, b"x", 1, MOCK_MAC)
+    finally:
+        transport.close()
+        other_socket.close()
+    assert result == reply
+
+
+async def test_get_status_drops_stale_replies(shared_endpoint: None) -> None:
+    """Test late replies to earlier requests are not taken as the answer."""
+    command_ack = v1_reply({"t": "res", "opt": ["Pow"], "p": [1], "val": [1]})
+    stale_status = v1_reply({"t": "dat", "cols": ["Pow"], "dat": [0]})
+    fresh_status = v1_reply({"t": "dat", "cols": ["Pow", "SetTem"], "dat": [1, 24]})
+    transport, device, port = await start_fake_device(None)
+
+    def reply(data: bytes) -> bytes:
+        # Two leftovers from earlier requests arrive before the real answer.
+        device.transport.sendto(command_ack, device.last_addr)
+        device.transport.sendto(stale_status, device.last_addr)
+        return fresh_status
+
+    device._reply = reply
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        result = await api.get_status(["Pow", "SetTem"])
+        # A duplicate arriving after the request finished is counted as late.
+        device.transport.sendto(fresh_status, device.last_addr)
+        await asyncio.sleep(0.05)
+        endpoint = await async_get_endpoint()
+    finally:
+        transport.close()
+    assert result == [1, 24]
+    assert endpoint.stale_datagrams == 2
+    assert endpoint.late_datagrams == 1
+
+
+async def test_bind_over_udp_v1(shared_endpoint: None) -> None:
+    """Test V1 binding decrypts the reply with the generic key."""
+    bind_reply = v1_reply(
+        {"t": "bindok", "mac": MOCK_MAC, "key": "fedcba9876543210"},
+        key=b"a3K8Bx%2r8Y7#xDh",
+    )
+    transport, _, port = await start_fake_device(lambda _: bind_reply)
+    api = GreeDeviceApi(
+        host=LOCALHOST, port=port, mac=MOCK_MAC, timeout=1, encryption_version=1
+    )
+    try:
+        assert await api.bind_and_get_key() is True
+    finally:
+        transport.close()
+    assert api._encryption_key == b"fedcba9876543210"
+
+
+async def test_get_status_with_rejected_key_unbinds(shared_endpoint: None) -> None:
+    """Test a reply that cannot be decrypted drops the key so the caller re-binds."""
+    transport, _, port = await start_fake_device(
+        lambda _: v1_reply(
+            {"t": "dat", "cols": ["Pow"], "dat": [1]}, key=b"fedcba9876543210"
+        )
+    )
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        assert await api.get_status(["Pow"]) is None
+    finally:
+        transport.close()
+    assert api._is_bound is False
+
+
+async def test_reply_for_other_key_does_not_fail_pending_bind(
+    shared_endpoint: None,
+) -> None:
+    """Test a reply only another in-flight request can decrypt is passed on."""
+    status_reply = v1_reply({"t": "dat", "cols": ["Pow"], "dat": [1]})
+    bind_reply = v1_reply(
+        {"t": "bindok", "mac": MOCK_MAC, "key": "fedcba9876543210"},
+        key=b"a3K8Bx%2r8Y7#xDh",
+    )
+    transport, device, port = await start_fake_device(None)
+
+    def reply(data: bytes) -> Optional[bytes]:
+        if len(device.requests) < 2:
+            return None
+        # The status reply (device key) reaches the bind (generic key) first.
+        device.transport.sendto(status_reply, device.last_addr)
+        return bind_reply
+
+    device._reply = reply
+    # E.g. a config flow binding while the entity polls the same device
+    binding = GreeDeviceApi(
+        host=LOCALHOST, port=port, mac=MOCK_MAC, timeout=1, encryption_version=1
+    )
+    polling = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        bound, status = await asyncio.gather(
+            binding.bind_and_get_key(), polling.get_status(["Pow"])
+        )
+    finally:
+        transport.close()
+    assert bound is True
+    assert status == [1]
+    assert polling._is_bound is True
+
+
+async def test_token_bucket_allows_burst_then_paces() -> None:
+    """Test the bucket sends a burst at once, then one packet per 1/rate."""
+    bucket = TokenBucket(rate=100.0, burst=3)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    for _ in range(3):
+        await bucket.async_acquire()
+    assert bucket.delayed == 0
+    burst_elapsed = loop.time() - started
+
+    for _ in range(3):
+        await bucket.async_acquire()
+    paced_elapsed = loop.time() - started
+
+    assert burst_elapsed < 0.01
+    assert bucket.delayed == 3
+    assert paced_elapsed >= 0.025  # Three tokens at 100/s, minus timer slack
+
+
+async def test_token_bucket_serves_commands_first() -> None:
+    """Test a command packet skips polls already waiting for a token."""
+    bucket = TokenBucket(rate=100.0, burst=1)
+    await bucket.async_acquire()  # Empty the bucket
+    order: List[str] = []
+
+    async def acquire(name: str, priority: int) -> None:
+        await bucket.async_acquire(priority)
+        order.append(name)
+
+    polls = [
+        asyncio.ensure_future(acquire(f"poll{index}", PRIORITY_POLL))
+        for index in range(3)
+    ]
+    await asyncio.sleep(0)
+    await acquire("command", PRIORITY_COMMAND)
+    await asyncio.gather(*polls)
+    assert order == ["command", "poll0", "poll1", "poll2"]
+    assert bucket.delayed == 4
+
+
+async def test_abandoned_status_request_stops_retransmitting(
+    shared_endpoint: None,
+) -> None:
+    """Test a status request nobody waits for any more is taken off the wire."""
+    transport, device, port = await start_fake_device(None)
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=0.2,  # The hedge would go out at 0.1 s
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        poll = asyncio.ensure_future(api.get_status(["Pow"]))
+        await asyncio.sleep(0.02)
+        poll.cancel()  # E.g. the poll was interrupted by a command
+        with pytest.raises(asyncio.CancelledError):
+            await poll
+        await asyncio.sleep(0.2)
+    finally:
+        transport.close()
+    assert len(device.requests) == 1
+    assert not api._status_flights
+
+
+async def test_late_reply_to_abandoned_request_is_dropped(
+    shared_endpoint: None,
+) -> None:
+    """Test the next identical request does not take an abandoned one's reply."""
+    transport, device, port = await start_fake_device(None)
+    loop = asyncio.get_running_loop()
+
+    def reply(data: bytes) -> None:
+        # The first poll's (pre-command) state arrives after the second is sent
+        state = [0] if len(device.requests) == 1 else [1]
+        delay = 0.05 if len(device.requests) == 1 else 0.1
+        addr = device.last_addr
+        loop.call_later(
+            delay,
+            device.transport.sendto,
+            v1_reply({"t": "dat", "cols": ["Pow"], "dat": state}),
+            addr,
+        )
+
+    device._reply = reply
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    try:
+        poll = asyncio.ensure_future(api.get_status(["Pow"]))
+        await asyncio.sleep(0.01)
+        poll.cancel()  # Preempted by a command
+        with pytest.raises(asyncio.CancelledError):
+            await poll
+        result = await api.get_status(["Pow"])
+        endpoint = await async_get_endpoint()
+    finally:
+        transport.close()
+    assert result == [1]
+    assert endpoint.late_datagrams == 1
+
+
+async def test_endpoint_paces_sends_through_bucket(shared_endpoint: None) -> None:
+    """Test every request on the shared endpoint draws from its packet budget."""
+    transport, protocol, port = await start_fake_device(lambda data: b"pong")
+    try:
+        endpoint = await async_get_endpoint()
+        endpoint.pacer = TokenBucket(rate=1000.0, burst=1)
+        replies = await asyncio.gather(
+            *(
+                async_send_and_receive(LOCALHOST, port, b"ping", 1.0)
+                for _ in range(3)
+            )
+        )
+    finally:
+        transport.close()
+
+    assert replies == [b"pong"] * 3
+    assert len(protocol.requests) == 3
+    assert endpoint.pacer.delayed == 2
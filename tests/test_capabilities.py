@@ -0,0 +1,300 @@
+# pylint: disable=protected-access
+"""Tests for capability probing and the shared profile cache."""
+
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set
+from unittest.mock import AsyncMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed  # type: ignore[import-untyped]
+
+from custom_components.greev2.capabilities import (
+    CapabilityProfile,
+    async_get_capability_cache,
+    async_probe_capabilities,
+    capability_cache_key,
+)
+from custom_components.greev2.codec import decode_envelope, decode_pack
+from custom_components.greev2.const import (
+    CAPABILITY_SAVE_DELAY,
+    CAPABILITY_STORAGE_KEY,
+    CAPABILITY_STORAGE_VERSION,
+    OPERATION_STATUS,
+)
+from custom_components.greev2.crypto import EcbCipher
+from custom_components.greev2.device_api import GreeDeviceApi, RetryPolicy
+
+from .conftest import MOCK_MAC
+from .device_api.test_transport import (
+    LOCALHOST,
+    V1_TEST_KEY,
+    start_fake_device,
+    v1_reply,
+)
+
+CANDIDATES = ("TemSen", "AntiDirectBlow", "LigSen", "Dwet", "TemRec", "HeatCoolType")
+
+
+def strict_device(supported: Set[str]) -> AsyncMock:
+    """Mock API whose device drops any request with an unknown column."""
+    api = AsyncMock(spec=GreeDeviceApi)
+    api._host = "192.168.1.100"
+
+    async def get_status(
+        columns: List[str], exact: bool = False
+    ) -> Optional[List[int]]:
+        if not set(columns) <= supported:
+            return None
+        return [1] * len(columns)
+
+    api.get_status.side_effect = get_status
+    return api
+
+
+async def test_probe_single_round_trip() -> None:
+    """Test a device answering the batch is probed with one request."""
+    api = AsyncMock(spec=GreeDeviceApi)
+    api._host = "192.168.1.100"
+    api.get_status.return_value = [24, 0, "", 0, 25, ""]
+    profile = await async_probe_capabilities(api, CANDIDATES)
+    assert profile.supported == ("TemSen", "AntiDirectBlow", "Dwet", "TemRec")
+    assert profile.unsupported == ("LigSen", "HeatCoolType")
+    assert profile.round_trips == 1
+    assert profile.supports("TemSen")
+    assert not profile.supports("LigSen")
+
+
+async def test_probe_bisects_rejected_batch() -> None:
+    """Test a rejected batch is bisected down to the unsupported columns."""
+    api = strict_device({"Pow", "TemSen", "TemRec", "HeatCoolType"})
+    profile = await async_probe_capabilities(api, CANDIDATES)
+    assert profile == CapabilityProfile(
+        supported=("TemSen", "TemRec", "HeatCoolType"),
+        unsupported=("AntiDirectBlow", "LigSen", "Dwet"),
+    )
+    # At most a full binary tree, each unanswered batch re-checking the baseline
+    assert 2 < profile.round_trips < 2 * (2 * len(CANDIDATES) - 1)
+
+
+async def test_probe_bisection_is_concurrent() -> None:
+    """Test both halves of a rejected batch are probed at the same time."""
+    in_flight = 0
+    peak = 0
+    api = AsyncMock(spec=GreeDeviceApi)
+    api._host = "192.168.1.100"
+
+    async def get_status(
+        columns: List[str], exact: bool = False
+    ) -> Optional[List[int]]:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return None if "LigSen" in columns and len(columns) > 1 else [1] * len(columns)
+
+    api.get_status.side_effect = get_status
+    profile = await async_probe_capabilities(api, CANDIDATES)
+    assert profile.supported == CANDIDATES
+    assert peak >= 2
+
+
+async def test_probe_unreachable_device() -> None:
+    """Test a device that answers nothing raises instead of being bisected."""
+    api = strict_device(set())
+    with pytest.raises(ConnectionError):
+        await async_probe_capabilities(api, CANDIDATES)
+    assert api.get_status.call_count == 2
+
+
+async def test_probe_leaves_columns_undetermined_when_device_stops_answering() -> None:
+    """Test unanswered columns are only unsupported while the baseline answers."""
+    api = AsyncMock(spec=GreeDeviceApi)
+    api._host = "192.168.1.100"
+    baselines = 0
+
+    async def get_status(
+        columns: List[str], exact: bool = False
+    ) -> Optional[List[int]]:
+        nonlocal baselines
+        if columns == ["Pow"]:
+            baselines += 1
+            return [1] if baselines == 1 else None  # Offline after the first
+        return None if "Dwet" in columns else [1] * len(columns)
+
+    api.get_status.side_effect = get_status
+    profile = await async_probe_capabilities(api, CANDIDATES)
+    assert profile.supported == ("TemSen", "AntiDirectBlow", "LigSen")
+    assert profile.unsupported == ()
+    assert profile.undetermined == ("Dwet", "TemRec", "HeatCoolType")
+    assert not profile.covers(CANDIDATES)
+
+
+async def test_probe_real_api_against_column_rejecting_device(
+    shared_endpoint: None,
+) -> None:
+    """Test bisection over the real API sends each half with its own columns."""
+    cipher = EcbCipher(V1_TEST_KEY)
+    probed: List[List[str]] = []
+
+    def reply(data: bytes) -> Optional[bytes]:
+        columns = decode_pack(cipher.decrypt(decode_envelope(data)[0]))["cols"]
+        probed.append(columns)
+        if "Dwet" in columns:
+            return None  # Firmware drops a request with a column it does not know
+        return v1_reply({"t": "dat", "cols": columns, "dat": [1] * len(columns)})
+
+    transport, _, port = await start_fake_device(reply)
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=port,
+        mac=MOCK_MAC,
+        timeout=0.3,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+        # One packet per request, so every packet is a separate probe
+        retry_policies={
+            OPERATION_STATUS: RetryPolicy(
+                attempts=1, base_delay=0.0, max_delay=0.0, deadline=0.3
+            )
+        },
+    )
+    try:
+        profile = await async_probe_capabilities(api, CANDIDATES)
+    finally:
+        transport.close()
+    assert profile.unsupported == ("Dwet",)
+    assert profile.supported == tuple(c for c in CANDIDATES if c != "Dwet")
+    assert probed.count(list(CANDIDATES)) == 1
+
+
+PROFILE = CapabilityProfile(
+    supported=("TemSen", "TemRec", "HeatCoolType"),
+    unsupported=("AntiDirectBlow", "LigSen", "Dwet"),
+)
+
+
+def test_cache_key_needs_model_and_firmware() -> None:
+    """Test devices without a known model/firmware are not shared."""
+    assert capability_cache_key("gree", "10001", "V1.1.13") == "gree/10001/V1.1.13"
+    assert capability_cache_key("gree", None, "V1.1.13") == "gree//V1.1.13"
+    assert capability_cache_key(None, "10001", "V1.1.13") is None
+    assert capability_cache_key("gree", "10001", "") is None
+
+
+async def test_cache_probes_once_for_identical_devices(
+    hass: HomeAssistant, hass_storage: Dict[str, Any]
+) -> None:
+    """Test identical devices starting together share one probe, then persist it."""
+    cache = await async_get_capability_cache(hass)
+    probe = AsyncMock(return_value=PROFILE)
+
+    async def slow_probe() -> CapabilityProfile:
+        await asyncio.sleep(0.01)
+        return await probe()
+
+    profiles = await asyncio.gather(
+        *(cache.async_get_profile("gree//V1.1.13", slow_probe) for _ in range(5))
+    )
+    assert profiles == [PROFILE] * 5
+    assert probe.await_count == 1
+    # A restarted device of the same profile skips probing entirely
+    assert await cache.async_get_profile("gree//V1.1.13", probe) == PROFILE
+    assert probe.await_count == 1
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=CAPABILITY_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    stored = hass_storage[CAPABILITY_STORAGE_KEY]["data"]["profiles"]
+    assert stored["gree//V1.1.13"] == PROFILE.as_dict()
+
+
+async def test_cache_loads_stored_profiles(
+    hass: HomeAssistant, hass_storage: Dict[str, Any]
+) -> None:
+    """Test stored profiles are used after a restart; a new firmware is probed."""
+    hass_storage[CAPABILITY_STORAGE_KEY] = {
+        "version": CAPABILITY_STORAGE_VERSION,
+        "key": CAPABILITY_STORAGE_KEY,
+        "data": {"profiles": {"gree//V1.1.13": PROFILE.as_dict()}},
+    }
+    cache = await async_get_capability_cache(hass)
+    probe = AsyncMock(return_value=PROFILE)
+    assert await cache.async_get_profile("gree//V1.1.13", probe) == PROFILE
+    probe.assert_not_awaited()
+    await cache.async_get_profile("gree//V1.2.0", probe)
+    probe.assert_awaited_once()
+
+
+async def test_cache_failed_probe_not_shared(hass: HomeAssistant) -> None:
+    """Test a failed probe is not cached and waiting devices probe themselves."""
+    cache = await async_get_capability_cache(hass)
+
+    async def offline() -> CapabilityProfile:
+        await asyncio.sleep(0.01)
+        raise ConnectionError("offline")
+
+    online = AsyncMock(return_value=PROFILE)
+    results = await asyncio.gather(
+        cache.async_get_profile("gree//V1", offline),
+        cache.async_get_profile("gree//V1", online),
+        return_exceptions=True,
+    )
+    assert isinstance(results[0], ConnectionError)
+    assert results[1] == PROFILE
+    online.assert_awaited_once()
+
+
+async def test_cache_incomplete_profile_not_shared(
+    hass: HomeAssistant, hass_storage: Dict[str, Any]
+) -> None:
+    """Test a profile with undetermined columns is neither shared nor stored."""
+    cache = await async_get_capability_cache(hass)
+    partial = CapabilityProfile(
+        supported=("TemSen",),
+        unsupported=(),
+        undetermined=CANDIDATES[1:],
+    )
+
+    async def flaky() -> CapabilityProfile:
+        await asyncio.sleep(0.01)
+        return partial
+
+    online = AsyncMock(return_value=PROFILE)
+    results = await asyncio.gather(
+        cache.async_get_profile("gree//V1", flaky),
+        cache.async_get_profile("gree//V1", online),
+    )
+    assert results == [partial, PROFILE]
+    online.assert_awaited_once()
+
+    # The complete profile is the one kept; a later device reuses it
+    assert await cache.async_get_profile("gree//V1", flaky) == PROFILE
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=CAPABILITY_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    stored = hass_storage[CAPABILITY_STORAGE_KEY]["data"]["profiles"]
+    assert stored == {"gree//V1": PROFILE.as_dict()}
+
+
+async def test_cache_reprobes_after_incomplete_profile(hass: HomeAssistant) -> None:
+    """Test the next device of a key probes again after an incomplete probe."""
+    cache = await async_get_capability_cache(hass)
+    partial = CapabilityProfile(
+        supported=(), unsupported=(), undetermined=CANDIDATES
+    )
+    probe = AsyncMock(side_effect=[partial, PROFILE])
+    assert await cache.async_get_profile("gree//V1", probe) == partial
+    assert await cache.async_get_profile("gree//V1", probe) == PROFILE
+    assert probe.await_count == 2
+
+
+def test_cached_profile_must_cover_candidates() -> None:
+    """Test profiles probed before a candidate column was added are re-probed."""
+    assert PROFILE.covers(CANDIDATES)
+    assert not PROFILE.covers(CANDIDATES + ("NewColumn",))
@@ -20,7 +20,12 @@ from custom_components.greev2.const import (
 )
 
 # Import detect_features and GreeDeviceApi for testing
-from custom_components.greev2.climate_helpers import GreeClimateState, detect_features
+from custom_components.greev2.climate_helpers import (
+    ColumnScheduler,
+    GreeClimateState,
+    detect_features,
+)
+from custom_components.greev2.const import CAPABILITY_COLUMNS
 from custom_components.greev2.device_api import GreeDeviceApi
 
 
@@ -332,16 +337,15 @@ def test_anti_direct_blow_state_property(climate_state: GreeClimateState):
 
 @pytest.mark.asyncio
 async def test_detect_features_all_found():
-    """Test detect_features when all features are found."""
+    """Test detect_features when all features are found in one request."""
     mock_api = AsyncMock(spec=GreeDeviceApi)
-    # Simulate successful API responses (return a list, content doesn't matter here)
-    mock_api.get_status.side_effect = [
-        [25],  # TemSen found
-        [1],  # AntiDirectBlow found
-        [1],  # LigSen found
-    ]
+    mock_api._host = "192.168.1.100"
+    # One status reply for every candidate column
+    mock_api.get_status.return_value = [25, 1, 1, 50, 25, 1]
     initial_options = ["Pow", "Mod"]
-    expected_options = ["Pow", "Mod", "TemSen", "AntiDirectBlow", "LigSen"]
+    expected_options = [
+        "Pow", "Mod", "TemSen", "AntiDirectBlow", "LigSen", "Dwet", "TemRec", "HeatCoolType"
+    ]
 
     has_temp, has_adb, has_light, final_options = await detect_features(
         mock_api, initial_options
@@ -350,27 +354,18 @@ async def test_detect_features_all_found():
     assert has_temp is True
     assert has_adb is True
     assert has_light is True
-    assert sorted(final_options) == sorted(
-        expected_options
-    )  # Sort for comparison consistency
-    assert mock_api.get_status.call_count == 3
-    mock_api.get_status.assert_any_call(["TemSen"])
-    mock_api.get_status.assert_any_call(["AntiDirectBlow"])
-    mock_api.get_status.assert_any_call(["LigSen"])
+    assert sorted(final_options) == sorted(expected_options)
+    mock_api.get_status.assert_called_once_with(list(CAPABILITY_COLUMNS), exact=True)
 
 
 @pytest.mark.asyncio
 async def test_detect_features_none_found():
-    """Test detect_features when no features are found."""
+    """Test detect_features when the device answers with empty values."""
     mock_api = AsyncMock(spec=GreeDeviceApi)
-    # Simulate API responses indicating feature not found (e.g., return None or empty list)
-    mock_api.get_status.side_effect = [
-        None,  # TemSen not found
-        None,  # AntiDirectBlow not found
-        None,  # LigSen not found
-    ]
-    initial_options = ["Pow", "Mod"]
-    expected_options = ["Pow", "Mod"]  # Should remain unchanged
+    mock_api._host = "192.168.1.100"
+    mock_api.get_status.return_value = ["", "", "", "", "", ""]
+    initial_options = ["Pow", "Mod", "TemRec"]
+    expected_options = ["Pow", "Mod", "TemRec"]  # Columns are never removed
 
     has_temp, has_adb, has_light, final_options = await detect_features(
         mock_api, initial_options
@@ -380,18 +375,23 @@ async def test_detect_features_none_found():
     assert has_adb is False
     assert has_light is False
     assert sorted(final_options) == sorted(expected_options)
-    assert mock_api.get_status.call_count == 3
+    assert mock_api.get_status.call_count == 1
 
 
 @pytest.mark.asyncio
 async def test_detect_features_some_found():
-    """Test detect_features when only some features are found."""
+    """Test detect_features bisects when the device rejects the batch."""
+    supported = {"Pow", "TemSen", "LigSen"}
     mock_api = AsyncMock(spec=GreeDeviceApi)
-    mock_api.get_status.side_effect = [
-        [25],  # TemSen found
-        None,  # AntiDirectBlow not found
-        [1],  # LigSen found
-    ]
+    mock_api._host = "192.168.1.100"
+
+    async def get_status(columns, exact=False):
+        # Firmware that drops any request containing an unknown column
+        if not set(columns) <= supported:
+            return None
+        return [1] * len(columns)
+
+    mock_api.get_status.side_effect = get_status
     initial_options = ["Pow", "Mod", "TemSen"]  # TemSen already present
     expected_options = ["Pow", "Mod", "TemSen", "LigSen"]  # Only LigSen should be added
 
@@ -403,32 +403,80 @@ async def test_detect_features_some_found():
     assert has_adb is False
     assert has_light is True
     assert sorted(final_options) == sorted(expected_options)
-    assert mock_api.get_status.call_count == 3
 
 
 @pytest.mark.asyncio
 async def test_detect_features_api_error(caplog):
-    """Test detect_features when API calls raise errors."""
+    """Test detect_features when the device does not answer at all."""
     mock_api = AsyncMock(spec=GreeDeviceApi)
-    mock_api.get_status.side_effect = [
-        socket.timeout("Test timeout"),  # Error on TemSen
-        [1],  # ADB found
-        ConnectionError("Test connection error"),  # Error on LigSen
-    ]
+    mock_api._host = "192.168.1.100"
+    mock_api.get_status.side_effect = socket.timeout("Test timeout")
     initial_options = ["Pow", "Mod"]
-    expected_options = ["Pow", "Mod", "AntiDirectBlow"]  # Only ADB should be added
 
     has_temp, has_adb, has_light, final_options = await detect_features(
         mock_api, initial_options
     )
 
     assert has_temp is False  # Failed detection defaults to False
-    assert has_adb is True
-    assert has_light is False  # Failed detection defaults to False
-    assert sorted(final_options) == sorted(expected_options)
-    assert mock_api.get_status.call_count == 3
-    assert "Error detecting internal temperature sensor: Test timeout" in caplog.text
-    assert "Error detecting light sensor: Test connection error" in caplog.text
+    assert has_adb is False
+    assert has_light is False
+    assert final_options == initial_options  # Nothing removed while offline
+    # The batch and the baseline probe only; no bisection of a dead device
+    assert mock_api.get_status.call_count == 2
+    assert "Error detecting device features" in caplog.text
 
 
 # TODO: Adapt existing tests (test_properties.py, test_update.py, etc.) - This is partially done
+
+
+# --- ColumnScheduler Tests ---
+
+SCHEDULE_TIERS = {
+    "Pow": "every",
+    "Lig": "slow",
+    "TemUn": "startup",
+    "TemRec": "command",
+}
+SCHEDULE_COLUMNS = ["Pow", "Lig", "TemUn", "TemRec"]
+
+
+def test_column_scheduler_tiers():
+    """Test each tier is fetched first, then on its own schedule."""
+    schedule = ColumnScheduler(tiers=SCHEDULE_TIERS, slow_every=3, related={})
+    polled = []
+    for _ in range(7):
+        columns = schedule.due(SCHEDULE_COLUMNS)
+        schedule.on_fetched(columns)
+        polled.append(columns)
+
+    assert polled[0] == SCHEDULE_COLUMNS  # Everything once
+    assert polled[1] == ["Pow"]
+    assert polled[2] == ["Pow"]
+    assert polled[3] == ["Pow", "Lig"]  # Every third poll
+    assert polled[6] == ["Pow", "Lig"]
+
+
+def test_column_scheduler_after_command():
+    """Test a command makes its columns and related columns due once."""
+    schedule = ColumnScheduler(
+        tiers=SCHEDULE_TIERS, slow_every=10, related={"Pow": ("TemRec",)}
+    )
+    schedule.on_fetched(schedule.due(SCHEDULE_COLUMNS))
+
+    schedule.on_command(["Pow", "Lig"])
+    columns = schedule.due(SCHEDULE_COLUMNS)
+    schedule.on_fetched(columns)
+
+    assert columns == ["Pow", "Lig", "TemRec"]
+    assert schedule.due(SCHEDULE_COLUMNS) == ["Pow"]
+
+
+def test_column_scheduler_reset_and_new_columns():
+    """Test a reset, or a column added by feature detection, is fetched in full."""
+    schedule = ColumnScheduler(tiers=SCHEDULE_TIERS, slow_every=10, related={})
+    schedule.on_fetched(schedule.due(SCHEDULE_COLUMNS))
+
+    assert schedule.due(SCHEDULE_COLUMNS + ["TemSen"]) == ["Pow", "TemSen"]
+
+    schedule.reset()
+    assert schedule.due(SCHEDULE_COLUMNS) == SCHEDULE_COLUMNS
@@ -0,0 +1,170 @@
+# pylint: disable=protected-access
+"""Tests for the pack codec."""
+
+import json
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.greev2 import codec
+from custom_components.greev2.codec import (
+    available_json_backends,
+    check_number,
+    decode_envelope,
+    decode_pack,
+    encode_envelope,
+    envelope_field,
+    pad,
+    unpad,
+)
+from custom_components.greev2.device_api import ExpectedReply, GreeDeviceApi
+
+from .conftest import MOCK_MAC
+from .device_api.test_transport import LOCALHOST, V1_TEST_KEY, v1_reply
+
+PACK = b'{"t":"dat","cols":["Pow"],"dat":[1]}'
+
+
+@pytest.mark.parametrize(
+    "padded, body",
+    [
+        (PACK, PACK),  # GCM: not padded
+        (PACK + b"\x0b" * 11, PACK),  # PKCS#7
+        (PACK[:32] + b"\x10" * 16, PACK[:32]),  # PKCS#7 block on an aligned pack
+        (PACK + b"\x00" * 11, PACK),  # Firmware padding with NULs
+        (PACK + b"\n", PACK),
+    ],
+)
+def test_unpad_strips_padding(padded: bytes, body: bytes) -> None:
+    """Test each padding style is stripped, leaving the JSON object."""
+    assert unpad(padded).tobytes() == body
+
+
+def test_unpad_checks_pkcs7_bytes() -> None:
+    """Test bytes that only look like PKCS#7 are not stripped blindly."""
+    assert unpad(PACK + b"\x01\x02").tobytes() == PACK
+    with pytest.raises(ValueError):
+        unpad(b"\x8f\x02\x33\x02")  # Wrong-key garbage without a brace
+    with pytest.raises(ValueError):
+        unpad(b"")
+
+
+def test_unpad_does_not_copy() -> None:
+    """Test the result is a view on the decrypted buffer."""
+    padded = PACK + b"\x0b" * 11
+    assert unpad(padded).obj is padded
+
+
+def test_decode_pack_parses_and_extracts_fields() -> None:
+    """Test packs parse from bytes and can be trimmed to the fields needed."""
+    padded = PACK + b"\x0b" * 11
+    assert decode_pack(padded) == json.loads(PACK)
+    assert decode_pack(padded, ("dat", "cols", "val")) == {
+        "cols": ["Pow"],
+        "dat": [1],
+    }
+    with pytest.raises(ValueError):
+        decode_pack(b'["not", "a", "pack"]')
+    with pytest.raises(ValueError):
+        decode_pack(b'{"t": "dat"' + b"\x05" * 5)
+
+
+def test_decode_envelope_from_buffer_view() -> None:
+    """Test pack and tag are found in place in a receive buffer."""
+    envelope = b'{"t": "pack", "cid": "aabb", "pack": "aGVsbG8=", "tag": "dGFn"}'
+    buffer = bytearray(128)
+    buffer[: len(envelope)] = envelope
+    view = memoryview(buffer)[: len(envelope)]
+
+    assert decode_envelope(view) == (b"hello", b"tag")
+    assert envelope_field(view, "cid").obj is buffer
+    assert decode_envelope(b'{"pack":"aGVsbG8="}') == (b"hello", None)
+
+
+def test_decode_envelope_falls_back_to_json() -> None:
+    """Test escaped envelopes are parsed as JSON and bad ones are refused."""
+    assert decode_envelope(b'{"pack": "aGVs\\/bG8="}') == (b"hel\xfd\xb1\xbc", None)
+    with pytest.raises(KeyError):
+        decode_envelope(b'{"t": "pack"}')
+    with pytest.raises(ValueError):
+        decode_envelope(b"garbage")
+
+
+def test_decode_response_keeps_fields_the_request_reads() -> None:
+    """Test the shared decode entry point trims replies by request type."""
+    api = GreeDeviceApi(
+        host=LOCALHOST,
+        port=0,
+        mac=MOCK_MAC,
+        timeout=1,
+        encryption_key=V1_TEST_KEY,
+        encryption_version=1,
+    )
+    reply = v1_reply(
+        {"t": "dat", "mac": MOCK_MAC, "r": 200, "cols": ["Pow"], "dat": [1], "x": 0}
+    )
+
+    pack = api._decode_response(
+        api._cipher, reply, ExpectedReply("dat", "cols", ("Pow",))
+    )
+
+    assert pack == {"t": "dat", "mac": MOCK_MAC, "r": 200, "cols": ["Pow"], "dat": [1]}
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"cols": ["Pow", "Mod", "SetTem"], "mac": MOCK_MAC, "t": "status"},
+        {"opt": ["Pow", "SetTem", "TemRec"], "p": [1, 23.5, 0], "t": "cmd"},
+        {"p": [0.0, -0.0, 0.0001, 0.1, 1 / 3, 9999999999999998.0, -2**63, 2**64 - 1]},
+        {"cid": "app", "i": 1, "pack": "aGk=", "t": "pack", "tcid": "", "uid": 0},
+        {"name": "Salón \"1\"\n", "lock": None, "on": True, "n": [[-1], {}]},
+    ],
+)
+def test_json_backends_produce_identical_bytes(obj: Any) -> None:
+    """Test orjson and json serialize packets to the same bytes and parse them."""
+    encoded = {backend.name: backend.dumps(obj) for backend in available_json_backends()}
+    assert set(encoded) == {"orjson", "json"}
+    assert len(set(encoded.values())) == 1
+    for backend in available_json_backends():
+        assert backend.loads(memoryview(encoded["json"])) == obj
+
+
+@pytest.mark.parametrize(
+    "value",
+    [float("nan"), float("inf"), 1e16, 1e-5, -1.5e300, 2**64, -(2**63) - 1],
+)
+def test_check_number_rejects_values_the_backends_encode_differently(
+    value: Any,
+) -> None:
+    """Test numbers the backends write differently (or not at all) are rejected."""
+    with pytest.raises(ValueError):
+        check_number(value)
+
+
+def test_incomplete_json_backend_cannot_be_instantiated() -> None:
+    """Test a JSON backend missing loads fails when built, not when used."""
+
+    class DumpsOnlyBackend(codec.JsonBackend):
+        def dumps(self, obj: Any) -> bytes:
+            return b"{}"
+
+    with pytest.raises(TypeError):
+        DumpsOnlyBackend()  # type: ignore[abstract]
+
+
+def test_json_backend_falls_back_to_stdlib() -> None:
+    """Test the stdlib backend is used when orjson is not installed."""
+    with patch.object(codec, "orjson", None):
+        assert [backend.name for backend in available_json_backends()] == ["json"]
+
+
+def test_encode_envelope_and_pad() -> None:
+    """Test request envelopes are compact and V1 packs padded to whole blocks."""
+    assert encode_envelope("cGFjaw==", "aabbcc", i=1) == (
+        b'{"cid":"app","i":1,"pack":"cGFjaw==","t":"pack","tcid":"aabbcc","uid":0}'
+    )
+    assert json.loads(encode_envelope("cGFjaw==", "aabbcc", "dGFn"))["tag"] == "dGFn"
+    assert pad(PACK) == PACK + b"\x0c" * 12
+    assert unpad(pad(PACK[:32])).tobytes() == PACK[:32]
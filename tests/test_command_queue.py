@@ -0,0 +1,234 @@
+"""Tests for per-device command handling."""
+
+import asyncio
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.greev2.climate import GreeClimate
+from custom_components.greev2.command_queue import (
+    CommandCoalescer,
+    DeviceRequestScheduler,
+)
+from custom_components.greev2.const import (
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    PRIORITY_PROBE,
+    PRIORITY_RECONCILE,
+)
+
+from .conftest import GreeClimateFactory
+
+
+async def test_coalescer_merges_commands_in_window() -> None:
+    """Test commands within the window share one send, last writer winning."""
+    sent: List[Dict[str, Any]] = []
+
+    async def send(command: Dict[str, Any]) -> str:
+        sent.append(command)
+        return "ack"
+
+    coalescer = CommandCoalescer(send, window=0.05)
+    results = await asyncio.gather(
+        coalescer.async_submit({"SetTem": 22, "StHt": 0}),
+        coalescer.async_submit({"WdSpd": 3}),
+        coalescer.async_submit({"SetTem": 24}),
+    )
+
+    assert sent == [{"SetTem": 24, "StHt": 0, "WdSpd": 3}]
+    assert results == ["ack"] * 3
+    assert coalescer.packets_sent == 1
+    assert coalescer.commands_merged == 2
+
+
+async def test_coalescer_separate_windows_send_separately() -> None:
+    """Test a command after the window closed goes in its own packet."""
+    send = AsyncMock(return_value=None)
+    coalescer = CommandCoalescer(send, window=0.01)
+
+    await coalescer.async_submit({"Pow": 1})
+    await coalescer.async_submit({"Pow": 0})
+
+    assert [call.args[0] for call in send.await_args_list] == [{"Pow": 1}, {"Pow": 0}]
+
+
+async def test_coalescer_failure_reaches_every_caller() -> None:
+    """Test an error from the merged send is raised to each waiting caller."""
+    coalescer = CommandCoalescer(
+        AsyncMock(side_effect=ConnectionError("down")), window=0.01
+    )
+
+    results = await asyncio.gather(
+        coalescer.async_submit({"Pow": 1}),
+        coalescer.async_submit({"Lig": 1}),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+async def test_coalescer_cancelled_caller_keeps_command() -> None:
+    """Test a caller giving up does not cancel the packet others wait on."""
+    send = AsyncMock(return_value="ack")
+    coalescer = CommandCoalescer(send, window=0.02)
+
+    first = asyncio.ensure_future(coalescer.async_submit({"Pow": 1}))
+    await asyncio.sleep(0)
+    first.cancel()
+    result = await coalescer.async_submit({"Mod": 1})
+
+    assert result == "ack"
+    send.assert_awaited_once_with({"Pow": 1, "Mod": 1})
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_coalescer_close_drops_open_window() -> None:
+    """Test closing cancels the pending flush and the callers waiting on it."""
+    send = AsyncMock(return_value="ack")
+    coalescer = CommandCoalescer(send, window=0.02)
+
+    pending = asyncio.ensure_future(coalescer.async_submit({"Pow": 1}))
+    await asyncio.sleep(0)
+    coalescer.close()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    await asyncio.sleep(0.03)
+
+    send.assert_not_awaited()
+    assert coalescer.packets_sent == 0
+
+
+async def test_entity_service_calls_share_one_packet(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test service calls issued together reach the device as one command."""
+    device: GreeClimate = gree_climate_device()
+    device._state.update_options({"Pow": 1, "Mod": 1})
+    device._api.send_command = AsyncMock(return_value={"r": 200})  # type: ignore[method-assign]
+
+    await asyncio.gather(
+        device.async_set_temperature(temperature=23),
+        device.async_set_fan_mode("High"),
+        device.async_set_swing_mode(device._attr_swing_modes[1]),
+    )
+
+    device._api.send_command.assert_awaited_once()
+    opt_keys, p_values = device._api.send_command.await_args.args
+    assert dict(zip(opt_keys, p_values)) == {
+        "SetTem": 23,
+        "StHt": 0,
+        "Tur": 0,
+        "Quiet": 0,
+        "WdSpd": 5,
+        "SwUpDn": 1,
+    }
+
+
+def _recorder(log: List[str], name: str, delay: float = 0.0):
+    """Return a request that records when it starts and finishes."""
+
+    async def request() -> str:
+        log.append(f"start {name}")
+        await asyncio.sleep(delay)
+        log.append(f"end {name}")
+        return name
+
+    return request
+
+
+async def test_scheduler_runs_one_request_at_a_time_by_lane() -> None:
+    """Test queued requests run one by one, the most urgent lane first."""
+    scheduler = DeviceRequestScheduler()
+    log: List[str] = []
+    blocker = asyncio.ensure_future(
+        scheduler.async_run(PRIORITY_RECONCILE, _recorder(log, "bind", 0.01))
+    )
+    await asyncio.sleep(0.001)  # Let the first request start
+    results = await asyncio.gather(
+        scheduler.async_run(PRIORITY_PROBE, _recorder(log, "probe")),
+        scheduler.async_run(PRIORITY_POLL, _recorder(log, "poll")),
+        scheduler.async_run(PRIORITY_COMMAND, _recorder(log, "command")),
+    )
+    await blocker
+
+    assert results == ["probe", "poll", "command"]
+    assert log == [
+        "start bind",
+        "end bind",
+        "start command",
+        "end command",
+        "start poll",
+        "end poll",
+        "start probe",
+        "end probe",
+    ]
+
+
+async def test_scheduler_command_preempts_running_poll() -> None:
+    """Test a command interrupts a slow poll, which then runs again."""
+    scheduler = DeviceRequestScheduler()
+    log: List[str] = []
+    poll = asyncio.ensure_future(
+        scheduler.async_run(PRIORITY_POLL, _recorder(log, "poll", 0.05))
+    )
+    await asyncio.sleep(0.01)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    result = await scheduler.async_run(PRIORITY_COMMAND, _recorder(log, "command"))
+    command_latency = loop.time() - started
+    assert result == "command"
+    assert await poll == "poll"
+
+    assert command_latency < 0.04  # Did not wait for the poll to finish
+    assert log == [
+        "start poll",
+        "start command",
+        "end command",
+        "start poll",
+        "end poll",
+    ]
+    assert scheduler.preemptions == 1
+
+
+async def test_scheduler_does_not_preempt_reconcile_reads() -> None:
+    """Test a command waits for a running read that confirms a command."""
+    scheduler = DeviceRequestScheduler()
+    log: List[str] = []
+    read = asyncio.ensure_future(
+        scheduler.async_run(PRIORITY_RECONCILE, _recorder(log, "read", 0.01))
+    )
+    await asyncio.sleep(0.001)  # Let the first request start
+    await scheduler.async_run(PRIORITY_COMMAND, _recorder(log, "command"))
+    await read
+
+    assert log == ["start read", "end read", "start command", "end command"]
+    assert scheduler.preemptions == 0
+
+
+async def test_scheduler_propagates_errors_and_cancellation() -> None:
+    """Test errors reach the caller and a cancelled caller's request is dropped."""
+    scheduler = DeviceRequestScheduler()
+    log: List[str] = []
+
+    with pytest.raises(ConnectionError):
+        await scheduler.async_run(
+            PRIORITY_POLL, AsyncMock(side_effect=ConnectionError("down"))
+        )
+
+    running = asyncio.ensure_future(
+        scheduler.async_run(PRIORITY_POLL, _recorder(log, "slow", 1))
+    )
+    queued = asyncio.ensure_future(
+        scheduler.async_run(PRIORITY_POLL, _recorder(log, "queued"))
+    )
+    await asyncio.sleep(0.001)  # Let the first request start
+    queued.cancel()
+    running.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await running
+
+    assert await scheduler.async_run(PRIORITY_POLL, _recorder(log, "next")) == "next"
+    assert log == ["start slow", "start next", "end next"]
@@ -1,5 +1,6 @@
 """Test the Gree Climate V2 config flow."""
 
+import dataclasses
 from unittest.mock import patch
 
 # import pytest # Removed unused import
@@ -13,12 +14,21 @@ from homeassistant.helpers.device_registry import format_mac
 from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore[import-untyped]
 
 # Import custom exceptions and constants
-from custom_components.greev2.config_flow import CannotConnect, InvalidAuth
+from custom_components.greev2.config_flow import (
+    CannotConnect,
+    InvalidAuth,
+    validate_input,
+)
+from custom_components.greev2.discovery import DiscoveredDevice
 from custom_components.greev2.const import (
     DOMAIN,
+    CONF_ENCRYPTION_KEY,
+    CONF_DEVICE_MODEL,
     CONF_ENCRYPTION_VERSION,
+    CONF_FIRMWARE_VERSION,
     # DEFAULT_NAME, # Removed unused import
     CONF_TEMP_SENSOR,
+    CONF_TIMEOUT,
 )
 
 # Enable pytest-homeassistant-custom-component fixtures
@@ -421,3 +431,224 @@ async def test_options_flow_submit_fail_ip_change(hass: HomeAssistant) -> None:
 
     # Check listener was NOT called
     mock_update_listener.assert_not_called()
+
+
+MOCK_DISCOVERED = DiscoveredDevice(
+    host="192.168.1.120",
+    port=7000,
+    mac="f4911e123456",
+    name="1e123456",
+    model="gree",
+    firmware="V1.1.13",
+    brand="gree",
+    encryption_version=1,
+)
+
+
+async def test_user_step_scan_and_pick(hass: HomeAssistant) -> None:
+    """Test leaving the MAC empty scans the subnet and offers the found devices."""
+    other = dataclasses.replace(
+        MOCK_DISCOVERED, host="192.168.1.121", mac="f4911e654321"
+    )
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    with patch(
+        "custom_components.greev2.config_flow.async_scan",
+        return_value=[MOCK_DISCOVERED, other],
+    ) as mock_scan:
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_HOST: "192.168.1.0/24", CONF_MAC: ""}
+        )
+    mock_scan.assert_called_once_with("192.168.1.0/24")
+    assert result2["type"] == data_entry_flow.FlowResultType.FORM
+    assert result2["step_id"] == "pick_device"
+
+    picked_mac = format_mac(MOCK_DISCOVERED.mac)
+    with patch(
+        "custom_components.greev2.config_flow.validate_input",
+        return_value={"title": MOCK_DISCOVERED.name, "cleaned_mac": picked_mac},
+    ) as mock_validate:
+        result3 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_MAC: picked_mac}
+        )
+        await hass.async_block_till_done()
+
+    assert result3["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    data = mock_validate.call_args[0][1]
+    assert data[CONF_HOST] == MOCK_DISCOVERED.host
+    assert data[CONF_MAC] == picked_mac
+    assert data[CONF_ENCRYPTION_VERSION] == "1"
+    # The other device is offered as a discovered flow
+    flows = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert [flow["context"]["unique_id"] for flow in flows] == [format_mac(other.mac)]
+    assert flows[0]["step_id"] == "discovery_confirm"
+
+
+async def test_user_step_scan_no_devices(hass: HomeAssistant) -> None:
+    """Test an empty scan shows the user form with an error."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    with patch(
+        "custom_components.greev2.config_flow.async_scan", return_value=[]
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_HOST: "192.168.1.0/24", CONF_MAC: ""}
+        )
+    assert result2["type"] == data_entry_flow.FlowResultType.FORM
+    assert result2["step_id"] == "user"
+    assert result2["errors"] == {"base": "no_devices_found"}
+
+
+async def test_user_step_scan_invalid_target(hass: HomeAssistant) -> None:
+    """Test an unscannable host shows an error without scanning."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result2 = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: "10.0.0.0/8", CONF_MAC: ""}
+    )
+    assert result2["errors"] == {"base": "invalid_scan_target"}
+
+
+async def test_discovery_step_confirm(hass: HomeAssistant) -> None:
+    """Test a discovered device only asks for the optional fields."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_DISCOVERY},
+        data=MOCK_DISCOVERED,
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["step_id"] == "discovery_confirm"
+    assert CONF_HOST not in result["data_schema"].schema
+
+    cleaned_mac = format_mac(MOCK_DISCOVERED.mac)
+    with patch(
+        "custom_components.greev2.config_flow.validate_input",
+        return_value={"title": "Bedroom", "cleaned_mac": cleaned_mac},
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_NAME: "Bedroom"}
+        )
+        await hass.async_block_till_done()
+    assert result2["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result2["data"][CONF_HOST] == MOCK_DISCOVERED.host
+    assert result2["data"][CONF_MAC] == cleaned_mac
+    assert result2["data"][CONF_NAME] == MOCK_DISCOVERED.name
+
+
+async def test_discovery_step_already_configured(hass: HomeAssistant) -> None:
+    """Test rediscovering a configured device aborts and updates its host."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=format_mac(MOCK_DISCOVERED.mac),
+        data={CONF_HOST: "192.168.1.2", CONF_MAC: MOCK_DISCOVERED.mac},
+    )
+    entry.add_to_hass(hass)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_DISCOVERY},
+        data=MOCK_DISCOVERED,
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert entry.data[CONF_HOST] == MOCK_DISCOVERED.host
+
+
+async def test_discovery_step_updates_host_in_options(hass: HomeAssistant) -> None:
+    """Test rediscovery also updates a host saved by the options flow."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=format_mac(MOCK_DISCOVERED.mac),
+        data={CONF_HOST: "192.168.1.2", CONF_MAC: MOCK_DISCOVERED.mac},
+        options={CONF_HOST: "192.168.1.3", CONF_TIMEOUT: 5},
+    )
+    entry.add_to_hass(hass)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_DISCOVERY},
+        data=MOCK_DISCOVERED,
+    )
+    assert result["reason"] == "already_configured"
+    assert entry.data[CONF_HOST] == MOCK_DISCOVERED.host
+    assert entry.options == {CONF_HOST: MOCK_DISCOVERED.host, CONF_TIMEOUT: 5}
+
+
+async def test_user_step_scan_updates_configured_device(hass: HomeAssistant) -> None:
+    """Test a scan finding a configured device at a new address updates its entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=format_mac(MOCK_DISCOVERED.mac),
+        data={CONF_HOST: "192.168.1.2", CONF_MAC: MOCK_DISCOVERED.mac},
+        options={CONF_HOST: "192.168.1.3", CONF_TIMEOUT: 5},
+    )
+    entry.add_to_hass(hass)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    with patch(
+        "custom_components.greev2.config_flow.async_scan",
+        return_value=[MOCK_DISCOVERED],
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_HOST: "192.168.1.0/24", CONF_MAC: ""}
+        )
+        await hass.async_block_till_done()
+    # Configured devices are not offered again
+    assert result2["errors"] == {"base": "no_devices_found"}
+    assert entry.data[CONF_HOST] == MOCK_DISCOVERED.host
+    assert entry.data[CONF_FIRMWARE_VERSION] == MOCK_DISCOVERED.firmware
+    assert entry.options == {CONF_HOST: MOCK_DISCOVERED.host, CONF_TIMEOUT: 5}
+    # Its discovery flow aborted; only the user flow is left
+    flows = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert [flow["flow_id"] for flow in flows] == [result["flow_id"]]
+
+
+async def test_user_step_saves_bound_key(hass: HomeAssistant) -> None:
+    """Test the key obtained while validating is stored in the entry data."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    with patch(
+        "custom_components.greev2.config_flow.validate_input",
+        return_value={
+            "title": MOCK_USER_INPUT[CONF_NAME],
+            "cleaned_mac": MOCK_CLEANED_MAC,
+            CONF_ENCRYPTION_KEY: "boundDeviceKey12",
+        },
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], MOCK_USER_INPUT
+        )
+        await hass.async_block_till_done()
+    assert result2["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result2["data"] == {**MOCK_USER_INPUT, CONF_ENCRYPTION_KEY: "boundDeviceKey12"}
+
+
+async def test_validate_input_records_firmware_of_manual_entry(
+    hass: HomeAssistant,
+) -> None:
+    """Test a device entered by hand is scanned for its model and firmware."""
+    other = dataclasses.replace(MOCK_DISCOVERED, mac="f4911e654321", firmware="V2")
+    with (
+        patch(
+            "custom_components.greev2.config_flow.GreeDeviceApi.bind_and_get_key",
+            return_value=True,
+        ),
+        patch(
+            "custom_components.greev2.config_flow.async_scan",
+            return_value=[other, MOCK_DISCOVERED],
+        ) as mock_scan,
+    ):
+        info = await validate_input(
+            hass,
+            {
+                CONF_HOST: MOCK_DISCOVERED.host,
+                CONF_MAC: MOCK_DISCOVERED.mac,
+                CONF_ENCRYPTION_VERSION: "1",
+            },
+        )
+    assert mock_scan.call_args[0] == (MOCK_DISCOVERED.host,)
+    assert info[CONF_DEVICE_MODEL] == MOCK_DISCOVERED.model
+    assert info[CONF_FIRMWARE_VERSION] == MOCK_DISCOVERED.firmware
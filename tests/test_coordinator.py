@@ -0,0 +1,276 @@
+"""Tests for the fleet polling coordinator."""
+
+import asyncio
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.greev2.climate import GreeClimate
+from custom_components.greev2.coordinator import (
+    DATA_FLEET,
+    AdaptiveInterval,
+    GreeCoordinator,
+    GreeFleet,
+    async_get_fleet,
+    next_poll_time,
+    poll_phase,
+)
+
+from .conftest import GreeClimateFactory
+
+
+async def test_fleet_is_shared(hass: HomeAssistant) -> None:
+    """Test every coordinator draws from the same fleet budget."""
+    first = GreeCoordinator(hass, "first", AsyncMock())
+    second = GreeCoordinator(hass, "second", AsyncMock())
+
+    assert first._fleet is second._fleet is hass.data[DATA_FLEET]
+    assert async_get_fleet(hass) is first._fleet
+
+
+async def test_fleet_bounds_concurrent_polls(hass: HomeAssistant) -> None:
+    """Test no more than max_concurrent_polls devices are polled at once."""
+    hass.data[DATA_FLEET] = GreeFleet(max_concurrent_polls=2)
+    release = asyncio.Event()
+
+    async def poll() -> Dict[str, Any]:
+        await release.wait()
+        return {"Pow": 1}
+
+    coordinators: List[GreeCoordinator] = [
+        GreeCoordinator(hass, f"device {index}", poll) for index in range(5)
+    ]
+    refreshes = asyncio.gather(*(c.async_refresh() for c in coordinators))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    fleet: GreeFleet = hass.data[DATA_FLEET]
+    assert fleet.active_polls == 2
+
+    release.set()
+    await refreshes
+    assert fleet.peak_polls == 2
+    assert fleet.active_polls == 0
+    assert all(c.last_update_success for c in coordinators)
+
+
+async def test_overlapping_refreshes_share_one_poll(hass: HomeAssistant) -> None:
+    """Test refreshes arriving while a poll runs join it instead of polling again."""
+    release = asyncio.Event()
+    async def wait_and_return() -> Dict[str, Any]:
+        await release.wait()
+        return {"Pow": 1}
+
+    poll = AsyncMock(side_effect=wait_and_return)
+    coordinator = GreeCoordinator(hass, "device", poll)
+
+    refreshes = asyncio.gather(*(coordinator.async_refresh() for _ in range(3)))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    release.set()
+    await refreshes
+
+    poll.assert_awaited_once()
+    assert coordinator.merged_refreshes == 2
+
+    # A refresh after the poll finished polls the device again
+    await coordinator.async_refresh()
+    assert poll.await_count == 2
+
+
+async def test_failed_poll_marks_update_failed(hass: HomeAssistant) -> None:
+    """Test an unexpected poll error is reported as a failed update."""
+    coordinator = GreeCoordinator(
+        hass, "device", AsyncMock(side_effect=RuntimeError("boom"))
+    )
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is False
+    assert coordinator._in_flight is None
+
+
+async def test_entity_is_not_polled_and_refreshes_through_coordinator(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test the entity relies on its coordinator instead of HA polling."""
+    device: GreeClimate = gree_climate_device()
+    assert device.should_poll is False
+
+    with patch.object(
+        device.coordinator, "async_refresh", AsyncMock()
+    ) as mock_refresh:
+        await device.async_update()
+    mock_refresh.assert_awaited_once()
+
+
+async def test_command_publishes_state_through_coordinator(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test a sent command notifies subscribers without waiting for a poll."""
+    device: GreeClimate = gree_climate_device()
+    device._first_time_run = False
+    device._api.get_status = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda options: [0] * len(options)
+    )
+    device._api.send_command = AsyncMock(return_value={"r": 200})  # type: ignore[method-assign]
+    device._has_temp_sensor = False  # Skip feature detection
+    listener = MagicMock()
+    device.coordinator.async_add_listener(listener)
+
+    await device._async_sync_state({"Pow": 1})
+
+    device._api.send_command.assert_awaited_once_with(["Pow"], [1])
+    listener.assert_called_once()
+
+
+def test_adaptive_interval_steps_back_while_stable() -> None:
+    """Test the delay walks up the steps while nothing changes, then holds."""
+    interval = AdaptiveInterval(fast=5, fast_window=60, steps=(15, 30, 60))
+
+    delays = [interval.on_success(now, changed=False) for now in range(5)]
+
+    assert delays == [15, 30, 60, 60, 60]
+
+
+def test_adaptive_interval_fast_after_activity() -> None:
+    """Test a command or change polls fast for the window, then steps back."""
+    interval = AdaptiveInterval(fast=5, fast_window=60, steps=(15, 30))
+    interval.on_success(0, changed=False)
+    interval.on_success(1, changed=False)
+
+    assert interval.on_activity(100) == 5
+    assert interval.on_success(130, changed=False) == 5
+    assert interval.on_success(170, changed=False) == 15  # Window over
+    assert interval.on_success(185, changed=True) == 5  # Observed change
+    assert interval.on_success(250, changed=False) == 15
+
+
+def test_adaptive_interval_backs_off_exponentially_while_offline() -> None:
+    """Test failures double the delay up to the cap and a reply resets it."""
+    interval = AdaptiveInterval(steps=(15,), offline_base=30, offline_max=200)
+
+    delays = [interval.on_failure() for _ in range(5)]
+
+    assert delays == [30, 60, 120, 200, 200]
+    assert interval.on_success(0, changed=False) == 15
+    assert interval.failures == 0
+
+
+async def test_coordinator_adapts_update_interval(hass: HomeAssistant) -> None:
+    """Test the coordinator schedules by activity, stability and failures."""
+    results: List[Any] = [
+        {"Pow": 0, "TemSen": 60},
+        {"Pow": 0, "TemSen": 61},  # Only a reading drifted
+        {"Pow": 1, "TemSen": 61},  # Changed outside HA (e.g. remote control)
+        UpdateFailed("offline"),
+        UpdateFailed("offline"),
+    ]
+    interval = AdaptiveInterval(
+        fast=5, fast_window=60, steps=(15, 30), offline_base=30, offline_max=600
+    )
+    coordinator = GreeCoordinator(
+        hass, "device", AsyncMock(side_effect=results), interval
+    )
+
+    seconds: List[float] = []
+    for _ in results:
+        await coordinator.async_refresh()
+        seconds.append(coordinator.delay)
+
+    assert seconds == [15, 30, 5, 30, 60]
+    assert coordinator.last_update_success is False
+
+    coordinator.async_command_sent({"Pow": 0, "TemSen": 61})
+    assert coordinator.delay == 5
+    assert coordinator.data == {"Pow": 0, "TemSen": 61}
+
+
+async def test_entity_poll_raises_when_device_silent(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test the entity's poll reports a silent device as a failed update."""
+    device: GreeClimate = gree_climate_device()
+    device._has_temp_sensor = False  # Skip feature detection
+    device._api.get_status = AsyncMock(return_value=None)  # type: ignore[method-assign]
+
+    with pytest.raises(UpdateFailed):
+        await device._async_poll()
+
+    device._api.get_status = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda options: [1] * len(options)
+    )
+    data = await device._async_poll()
+    assert data["Pow"] == 1
+
+
+def test_poll_phase_is_stable_and_spread() -> None:
+    """Test a device's phase depends only on its MAC, and MACs spread out."""
+    assert poll_phase("a1:b2:c3:d4:e5:f6") == poll_phase("A1:B2:C3:D4:E5:F6")
+    phases = [poll_phase(f"a1:b2:c3:d4:e5:{index:02x}") for index in range(64)]
+    assert all(0 <= phase < 1 for phase in phases)
+    # Every quarter of the interval gets some devices
+    assert {int(phase * 4) for phase in phases} == {0, 1, 2, 3}
+
+
+def test_next_poll_time_lands_on_device_slot() -> None:
+    """Test polls land on the device's slot, about one delay from now."""
+    for now in (0.0, 12.3, 1000.7):
+        when = next_poll_time(now, delay=60, phase=0.25, jitter=0)
+        assert (when - 15) % 60 == pytest.approx(0)
+        assert now + 30 <= when < now + 90
+
+    jittered = next_poll_time(0.0, delay=60, phase=0.25, jitter=0.05)
+    assert 75 <= jittered <= 78
+
+
+async def test_coordinator_schedules_on_its_slot(hass: HomeAssistant) -> None:
+    """Test the stock timer fires on the coordinator's slot, not a random offset."""
+    coordinator = GreeCoordinator(
+        hass, "device", AsyncMock(return_value={"Pow": 1}), phase=0.5
+    )
+
+    with patch.object(hass.loop, "call_at") as mock_call_at, patch(
+        "custom_components.greev2.coordinator.random.uniform", return_value=0
+    ):
+        unsub = coordinator.async_add_listener(MagicMock())
+        await coordinator.async_refresh()
+        when = mock_call_at.call_args[0][0]
+        unsub()
+
+    # The stock scheduler rounds the loop time down and adds up to a second
+    offset = (when - coordinator.delay / 2) % coordinator.delay
+    assert min(offset, coordinator.delay - offset) < 1
+
+
+async def test_entity_added_without_waiting_for_first_poll(
+    gree_climate_device: GreeClimateFactory,
+) -> None:
+    """Test adding the entity returns at once and the first poll pushes state."""
+    device: GreeClimate = gree_climate_device()
+    device.async_write_ha_state = MagicMock()  # type: ignore[method-assign]
+    device._has_temp_sensor = False  # Skip feature detection
+    release = asyncio.Event()
+
+    async def slow_status(options: List[str]) -> List[int]:
+        await release.wait()
+        return [1] * len(options)
+
+    device._api.get_status = AsyncMock(side_effect=slow_status)  # type: ignore[method-assign]
+    tasks: List["asyncio.Task[None]"] = []
+    device._entry.async_create_background_task = MagicMock(
+        side_effect=lambda hass, target, name: tasks.append(asyncio.ensure_future(target))
+    )
+
+    await device.async_added_to_hass()
+
+    assert len(tasks) == 1 and not tasks[0].done()
+    assert device.available is False  # Unknown until the device answers
+    device.async_write_ha_state.assert_not_called()
+
+    release.set()
+    await tasks[0]
+    assert device.available is True
+    device.async_write_ha_state.assert_called()
@@ -0,0 +1,89 @@
+# pylint: disable=protected-access
+"""Tests for the AES backends."""
+
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.greev2 import crypto
+from custom_components.greev2.crypto import (
+    CryptographyBackend,
+    EcbCipher,
+    GcmCipher,
+    PycryptodomeBackend,
+    available_backends,
+    get_backend,
+)
+
+KEY = b"0123456789abcdef"
+BLOCKS = b'{"t":"status"}\x02\x02' * 4
+
+BACKENDS = [CryptographyBackend(), PycryptodomeBackend()]
+
+
+@pytest.mark.parametrize("backend", BACKENDS, ids=lambda backend: backend.name)
+def test_backend_round_trips(backend: crypto.CryptoBackend) -> None:
+    """Test each backend decrypts what it encrypted, for ECB and GCM."""
+    assert backend.ecb_decrypt(KEY, backend.ecb_encrypt(KEY, BLOCKS)) == BLOCKS
+    ciphertext, tag = backend.gcm_seal(KEY, b'{"t":"status"}')
+    assert len(tag) == 16
+    assert backend.gcm_open(KEY, ciphertext, tag) == b'{"t":"status"}'
+
+
+@pytest.mark.parametrize("backend", BACKENDS, ids=lambda backend: backend.name)
+def test_backend_rejects_bad_tag(backend: crypto.CryptoBackend) -> None:
+    """Test a tag that does not verify raises ValueError on every backend."""
+    ciphertext, tag = backend.gcm_seal(KEY, b"payload")
+    with pytest.raises(ValueError):
+        backend.gcm_open(KEY, ciphertext, bytes(16))
+    with pytest.raises(ValueError):
+        backend.gcm_open(b"fedcba9876543210", ciphertext, tag)
+
+
+@pytest.mark.parametrize("backend", BACKENDS, ids=lambda backend: backend.name)
+def test_backend_rejects_unaligned_ecb_data(backend: crypto.CryptoBackend) -> None:
+    """Test unpadded ECB input is refused and does not disturb later packets."""
+    with pytest.raises(ValueError):
+        backend.ecb_encrypt(KEY, BLOCKS[:-1])
+    assert backend.ecb_decrypt(KEY, backend.ecb_encrypt(KEY, BLOCKS)) == BLOCKS
+
+
+def test_backends_produce_identical_packets() -> None:
+    """Test the backends are interchangeable on the wire."""
+    fast, fallback = BACKENDS
+    assert fast.ecb_encrypt(KEY, BLOCKS) == fallback.ecb_encrypt(KEY, BLOCKS)
+    assert fast.gcm_seal(KEY, BLOCKS) == fallback.gcm_seal(KEY, BLOCKS)
+
+
+def test_incomplete_backend_cannot_be_instantiated() -> None:
+    """Test a backend missing an AES operation fails when built, not when used."""
+
+    class EcbOnlyBackend(crypto.CryptoBackend):
+        def ecb_encrypt(self, key: bytes, data: bytes) -> bytes:
+            return data
+
+        def ecb_decrypt(self, key: bytes, data: bytes) -> bytes:
+            return data
+
+    with pytest.raises(TypeError):
+        EcbOnlyBackend()  # type: ignore[abstract]
+
+
+def test_backend_selection_falls_back_to_pycryptodome() -> None:
+    """Test cryptography is preferred and pycryptodome used without it."""
+    assert [backend.name for backend in available_backends()] == [
+        "cryptography",
+        "pycryptodome",
+    ]
+    with patch.object(crypto, "AESGCM", None), patch.object(crypto, "_BACKEND", None):
+        assert get_backend().name == "pycryptodome"
+    assert get_backend().name == "cryptography"
+
+
+def test_keyed_ciphers_use_the_backend() -> None:
+    """Test the keyed wrappers can be reused for any number of packets."""
+    ecb = EcbCipher(KEY)
+    gcm = GcmCipher(KEY, PycryptodomeBackend())
+    for _ in range(3):
+        assert ecb.decrypt(ecb.encrypt(BLOCKS)) == BLOCKS
+        assert gcm.decrypt_and_verify(*gcm.encrypt_and_digest(BLOCKS)) == BLOCKS
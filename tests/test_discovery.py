@@ -0,0 +1,102 @@
+# pylint: disable=protected-access
+"""Tests for the Gree scan-based discovery."""
+
+import json
+
+import pytest
+
+from custom_components.greev2.const import GCM_DEFAULT_KEY, GENERIC_KEY
+from custom_components.greev2.device_api import GreeDeviceApi
+from custom_components.greev2.discovery import (
+    _scan_targets,
+    async_scan,
+    decode_scan_reply,
+)
+
+from .conftest import MOCK_MAC
+from .device_api.test_transport import LOCALHOST, start_fake_device, v1_reply
+
+DEVICE_MAC = "f4911e123456"
+SCAN_PACK = {
+    "t": "dev",
+    "cid": DEVICE_MAC,
+    "bc": "gree",
+    "brand": "gree",
+    "catalog": "gree",
+    "mac": DEVICE_MAC,
+    "mid": "10001",
+    "model": "gree",
+    "name": "1e123456",
+    "series": "gree",
+    "vender": "1",
+    "ver": "V1.1.13",
+    "lock": 0,
+}
+
+
+def v2_scan_reply(pack: dict) -> bytes:
+    """Build a V2 (GCM) scan reply encrypted with the generic GCM key."""
+    api = GreeDeviceApi(
+        host=LOCALHOST, port=0, mac=MOCK_MAC, timeout=1, encryption_version=2
+    )
+    encrypted, tag = api._encrypt_gcm(
+        GCM_DEFAULT_KEY.encode("utf8"), json.dumps(pack).encode("utf8")
+    )
+    envelope = {"t": "pack", "i": 1, "uid": 0, "cid": DEVICE_MAC, "tcid": ""}
+    return json.dumps({**envelope, "pack": encrypted, "tag": tag}).encode("utf8")
+
+
+def test_decode_v1_scan_reply() -> None:
+    """Test a V1 scan reply is decrypted with the generic ECB key."""
+    data = v1_reply(SCAN_PACK, key=GENERIC_KEY.encode("utf8"))
+    device = decode_scan_reply(data, "192.168.1.50", 7000)
+    assert device.mac == DEVICE_MAC
+    assert device.host == "192.168.1.50"
+    assert device.name == "1e123456"
+    assert device.model == "gree"
+    assert device.firmware == "V1.1.13"
+    assert device.encryption_version == 1
+
+
+def test_decode_v2_scan_reply() -> None:
+    """Test a V2 scan reply (with a tag) is decrypted with the generic GCM key."""
+    device = decode_scan_reply(v2_scan_reply(SCAN_PACK), "192.168.1.51", 7000)
+    assert device.mac == DEVICE_MAC
+    assert device.encryption_version == 2
+
+
+def test_decode_rejects_non_scan_reply() -> None:
+    """Test other packet types are rejected."""
+    data = v1_reply({"t": "bindok", "key": "x"}, key=GENERIC_KEY.encode("utf8"))
+    with pytest.raises(ValueError):
+        decode_scan_reply(data, "192.168.1.50", 7000)
+
+
+def test_scan_targets() -> None:
+    """Test broadcast, single-host and CIDR sweep targets."""
+    assert _scan_targets(None) == (["255.255.255.255"], [])
+    assert _scan_targets("192.168.1.7") == ([], ["192.168.1.7"])
+    broadcasts, hosts = _scan_targets("192.168.1.0/30")
+    assert broadcasts == ["192.168.1.3"]
+    assert hosts == ["192.168.1.1", "192.168.1.2"]
+    with pytest.raises(ValueError):
+        _scan_targets("10.0.0.0/8")
+    with pytest.raises(ValueError):
+        _scan_targets("not-an-ip")
+
+
+async def test_scan_collects_replies(socket_enabled: None) -> None:
+    """Test a unicast scan collects and decodes the device's reply."""
+    scan_reply = v1_reply(SCAN_PACK, key=GENERIC_KEY.encode("utf8"))
+    transport, device, port = await start_fake_device(
+        lambda data: scan_reply if data == b'{"t":"scan"}' else None
+    )
+    try:
+        devices = await async_scan(LOCALHOST, window=0.1, port=port)
+    finally:
+        transport.close()
+    assert device.requests == [b'{"t":"scan"}']
+    assert len(devices) == 1
+    assert devices[0].mac == DEVICE_MAC
+    assert devices[0].host == LOCALHOST
+    assert devices[0].port == port
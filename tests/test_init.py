@@ -6,6 +6,8 @@ import pytest
 from homeassistant.components.climate import HVACMode
 from homeassistant.core import HomeAssistant
 
+from custom_components.greev2.climate import GreeClimate
+
 # from custom_components.greev2.const import GCM_DEFAULT_KEY  # Removed unused import
 
 # Import MOCK constants from conftest using absolute path relative to tests dir
@@ -112,3 +114,22 @@ async def test_init_with_optional_entities(
     # assert temp_sensor_id in called_entity_ids
     # assert lights_id in called_entity_ids
     # assert xfan_id in called_entity_ids
+
+
+async def test_init_uses_stored_encryption_key(mock_hass: HomeAssistant) -> None:
+    """Test a key saved in the entry is passed to the API, so no bind is needed."""
+    entry = MagicMock()
+    entry.entry_id = "mock_entry_key"
+    entry.unique_id = None
+    entry.data = {
+        "host": MOCK_IP,
+        "mac": MOCK_MAC,
+        "name": MOCK_NAME,
+        "encryption_version": "2",
+        "encryption_key": "storedDeviceKey1",
+    }
+    entry.options = {}
+    with patch("custom_components.greev2.climate.GreeDeviceApi") as mock_api_class:
+        device = GreeClimate(hass=mock_hass, entry=entry)
+    assert device._encryption_key == b"storedDeviceKey1"
+    assert mock_api_class.call_args[1]["encryption_key"] == b"storedDeviceKey1"
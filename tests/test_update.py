@@ -12,6 +12,7 @@ from homeassistant.core import HomeAssistant
 # from homeassistant.helpers.entity import Entity # Removed unused
 # from unittest.mock import Mock # Removed unused
 
+from custom_components.greev2.capabilities import CapabilityProfile
 from custom_components.greev2.climate import GreeClimate
 
 # Import detect_features for patching
@@ -390,3 +391,107 @@ async def test_update_gcm_key_retrieval_and_update(
 
 
 # External temperature sensor tests removed
+
+
+@patch(
+    "custom_components.greev2.climate.detect_features",
+    return_value=(False, False, False, []),
+)  # Mock feature detection
+async def test_update_rebinds_and_saves_key_when_rejected(
+    mock_detect_features: AsyncMock,
+    gree_climate_device: GreeClimateFactory,
+    mock_hass: HomeAssistant,
+) -> None:
+    """Test a rejected stored key triggers one re-bind and saves the new key."""
+    new_key = b"freshDeviceKey12"
+    device: GreeClimate = gree_climate_device(encryption_version=2)
+    initial_options = list(device._options_to_fetch)
+    mock_detect_features.return_value = (False, False, False, initial_options)
+    mock_api = device._api
+    mock_api._is_bound = True  # Bound with the stored key
+    mock_api.update_encryption_key = MagicMock()  # type: ignore[method-assign]
+
+    async def status_side_effect(_options: List[str]) -> Any:
+        if mock_api.bind_and_get_key.await_count == 0:
+            mock_api._is_bound = False  # Decryption failed with the stored key
+            return None
+        return [0] * len(initial_options)
+
+    async def bind_side_effect() -> bool:
+        mock_api._encryption_key = new_key
+        mock_api._is_bound = True
+        return True
+
+    mock_api.get_status = AsyncMock(side_effect=status_side_effect)  # type: ignore[method-assign]
+    mock_api.bind_and_get_key = AsyncMock(side_effect=bind_side_effect)  # type: ignore[method-assign]
+
+    await device.async_update()
+
+    mock_api.bind_and_get_key.assert_awaited_once()
+    assert mock_api.get_status.await_count == 2
+    mock_api.update_encryption_key.assert_called_once_with(new_key)
+    mock_hass.config_entries.async_update_entry.assert_called_once()
+    saved_data = mock_hass.config_entries.async_update_entry.call_args[1]["data"]
+    assert saved_data["encryption_key"] == new_key.decode()
+
+
+@patch("custom_components.greev2.climate.detect_features")
+async def test_update_uses_cached_capability_profile(
+    mock_detect_features: AsyncMock,
+    gree_climate_device: GreeClimateFactory,
+    mock_hass: HomeAssistant,
+) -> None:
+    """Test a device with a known model/firmware takes its profile from the cache."""
+    device: GreeClimate = gree_climate_device()
+    device._capability_key = "gree/10001/V1.1.13"
+    profile = CapabilityProfile(supported=("TemSen",), unsupported=("LigSen",))
+    cache = MagicMock()
+    cache.async_get_profile = AsyncMock(return_value=profile)
+    device._api.get_status = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda options: [0] * len(options)
+    )
+
+    with patch(
+        "custom_components.greev2.climate.async_get_capability_cache",
+        AsyncMock(return_value=cache),
+    ):
+        await device.async_update()
+
+    mock_detect_features.assert_not_called()
+    assert cache.async_get_profile.call_args[0][0] == "gree/10001/V1.1.13"
+    assert device._has_temp_sensor is True
+    assert device._has_light_sensor is False
+    assert "TemSen" in device._options_to_fetch
+
+
+@patch(
+    "custom_components.greev2.climate.detect_features",
+    return_value=(False, False, False, []),
+)
+async def test_update_fetches_only_due_columns(
+    mock_detect_features: AsyncMock,
+    gree_climate_device: GreeClimateFactory,
+    mock_hass: HomeAssistant,
+) -> None:
+    """Test later polls ask only for due columns and merge them into the state."""
+    device: GreeClimate = gree_climate_device()
+    initial_options = list(device._options_to_fetch)
+    mock_detect_features.return_value = (False, False, False, initial_options)
+    device._api.get_status = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda options: [1] * len(options)
+    )
+
+    await device.async_update()
+    device._api.get_status.assert_awaited_once_with(initial_options)
+
+    device._api.get_status = AsyncMock(  # type: ignore[method-assign]
+        side_effect=lambda options: [0] * len(options)
+    )
+    await device.async_update()
+
+    polled: List[str] = device._api.get_status.call_args[0][0]
+    assert "Pow" in polled
+    assert "TemUn" not in polled  # Startup tier
+    assert "Lig" not in polled  # Slow tier, not due yet
+    assert device._state._ac_options["Pow"] == 0
+    assert device._state._ac_options["TemUn"] == 1  # Kept from the first poll